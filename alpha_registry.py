@@ -4,19 +4,134 @@
 
 from __future__ import annotations
 
+import base64
+import csv
 import datetime
 import hashlib
 import json
+import math
 import os
 import re
+import socket
 import sqlite3
+import time
 import uuid
-from typing import Any, Dict, List, Optional
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from fastexpr import CANONICAL_VERSION, canonical_hash
 
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 CLI_STATE_DIR = os.path.join(SCRIPT_DIR, ".brain_cli")
 DEFAULT_DB_PATH = os.path.join(CLI_STATE_DIR, "alphas.sqlite")
+SQL_IN_CHUNK_SIZE = 500
+# Metrics copied out of latest_metrics_json into typed, indexed columns so
+# list queries can filter and order in SQL.
+METRIC_COLUMNS = ("sharpe", "fitness", "turnover", "subsharpe", "passed")
+# Bump when the typing of those columns changes; registries then re-backfill them.
+METRIC_COLUMNS_VERSION = 2
+ORDER_COLUMNS = ("updated_at", "created_at") + METRIC_COLUMNS
+METRIC_BACKFILL_BATCH_SIZE = 1000
+# Keep "_" and "." inside tokens so operator and field names such as
+# ts_regression or anl10_cps index as whole words.
+CODE_FTS_TOKENIZER = "unicode61 tokenchars '_.'"
+SEARCH_ORDERS = ("recent", "rank")
+# Page cache for bulk imports; random alpha_hash keys touch many index pages.
+IMPORT_CACHE_KIB = 65536
+# Performance aggregates per template / dataset field / operator.  Quantiles
+# come from fixed-width histograms so they can be updated incrementally.
+DATASETS_DIR = os.path.join(SCRIPT_DIR, "datasets")
+OPERATORS_FILE = os.path.join(SCRIPT_DIR, "operators", "operators.json")
+STATS_DIMENSIONS = ("template", "field", "operator")
+# Turnover is stored as a percent (e.g. 35.2), so its bins are half a point wide.
+STATS_BIN_WIDTHS = {"sharpe": 0.05, "fitness": 0.05, "turnover": 0.5}
+STATS_QUANTILES = (0.25, 0.5, 0.75, 0.9)
+# A registry re-checks datasets/ and operators.json for changes at most this often.
+VOCABULARY_CHECK_SECONDS = 60.0
+STATS_ORDERS = ("simulations", "pass_rate", "passed") + tuple(STATS_BIN_WIDTHS)
+STATS_SUM_COLUMNS = ("simulations", "passes", "passed_sum") + tuple(
+    f"{metric}_{part}" for metric in STATS_BIN_WIDTHS for part in ("n", "sum", "sumsq")
+)
+# Flat, typed layout used by ``alpha export``.  Metrics come out of the JSON
+# columns; ints are exported as floats so missing values stay representable.
+EXPORT_CHUNK_SIZE = 10000
+EXPORT_METRIC_TYPES = {
+    "passed": "float", "delay": "float", "region": "string", "neutralization": "string",
+    "decay": "float", "truncation": "float", "sharpe": "float", "fitness": "float",
+    "turnover": "float", "weight": "string", "subsharpe": "float", "correlation": "float",
+    "universe": "string", "self_correlation_min": "float", "pnl_days": "float", "pnl_last": "float",
+}
+EXPORT_TABLES = {
+    "alphas": {
+        "order": ("updated_at", "alpha_hash"),
+        "metrics": "latest_metrics_json",
+        "columns": (
+            "alpha_hash", "alpha_id", "code", "source", "template_id", "status",
+            "latest_simulation_id", "latest_result_link", "created_at", "updated_at",
+            "promoted_at", "rejected_at", "reject_reason",
+        ),
+    },
+    "simulations": {
+        "order": ("created_at", "simulation_id"),
+        "metrics": "metrics_json",
+        "columns": (
+            "simulation_id", "alpha_hash", "alpha_id", "job_id", "status", "result_link",
+            "error", "source", "created_at", "completed_at",
+        ),
+    },
+}
+ALPHA_CACHE_SIZE = 2048
+# Settings that change a simulation's result, with the defaults simulate_run
+# submits when an item leaves them out.  Together with the canonical code
+# hash they identify a result that can be reused instead of re-simulated.
+SIMULATION_SETTING_DEFAULTS = {
+    "region": "USA",
+    "universe": "TOP3000",
+    "delay": 1,
+    "decay": 6,
+    "neutralization": "SUBINDUSTRY",
+    "truncation": 0.1,
+    "pasteurization": "ON",
+    "nanHandling": "OFF",
+}
+STREAM_PAGE_SIZE = 500
+# Change-sets exchanged between registries on different machines.  Rows are
+# read in watermark order per table; queue bookkeeping stays on its node.
+SYNC_TABLES = {
+    "alphas": ("updated_at", "alpha_hash"),
+    "simulations": ("created_at", "simulation_id"),
+    "alpha_events": ("created_at", "event_id"),
+}
+SYNC_LOCAL_EVENT_TYPES = ("queued",)
+SYNC_CHUNK_SIZE = 5000
+# Change-sets and incremental exports stop this far behind the clock.  Row
+# timestamps are taken before their transaction commits, so a concurrent
+# writer can still commit rows stamped below the newest one; the watermark
+# only passes timestamps old enough that those writers have finished.
+SYNC_SETTLE_SECONDS = 60
+_SYNC_RESULT_COLUMNS = ("latest_simulation_id", "latest_metrics_json", "latest_result_link") + METRIC_COLUMNS
+_SYNC_DECISION_COLUMNS = ("status", "promoted_at", "rejected_at", "reject_reason")
+# Event retention used by ``registry maintain``.
+EVENT_ARCHIVE_AFTER_DAYS = 90
+QUEUED_EVENT_JOB_IDS_KEPT = 20
+ARCHIVE_EVENTS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS archive.alpha_events (
+        event_id TEXT PRIMARY KEY,
+        alpha_hash TEXT NOT NULL,
+        event_type TEXT NOT NULL,
+        reason TEXT,
+        payload_json TEXT,
+        created_at TEXT NOT NULL
+    );
+    DROP INDEX IF EXISTS archive.idx_alpha_events_alpha_time;
+    CREATE INDEX IF NOT EXISTS archive.idx_alpha_events_alpha_keyset
+        ON alpha_events(alpha_hash, created_at, event_id);
+"""
+_CODE_IDENTIFIER = re.compile(r"(?<![\w.])([A-Za-z_][A-Za-z0-9_]*)\s*(\()?")
+_VOCABULARY_LOCK = Lock()
+_VOCABULARY_CACHE: Dict[str, Any] = {"signature": None, "vocabulary": None}
 
 
 def utc_now() -> str:
@@ -32,6 +147,11 @@ def alpha_hash_for_code(code: str) -> str:
     return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
 
 
+def template_id_for_code(template: str) -> str:
+    """``template_id`` of a template's code, so every generator labels the same template alike."""
+    return f"tpl_{alpha_hash_for_code(template)[:12]}"
+
+
 def _json_dumps(value: Any) -> Optional[str]:
     if value is None:
         return None
@@ -47,6 +167,68 @@ def _json_loads(value: Optional[str], default: Any = None) -> Any:
         return default
 
 
+def _metric_float(value: Any) -> Optional[float]:
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def passed_float(value: Any) -> Optional[float]:
+    """``passed`` as a number; result files written as PASS/FAIL (or TRUE/FALSE) give 1 and 0."""
+    if isinstance(value, str):
+        text = value.strip().upper()
+        if text in ("PASS", "TRUE"):
+            return 1.0
+        if text in ("FAIL", "FALSE"):
+            return 0.0
+    return _metric_float(value)
+
+
+def metric_column_values(metrics: Optional[Dict[str, Any]]) -> List[Optional[float]]:
+    """Typed values for ``METRIC_COLUMNS`` from a metrics dict."""
+    metrics = metrics or {}
+    return [
+        (passed_float if column == "passed" else _metric_float)(metrics.get(column))
+        for column in METRIC_COLUMNS
+    ]
+
+
+def encode_cursor(values: List[Any]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8"))
+    except (ValueError, UnicodeError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    if not isinstance(values, list):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return values
+
+
+def code_search_query(query: str, *, any_term: bool = False) -> str:
+    """Turn ``ts_regression anl10_*`` into a quoted FTS5 MATCH expression.
+
+    Each whitespace-separated term is matched as a token (or phrase when it
+    contains punctuation); a trailing ``*`` makes it a prefix match.  Terms
+    are ANDed unless *any_term* is set.
+    """
+    terms = []
+    for raw in query.split():
+        prefix = raw.endswith("*")
+        term = raw.rstrip("*").replace('"', '""')
+        if not term:
+            continue
+        terms.append(f'"{term}"' + ("*" if prefix else ""))
+    if not terms:
+        raise ValueError("Search query is empty.")
+    return (" OR " if any_term else " AND ").join(terms)
+
+
 def alpha_id_from_link(link: Optional[str]) -> Optional[str]:
     if not link:
         return None
@@ -57,6 +239,33 @@ def alpha_id_from_link(link: Optional[str]) -> Optional[str]:
     return match.group(1) if match else None
 
 
+def _setting_value(value: Any) -> Any:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return str(value).strip().upper()
+
+
+def simulation_settings(params: Optional[Dict[str, Any]], metrics: Optional[Dict[str, Any]] = None) -> Tuple[Tuple[str, Any], ...]:
+    """Comparable settings of a simulation, from *params* or else the settings echoed in *metrics*."""
+    params = params or {}
+    metrics = metrics or {}
+    values = []
+    for name, default in SIMULATION_SETTING_DEFAULTS.items():
+        value = params.get(name)
+        if value in (None, ""):
+            value = metrics.get(name)
+        if value in (None, ""):
+            value = default
+        values.append((name, _setting_value(value)))
+    return tuple(values)
+
+
+def simulation_key(params: Dict[str, Any]) -> Tuple[str, Tuple[Tuple[str, Any], ...]]:
+    """``(canonical_hash, settings)`` of simulation *params*: equal keys give equal results."""
+    return canonical_hash(str(params.get("code") or "")), simulation_settings(params)
+
+
 def metrics_from_row(row: List[Any]) -> Dict[str, Any]:
     def at(index: int, default: Any = None) -> Any:
         return row[index] if len(row) > index else default
@@ -78,11 +287,282 @@ def metrics_from_row(row: List[Any]) -> Dict[str, Any]:
     }
 
 
+class CodeVocabulary:
+    """Known dataset field and operator names, used to attribute code to aggregates."""
+
+    def __init__(self, fields: Iterable[str] = (), operators: Iterable[str] = ()):
+        self.fields = frozenset(fields)
+        self.operators = frozenset(operators)
+
+    def parse(self, code: str) -> Tuple[List[str], List[str]]:
+        """Return the distinct ``(fields, operators)`` referenced by *code*.
+
+        Calls count as operators when the name is in ``operators.json`` (any
+        call when that file is missing); bare names count as fields only when
+        they appear in a ``datasets/`` field list.
+        """
+        fields, operators = set(), set()
+        for name, call in _CODE_IDENTIFIER.findall(code or ""):
+            if call:
+                if not self.operators or name in self.operators:
+                    operators.add(name)
+            elif name in self.fields:
+                fields.add(name)
+        return sorted(fields), sorted(operators)
+
+
+def _vocabulary_signature(datasets_dir: str, operators_file: str) -> tuple:
+    entries = []
+    if os.path.isdir(datasets_dir):
+        for entry in os.scandir(datasets_dir):
+            if entry.name.endswith("_fields_formatted.csv"):
+                stat = entry.stat()
+                entries.append((entry.name, stat.st_mtime, stat.st_size))
+    try:
+        operators_mtime = os.stat(operators_file).st_mtime
+    except OSError:
+        operators_mtime = None
+    return (datasets_dir, operators_file, tuple(sorted(entries)), operators_mtime)
+
+
+def code_vocabulary(datasets_dir: str = DATASETS_DIR, operators_file: str = OPERATORS_FILE) -> CodeVocabulary:
+    """Load field names from ``datasets/`` and operator names, cached until those files change."""
+    signature = _vocabulary_signature(datasets_dir, operators_file)
+    with _VOCABULARY_LOCK:
+        if _VOCABULARY_CACHE["signature"] == signature:
+            return _VOCABULARY_CACHE["vocabulary"]
+        fields = set()
+        for name, _mtime, _size in signature[2]:
+            try:
+                with open(os.path.join(datasets_dir, name), "r", newline="", encoding="utf-8-sig") as fh:
+                    fields.update(row["Field"] for row in csv.DictReader(fh) if row.get("Field"))
+            except (OSError, KeyError, csv.Error):
+                continue
+        operators = set()
+        try:
+            with open(operators_file, "r", encoding="utf-8") as fh:
+                operators.update(
+                    item["name"] for item in json.load(fh)
+                    if isinstance(item, dict) and item.get("name")
+                )
+        except (OSError, ValueError, TypeError):
+            pass
+        vocabulary = CodeVocabulary(fields, operators)
+        _VOCABULARY_CACHE.update(signature=signature, vocabulary=vocabulary)
+        return vocabulary
+
+
+def _settled_until(conn: sqlite3.Connection, table: str, ts_column: str) -> Optional[str]:
+    """Newest *ts_column* value of *table* at least ``SYNC_SETTLE_SECONDS`` old (the next watermark)."""
+    cutoff = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(seconds=SYNC_SETTLE_SECONDS)
+    return conn.execute(
+        f"SELECT MAX({ts_column}) FROM {table} WHERE {ts_column} <= ?", (cutoff.isoformat(),)
+    ).fetchone()[0]
+
+
+def _stats_signature() -> str:
+    """What the stored aggregates were computed with; a mismatch on open triggers ``rebuild_stats``."""
+    return json.dumps({"bin_widths": STATS_BIN_WIDTHS, "metric_columns_version": METRIC_COLUMNS_VERSION}, sort_keys=True)
+
+
+class _StatsAccumulator:
+    """Collects aggregate deltas for a batch of simulations and upserts them at once."""
+
+    def __init__(self, vocabulary: CodeVocabulary):
+        self.vocabulary = vocabulary
+        self.totals: Dict[Tuple[str, str], List[float]] = {}
+        self.bins: Dict[Tuple[str, str, str, int], int] = {}
+
+    def add(self, code: str, template_id: Optional[str], metrics: Optional[Dict[str, Any]]) -> None:
+        values = dict(zip(METRIC_COLUMNS, metric_column_values(metrics)))
+        fields, operators = self.vocabulary.parse(code)
+        keys = [("field", name) for name in fields] + [("operator", name) for name in operators]
+        if template_id:
+            keys.append(("template", str(template_id)))
+        passed = values["passed"]
+        delta = [1, int(bool(passed and passed > 0)), passed or 0.0]
+        for metric in STATS_BIN_WIDTHS:
+            value = values[metric]
+            delta.extend((1, value, value * value) if value is not None else (0, 0.0, 0.0))
+        for key in keys:
+            total = self.totals.setdefault(key, [0] * len(STATS_SUM_COLUMNS))
+            for index, amount in enumerate(delta):
+                total[index] += amount
+            for metric, width in STATS_BIN_WIDTHS.items():
+                if values[metric] is not None:
+                    bin_key = (*key, metric, math.floor(values[metric] / width))
+                    self.bins[bin_key] = self.bins.get(bin_key, 0) + 1
+
+    def flush(self, conn: sqlite3.Connection) -> None:
+        if self.totals:
+            now = utc_now()
+            columns = ", ".join(STATS_SUM_COLUMNS)
+            placeholders = ", ".join("?" for _ in STATS_SUM_COLUMNS)
+            increments = ", ".join(f"{column} = {column} + excluded.{column}" for column in STATS_SUM_COLUMNS)
+            conn.executemany(
+                f"""
+                INSERT INTO alpha_stats (dimension, key, {columns}, updated_at)
+                VALUES (?, ?, {placeholders}, ?)
+                ON CONFLICT(dimension, key) DO UPDATE SET
+                    {increments},
+                    updated_at = excluded.updated_at
+                """,
+                [(*key, *total, now) for key, total in self.totals.items()],
+            )
+        if self.bins:
+            conn.executemany(
+                """
+                INSERT INTO alpha_stat_bins (dimension, key, metric, bin, count)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(dimension, key, metric, bin) DO UPDATE SET
+                    count = count + excluded.count
+                """,
+                [(*key, count) for key, count in self.bins.items()],
+            )
+        self.totals.clear()
+        self.bins.clear()
+
+
+def _histogram_quantiles(bins: List[Tuple[int, int]], width: float) -> Dict[str, Optional[float]]:
+    """Interpolated quantiles from ascending ``(bin, count)`` pairs."""
+    total = sum(count for _, count in bins)
+    result: Dict[str, Optional[float]] = {}
+    for quantile in STATS_QUANTILES:
+        name = f"p{int(quantile * 100)}"
+        result[name] = None
+        target = quantile * total
+        cumulative = 0
+        for bin_index, count in bins:
+            if count and cumulative + count >= target:
+                result[name] = round((bin_index + (target - cumulative) / count) * width, 4)
+                break
+            cumulative += count
+    return result
+
+
+def _sync_result_key(row: Dict[str, Any]) -> Tuple[bool, str, str]:
+    # Live runs beat imported results (as in import_simulation_rows), then
+    # the newer simulation wins; the ID makes the order total.
+    return (
+        bool(row.get("latest_simulation_id")) and row.get("latest_simulation_source") != "import",
+        row.get("latest_simulated_at") or "",
+        row.get("latest_simulation_id") or "",
+    )
+
+
+def _sync_decision_key(row: Dict[str, Any]) -> Tuple[bool, str]:
+    if row.get("status") not in ("promoted", "rejected"):
+        return (False, "")
+    return (True, row.get("promoted_at") or row.get("rejected_at") or "")
+
+
+def _merge_synced_alpha(local: Dict[str, Any], remote: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Merge two copies of the same alpha from different registries.
+
+    Every field is chosen by an order on the data itself, never by which
+    side is local, so nodes that exchange change-sets in any order converge:
+    the latest result and the status it implies come from the newer
+    simulation, a promote/reject decision beats any result and the later
+    decision wins, and ``created_at``/``updated_at`` take the min/max.
+    """
+    merged = dict(local)
+    result_side, other = (remote, local) if _sync_result_key(remote) > _sync_result_key(local) else (local, remote)
+    for column in _SYNC_RESULT_COLUMNS + ("latest_simulated_at", "latest_simulation_source"):
+        merged[column] = result_side.get(column)
+    merged["status"] = result_side.get("status")
+    if _sync_decision_key(local)[0] or _sync_decision_key(remote)[0]:
+        decided = remote if _sync_decision_key(remote) > _sync_decision_key(local) else local
+        for column in _SYNC_DECISION_COLUMNS:
+            merged[column] = decided.get(column)
+    merged["alpha_id"] = result_side.get("alpha_id") or other.get("alpha_id")
+    merged["template_id"] = result_side.get("template_id") or other.get("template_id")
+    first = remote if (remote["created_at"], remote.get("source") or "") < (local["created_at"], local.get("source") or "") else local
+    merged["source"] = first.get("source")
+    merged["created_at"] = first["created_at"]
+    merged["updated_at"] = max(local["updated_at"], remote["updated_at"])
+    return merged
+
+
+class _AlphaCache:
+    """
+    Bounded LRU of ``alphas`` rows keyed by alpha_hash, with an alpha_id alias map.
+
+    Entries are only valid for one ``PRAGMA data_version`` of a dedicated
+    connection.  That value changes whenever any other connection commits, in
+    this process or another, so every write invalidates the cache without
+    write paths having to know about it.
+    """
+
+    def __init__(self, db_path: str, capacity: int = ALPHA_CACHE_SIZE):
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._rows: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._ids: Dict[str, str] = {}
+        self._lock = Lock()
+        self._watch = sqlite3.connect(db_path, check_same_thread=False)
+        self._version: Optional[int] = None
+
+    def _sync_version(self) -> int:
+        version = self._watch.execute("PRAGMA data_version").fetchone()[0]
+        if version != self._version:
+            if self._rows:
+                self.invalidations += 1
+            self._rows.clear()
+            self._ids.clear()
+            self._version = version
+        return version
+
+    def lookup(self, identifier: str) -> Tuple[Optional[Dict[str, Any]], int]:
+        """Return ``(row, version)``; pass *version* to ``store`` after a miss."""
+        with self._lock:
+            version = self._sync_version()
+            alpha_hash = identifier if identifier in self._rows else self._ids.get(identifier)
+            if alpha_hash is None:
+                self.misses += 1
+                return None, version
+            self._rows.move_to_end(alpha_hash)
+            self.hits += 1
+            return self._rows[alpha_hash], version
+
+    def store(self, row: Dict[str, Any], version: int) -> None:
+        with self._lock:
+            # A commit between lookup and the read means *row* may be stale.
+            if self._sync_version() != version:
+                return
+            alpha_hash = row["alpha_hash"]
+            self._rows[alpha_hash] = row
+            self._rows.move_to_end(alpha_hash)
+            if row.get("alpha_id"):
+                self._ids[row["alpha_id"]] = alpha_hash
+            while len(self._rows) > self.capacity:
+                _, evicted = self._rows.popitem(last=False)
+                self._ids.pop(evicted.get("alpha_id"), None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "invalidations": self.invalidations,
+                "size": len(self._rows),
+                "capacity": self.capacity,
+            }
+
+
 class AlphaRegistry:
     def __init__(self, db_path: str = DEFAULT_DB_PATH):
         self.db_path = db_path
         os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._vocabulary: Optional[CodeVocabulary] = None
+        self._vocabulary_checked_at = 0.0
+        self._vocabulary_lock = Lock()
         self._ensure_schema()
+        self._cache = _AlphaCache(db_path)
 
     def _connect(self) -> sqlite3.Connection:
         conn = sqlite3.connect(self.db_path)
@@ -135,8 +615,9 @@ class AlphaRegistry:
                     FOREIGN KEY(alpha_hash) REFERENCES alphas(alpha_hash)
                 );
 
-                CREATE INDEX IF NOT EXISTS idx_simulations_alpha_hash
-                    ON simulations(alpha_hash);
+                DROP INDEX IF EXISTS idx_simulations_alpha_hash;
+                CREATE INDEX IF NOT EXISTS idx_simulations_alpha_keyset
+                    ON simulations(alpha_hash, created_at, simulation_id);
                 CREATE INDEX IF NOT EXISTS idx_simulations_job_id
                     ON simulations(job_id);
                 CREATE INDEX IF NOT EXISTS idx_simulations_status
@@ -152,12 +633,347 @@ class AlphaRegistry:
                     FOREIGN KEY(alpha_hash) REFERENCES alphas(alpha_hash)
                 );
 
-                CREATE INDEX IF NOT EXISTS idx_alpha_events_alpha_hash
-                    ON alpha_events(alpha_hash);
+                DROP INDEX IF EXISTS idx_alpha_events_alpha_hash;
+                DROP INDEX IF EXISTS idx_alpha_events_alpha_time;
+                CREATE INDEX IF NOT EXISTS idx_alpha_events_alpha_keyset
+                    ON alpha_events(alpha_hash, created_at, event_id);
                 CREATE INDEX IF NOT EXISTS idx_alpha_events_type
                     ON alpha_events(event_type);
+
+                CREATE INDEX IF NOT EXISTS idx_alphas_updated_at
+                    ON alphas(updated_at, alpha_hash);
+
+                CREATE TABLE IF NOT EXISTS alpha_enrichment (
+                    alpha_id TEXT NOT NULL,
+                    endpoint TEXT NOT NULL,
+                    alpha_hash TEXT,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    error TEXT,
+                    fetched_at TEXT NOT NULL,
+                    PRIMARY KEY(alpha_id, endpoint)
+                );
+
+                CREATE INDEX IF NOT EXISTS idx_simulations_created_at
+                    ON simulations(created_at, simulation_id);
+
+                CREATE TABLE IF NOT EXISTS alpha_exports (
+                    target TEXT NOT NULL,
+                    table_name TEXT NOT NULL,
+                    cursor TEXT NOT NULL,
+                    rows INTEGER NOT NULL,
+                    exported_at TEXT NOT NULL,
+                    PRIMARY KEY(target, table_name)
+                );
+
+                CREATE TABLE IF NOT EXISTS alpha_maintenance (
+                    run_at TEXT PRIMARY KEY,
+                    report_json TEXT NOT NULL
+                );
+
+                CREATE TABLE IF NOT EXISTS registry_meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                );
+
+                CREATE TABLE IF NOT EXISTS alpha_sync_files (
+                    node_id TEXT NOT NULL,
+                    file_name TEXT NOT NULL,
+                    records INTEGER NOT NULL,
+                    applied_at TEXT NOT NULL,
+                    PRIMARY KEY(node_id, file_name)
+                );
+
+                CREATE INDEX IF NOT EXISTS idx_alpha_events_created_at
+                    ON alpha_events(created_at, event_id);
+
+                CREATE TABLE IF NOT EXISTS alpha_imports (
+                    path TEXT PRIMARY KEY,
+                    file_size INTEGER NOT NULL,
+                    file_mtime REAL NOT NULL,
+                    rows_done INTEGER NOT NULL DEFAULT 0,
+                    imported INTEGER NOT NULL DEFAULT 0,
+                    duplicates INTEGER NOT NULL DEFAULT 0,
+                    invalid INTEGER NOT NULL DEFAULT 0,
+                    status TEXT NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    byte_offset INTEGER,
+                    prefix_hash TEXT
+                );
+                """
+            )
+            existing = {row["name"] for row in conn.execute("PRAGMA table_info(alpha_imports)")}
+            if "byte_offset" not in existing:
+                conn.execute("ALTER TABLE alpha_imports ADD COLUMN byte_offset INTEGER")
+                conn.execute("ALTER TABLE alpha_imports ADD COLUMN prefix_hash TEXT")
+
+        self._migrate_metric_columns()
+        self._migrate_canonical_hash()
+        self._migrate_sync_origin()
+        self._ensure_code_index()
+        self._ensure_stats_tables()
+
+    def _migrate_canonical_hash(self) -> None:
+        """Add ``canonical_hash`` to older registries and (re)compute it when the rules change."""
+        with self._connect() as conn:
+            existing = {row["name"] for row in conn.execute("PRAGMA table_info(alphas)")}
+            if "canonical_hash" not in existing:
+                conn.execute("ALTER TABLE alphas ADD COLUMN canonical_hash TEXT")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_alphas_canonical_hash ON alphas(canonical_hash)"
+            )
+            version = conn.execute(
+                "SELECT value FROM registry_meta WHERE key = 'canonical_version'"
+            ).fetchone()
+            if version is not None and version["value"] == str(CANONICAL_VERSION):
+                return
+            rows = conn.execute("SELECT alpha_hash, normalized_code FROM alphas")
+            while True:
+                batch = rows.fetchmany(METRIC_BACKFILL_BATCH_SIZE)
+                if not batch:
+                    break
+                conn.executemany(
+                    "UPDATE alphas SET canonical_hash = ? WHERE alpha_hash = ?",
+                    [(canonical_hash(row["normalized_code"]), row["alpha_hash"]) for row in batch],
+                )
+            conn.execute(
+                "INSERT OR REPLACE INTO registry_meta (key, value) VALUES ('canonical_version', ?)",
+                (str(CANONICAL_VERSION),),
+            )
+
+    def _migrate_sync_origin(self) -> None:
+        """
+        Add the columns that keep rows merged from other registries out of this one's change-sets.
+
+        Simulations and events record the ``origin_node`` they were synced
+        from.  An alpha records in ``synced_updated_at`` the ``updated_at`` it
+        was merged with when the sender already had every field; a later
+        local change moves ``updated_at`` past it.
+        """
+        with self._connect() as conn:
+            for table, column in (("alphas", "synced_updated_at"), ("simulations", "origin_node"),
+                                  ("alpha_events", "origin_node")):
+                if column not in {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}:
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} TEXT")
+
+    def _ensure_code_index(self) -> None:
+        """Create the FTS5 index over normalized_code and its sync triggers, building it once."""
+        with self._connect() as conn:
+            exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'alphas_fts'"
+            ).fetchone()
+            if exists is None:
+                try:
+                    # External-content table: the code lives only in alphas and
+                    # FTS rowids are alphas rowids, so joins are integer lookups.
+                    conn.execute(
+                        f"""
+                        CREATE VIRTUAL TABLE alphas_fts USING fts5(
+                            normalized_code,
+                            content = 'alphas',
+                            content_rowid = 'rowid',
+                            tokenize = "{CODE_FTS_TOKENIZER}",
+                            prefix = '2 4 6'
+                        )
+                        """
+                    )
+                except sqlite3.OperationalError:
+                    # SQLite built without FTS5: search_alphas falls back to LIKE.
+                    self.fts_enabled = False
+                    return
+                conn.execute("INSERT INTO alphas_fts (alphas_fts) VALUES ('rebuild')")
+            self.fts_enabled = True
+            conn.executescript(
+                """
+                CREATE TRIGGER IF NOT EXISTS alphas_fts_insert AFTER INSERT ON alphas BEGIN
+                    INSERT INTO alphas_fts (rowid, normalized_code)
+                    VALUES (new.rowid, new.normalized_code);
+                END;
+
+                CREATE TRIGGER IF NOT EXISTS alphas_fts_delete AFTER DELETE ON alphas BEGIN
+                    INSERT INTO alphas_fts (alphas_fts, rowid, normalized_code)
+                    VALUES ('delete', old.rowid, old.normalized_code);
+                END;
+
+                CREATE TRIGGER IF NOT EXISTS alphas_fts_update AFTER UPDATE OF normalized_code ON alphas BEGIN
+                    INSERT INTO alphas_fts (alphas_fts, rowid, normalized_code)
+                    VALUES ('delete', old.rowid, old.normalized_code);
+                    INSERT INTO alphas_fts (rowid, normalized_code)
+                    VALUES (new.rowid, new.normalized_code);
+                END;
+                """
+            )
+
+    def rebuild_code_index(self) -> None:
+        """Rebuild the code index from alphas (e.g. after VACUUM renumbered rowids)."""
+        if self.fts_enabled:
+            with self._connect() as conn:
+                conn.execute("INSERT INTO alphas_fts (alphas_fts) VALUES ('rebuild')")
+
+    def _ensure_stats_tables(self) -> None:
+        """Create the aggregate tables; a registry that predates them is backfilled once."""
+        with self._connect() as conn:
+            exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'alpha_stats'"
+            ).fetchone()
+            sums = ",\n".join(
+                f"                    {column} {'INTEGER' if column in ('simulations', 'passes') else 'REAL'} "
+                "NOT NULL DEFAULT 0"
+                for column in STATS_SUM_COLUMNS
+            )
+            conn.executescript(
+                f"""
+                CREATE TABLE IF NOT EXISTS alpha_stats (
+                    dimension TEXT NOT NULL,
+                    key TEXT NOT NULL,
+{sums},
+                    updated_at TEXT NOT NULL,
+                    PRIMARY KEY(dimension, key)
+                );
+
+                CREATE TABLE IF NOT EXISTS alpha_stat_bins (
+                    dimension TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    metric TEXT NOT NULL,
+                    bin INTEGER NOT NULL,
+                    count INTEGER NOT NULL,
+                    PRIMARY KEY(dimension, key, metric, bin)
+                ) WITHOUT ROWID;
+                """
+            )
+            widths = conn.execute(
+                "SELECT value FROM registry_meta WHERE key = 'stats_bin_widths'"
+            ).fetchone()
+        # Bins are stored as indexes, so a width change needs a rebuild too, as does a change
+        # to how metrics are typed (e.g. PASS/FAIL counting towards passes).
+        if exists is None or widths is None or widths["value"] != _stats_signature():
+            self.rebuild_stats()
+
+    def code_vocabulary(self) -> CodeVocabulary:
+        """``code_vocabulary()``, checked for changed files at most every ``VOCABULARY_CHECK_SECONDS``."""
+        with self._vocabulary_lock:
+            now = time.monotonic()
+            if self._vocabulary is None or now - self._vocabulary_checked_at >= VOCABULARY_CHECK_SECONDS:
+                self._vocabulary = code_vocabulary()
+                self._vocabulary_checked_at = now
+            return self._vocabulary
+
+    def invalidate_vocabulary(self) -> None:
+        """Re-read the vocabulary on next use (e.g. after dataset field lists were refreshed)."""
+        with self._vocabulary_lock:
+            self._vocabulary = None
+
+    def rebuild_stats(self) -> int:
+        """Recompute the aggregate tables from every completed simulation."""
+        self.invalidate_vocabulary()
+        accumulator = _StatsAccumulator(self.code_vocabulary())
+        count = 0
+        with self._connect() as conn:
+            conn.execute("DELETE FROM alpha_stats")
+            conn.execute("DELETE FROM alpha_stat_bins")
+            rows = conn.execute(
+                """
+                SELECT a.code, a.template_id, s.metrics_json
+                FROM simulations s JOIN alphas a ON a.alpha_hash = s.alpha_hash
+                WHERE s.status = 'done'
                 """
             )
+            while True:
+                batch = rows.fetchmany(METRIC_BACKFILL_BATCH_SIZE)
+                if not batch:
+                    break
+                for row in batch:
+                    accumulator.add(row["code"], row["template_id"], _json_loads(row["metrics_json"], {}))
+                count += len(batch)
+            accumulator.flush(conn)
+            conn.execute(
+                "INSERT OR REPLACE INTO registry_meta (key, value) VALUES ('stats_bin_widths', ?)",
+                (_stats_signature(),),
+            )
+        return count
+
+    def _migrate_metric_columns(self) -> None:
+        """Add typed metric columns to older registries and (re)fill them from JSON when their typing changes."""
+        with self._connect() as conn:
+            existing = {row["name"] for row in conn.execute("PRAGMA table_info(alphas)")}
+            added = [column for column in METRIC_COLUMNS if column not in existing]
+            for column in added:
+                conn.execute(f"ALTER TABLE alphas ADD COLUMN {column} REAL")
+            for column in METRIC_COLUMNS:
+                conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_alphas_{column} ON alphas({column}, alpha_hash)"
+                )
+            for column in ("sharpe", "fitness"):
+                conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_alphas_status_{column} "
+                    f"ON alphas(status, {column}, alpha_hash)"
+                )
+            version = conn.execute(
+                "SELECT value FROM registry_meta WHERE key = 'metric_columns_version'"
+            ).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO registry_meta (key, value) VALUES ('metric_columns_version', ?)",
+                (str(METRIC_COLUMNS_VERSION),),
+            )
+            if not added and version is not None and version["value"] == str(METRIC_COLUMNS_VERSION):
+                return
+            assignments = ", ".join(f"{column} = ?" for column in METRIC_COLUMNS)
+            rows = conn.execute(
+                "SELECT alpha_hash, latest_metrics_json FROM alphas WHERE latest_metrics_json IS NOT NULL"
+            )
+            while True:
+                batch = rows.fetchmany(METRIC_BACKFILL_BATCH_SIZE)
+                if not batch:
+                    break
+                conn.executemany(
+                    f"UPDATE alphas SET {assignments} WHERE alpha_hash = ?",
+                    [
+                        (*metric_column_values(_json_loads(row["latest_metrics_json"], {})), row["alpha_hash"])
+                        for row in batch
+                    ],
+                )
+
+    def simulated_results(
+        self,
+        keys: Iterable[Tuple[str, Tuple[Tuple[str, Any], ...]]],
+    ) -> Dict[Tuple[str, Tuple[Tuple[str, Any], ...]], Dict[str, Any]]:
+        """
+        Latest completed result for each ``simulation_key`` in *keys*.
+
+        Matches any registered alpha with the same canonical hash, not just
+        the same code text, and simulations whose settings equal the key's
+        (imported results are compared by the settings in their metrics).
+        """
+        wanted = set(keys)
+        hashes = list({key[0] for key in wanted})
+        results: Dict[Tuple[str, Tuple[Tuple[str, Any], ...]], Dict[str, Any]] = {}
+        with self._connect() as conn:
+            for start in range(0, len(hashes), SQL_IN_CHUNK_SIZE):
+                chunk = hashes[start:start + SQL_IN_CHUNK_SIZE]
+                for row in conn.execute(
+                    f"""
+                    SELECT a.canonical_hash, a.code, s.alpha_hash, s.simulation_id, s.params_json,
+                           s.metrics_json, s.result_link, s.completed_at
+                    FROM alphas a JOIN simulations s ON s.alpha_hash = a.alpha_hash
+                    WHERE a.canonical_hash IN ({", ".join("?" for _ in chunk)}) AND s.status = 'done'
+                    """,
+                    chunk,
+                ):
+                    metrics = _json_loads(row["metrics_json"], {}) or {}
+                    key = (row["canonical_hash"], simulation_settings(_json_loads(row["params_json"], {}), metrics))
+                    if key not in wanted:
+                        continue
+                    previous = results.get(key)
+                    if previous is None or (row["completed_at"] or "") > (previous["completed_at"] or ""):
+                        results[key] = {
+                            "alpha_hash": row["alpha_hash"],
+                            "code": row["code"],
+                            "simulation_id": row["simulation_id"],
+                            "metrics": metrics,
+                            "result_link": row["result_link"],
+                            "completed_at": row["completed_at"],
+                        }
+        return results
 
     def register_alpha(
         self,
@@ -184,15 +1000,16 @@ class AlphaRegistry:
                 conn.execute(
                     """
                     INSERT INTO alphas (
-                        alpha_hash, alpha_id, code, normalized_code, source,
+                        alpha_hash, alpha_id, code, normalized_code, canonical_hash, source,
                         template_id, status, created_at, updated_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                     """,
                     (
                         alpha_hash,
                         alpha_id,
                         code,
                         normalized,
+                        canonical_hash(normalized),
                         source or "unknown",
                         template_id,
                         status,
@@ -246,6 +1063,84 @@ class AlphaRegistry:
             )
         return alpha
 
+    def record_queued_many(self, items: Iterable[Dict[str, Any]], *, job_id: str) -> int:
+        """Register a chunk of queued params in one transaction.
+
+        Mirrors ``record_queued`` per item (``created`` for new alphas, one
+        ``queued`` event per item) but uses a single connection and
+        ``executemany`` so large enqueues do not open connections per alpha.
+        """
+        now = utc_now()
+        alpha_rows: Dict[str, tuple] = {}
+        queued: List[tuple] = []
+        for params in items:
+            params = params or {}
+            code = str(params.get("code", "")).strip()
+            normalized = normalize_code(code)
+            if not normalized:
+                continue
+            alpha_hash = alpha_hash_for_code(normalized)
+            source = params.get("source", "queued") or "unknown"
+            template_id = params.get("template_id")
+            if alpha_hash not in alpha_rows:
+                alpha_rows[alpha_hash] = (
+                    alpha_hash, code, normalized, canonical_hash(normalized), source, template_id, now, now,
+                )
+            queued.append((alpha_hash, {"job_id": job_id, "params": params}))
+        if not queued:
+            return 0
+
+        with self._connect() as conn:
+            existing = set()
+            hashes = list(alpha_rows)
+            for start in range(0, len(hashes), SQL_IN_CHUNK_SIZE):
+                chunk = hashes[start:start + SQL_IN_CHUNK_SIZE]
+                placeholders = ", ".join("?" for _ in chunk)
+                existing.update(
+                    row["alpha_hash"]
+                    for row in conn.execute(
+                        f"SELECT alpha_hash FROM alphas WHERE alpha_hash IN ({placeholders})",
+                        chunk,
+                    )
+                )
+            conn.executemany(
+                """
+                INSERT INTO alphas (
+                    alpha_hash, code, normalized_code, canonical_hash, source, template_id,
+                    status, created_at, updated_at
+                ) VALUES (?, ?, ?, ?, ?, ?, 'candidate', ?, ?)
+                ON CONFLICT(alpha_hash) DO UPDATE SET
+                    updated_at = excluded.updated_at,
+                    template_id = COALESCE(alphas.template_id, excluded.template_id),
+                    source = CASE
+                        WHEN alphas.source = 'unknown' THEN excluded.source
+                        ELSE alphas.source
+                    END
+                """,
+                alpha_rows.values(),
+            )
+            events = [
+                (
+                    uuid.uuid4().hex, alpha_hash, "created", None,
+                    _json_dumps({"source": row[4], "template_id": row[5]}), now,
+                )
+                for alpha_hash, row in alpha_rows.items()
+                if alpha_hash not in existing
+            ]
+            events.extend(
+                (uuid.uuid4().hex, alpha_hash, "queued", None, _json_dumps(payload), now)
+                for alpha_hash, payload in queued
+            )
+            conn.executemany(
+                """
+                INSERT INTO alpha_events (
+                    event_id, alpha_hash, event_type, reason, payload_json, created_at
+                ) VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                events,
+            )
+        return len(queued)
+
     def record_simulation(
         self,
         code: str,
@@ -306,6 +1201,11 @@ class AlphaRegistry:
                     latest_simulation_id = ?,
                     latest_metrics_json = ?,
                     latest_result_link = COALESCE(?, latest_result_link),
+                    sharpe = ?,
+                    fitness = ?,
+                    turnover = ?,
+                    subsharpe = ?,
+                    passed = ?,
                     updated_at = ?
                 WHERE alpha_hash = ?
                 """,
@@ -315,6 +1215,7 @@ class AlphaRegistry:
                     simulation_id,
                     _json_dumps(metrics or {}),
                     result_link,
+                    *metric_column_values(metrics),
                     now,
                     alpha["alpha_hash"],
                 ),
@@ -332,6 +1233,10 @@ class AlphaRegistry:
                     "result_link": result_link,
                 },
             )
+            if status == "done":
+                accumulator = _StatsAccumulator(self.code_vocabulary())
+                accumulator.add(alpha["code"], alpha.get("template_id"), metrics)
+                accumulator.flush(conn)
         return self.get_alpha(alpha["alpha_hash"]) or {}
 
     def record_simulation_row(
@@ -352,6 +1257,401 @@ class AlphaRegistry:
             result_link=result_link,
         )
 
+    def import_checkpoint(self, path: str) -> Optional[Dict[str, Any]]:
+        """Return the ``alpha_imports`` progress row for *path*, if any."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM alpha_imports WHERE path = ?", (path,)).fetchone()
+        return dict(row) if row else None
+
+    def clear_import_checkpoint(self, path: str) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM alpha_imports WHERE path = ?", (path,))
+
+    def import_simulation_rows(
+        self,
+        rows: Iterable[List[Any]],
+        *,
+        source_file: Optional[str] = None,
+        checkpoint: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, int]:
+        """Bulk-load historical result rows (``SIM_CSV_HEADER`` layout) in one transaction.
+
+        A row is a duplicate when its alpha already has a simulation with the
+        same result link, so re-importing a file is a no-op.  Imported
+        simulations only become an alpha's latest result when it has none
+        from a live run.  *checkpoint* (``path``, ``file_size``,
+        ``file_mtime``, ``rows_done``, ``byte_offset``, ``prefix_hash``,
+        ``status``) is written in the same
+        transaction so an interrupted import resumes after the last chunk.
+        """
+        now = utc_now()
+        counts = {"imported": 0, "duplicates": 0, "invalid": 0}
+        parsed: List[Dict[str, Any]] = []
+        for row in rows:
+            code = str(row[14] or "") if len(row) > 14 else ""
+            normalized = normalize_code(code)
+            if not normalized:
+                counts["invalid"] += 1
+                continue
+            link = str(row[13] or "").strip() if len(row) > 13 else ""
+            parsed.append({
+                "alpha_hash": alpha_hash_for_code(normalized),
+                "code": code.strip(),
+                "normalized": normalized,
+                "link": link or None,
+                "alpha_id": alpha_id_from_link(link),
+                "metrics": metrics_from_row(row),
+            })
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute(f"PRAGMA cache_size = -{IMPORT_CACHE_KIB}")
+            hashes = list({item["alpha_hash"] for item in parsed})
+            known_alphas: Dict[str, Optional[str]] = {}
+            templates: Dict[str, Optional[str]] = {}
+            seen = set()
+            for start in range(0, len(hashes), SQL_IN_CHUNK_SIZE):
+                chunk = hashes[start:start + SQL_IN_CHUNK_SIZE]
+                placeholders = ", ".join("?" for _ in chunk)
+                for row in conn.execute(
+                    f"SELECT alpha_hash, alpha_id, template_id FROM alphas WHERE alpha_hash IN ({placeholders})",
+                    chunk,
+                ):
+                    known_alphas[row["alpha_hash"]] = row["alpha_id"]
+                    templates[row["alpha_hash"]] = row["template_id"]
+                seen.update(
+                    (row["alpha_hash"], row["result_link"])
+                    for row in conn.execute(
+                        f"SELECT alpha_hash, result_link FROM simulations WHERE alpha_hash IN ({placeholders})",
+                        chunk,
+                    )
+                )
+
+            # alpha_id is UNIQUE: only attach IDs that no other alpha holds.
+            claimed_ids: Dict[str, str] = {}
+            ids = list({item["alpha_id"] for item in parsed if item["alpha_id"]})
+            for start in range(0, len(ids), SQL_IN_CHUNK_SIZE):
+                chunk = ids[start:start + SQL_IN_CHUNK_SIZE]
+                placeholders = ", ".join("?" for _ in chunk)
+                for row in conn.execute(
+                    f"SELECT alpha_id, alpha_hash FROM alphas WHERE alpha_id IN ({placeholders})",
+                    chunk,
+                ):
+                    claimed_ids[row["alpha_id"]] = row["alpha_hash"]
+
+            new_alphas: Dict[str, Dict[str, Any]] = {}
+            simulations: List[tuple] = []
+            events: List[tuple] = []
+            latest: Dict[str, Dict[str, Any]] = {}
+            accumulator = _StatsAccumulator(self.code_vocabulary())
+            for item in parsed:
+                alpha_hash = item["alpha_hash"]
+                key = (alpha_hash, item["link"])
+                if key in seen:
+                    counts["duplicates"] += 1
+                    continue
+                seen.add(key)
+                alpha_id = item["alpha_id"]
+                if alpha_id and claimed_ids.setdefault(alpha_id, alpha_hash) != alpha_hash:
+                    alpha_id = None
+                if alpha_hash not in known_alphas and alpha_hash not in new_alphas:
+                    new_alphas[alpha_hash] = item
+                    events.append((
+                        uuid.uuid4().hex, alpha_hash, "created", None,
+                        _json_dumps({"source": "import"}), now,
+                    ))
+                simulation_id = uuid.uuid4().hex
+                metrics_json = _json_dumps(item["metrics"])
+                simulations.append((
+                    simulation_id, alpha_hash, item["alpha_id"], "done", "{}",
+                    metrics_json, item["link"], now, now,
+                ))
+                events.append((
+                    uuid.uuid4().hex, alpha_hash, "imported", None,
+                    _json_dumps({
+                        "simulation_id": simulation_id,
+                        "file": source_file,
+                        "result_link": item["link"],
+                    }),
+                    now,
+                ))
+                previous = latest.get(alpha_hash)
+                latest[alpha_hash] = {
+                    "alpha_id": (previous or {}).get("alpha_id") or alpha_id,
+                    "values": (
+                        simulation_id, metrics_json, item["link"],
+                        *metric_column_values(item["metrics"]),
+                    ),
+                }
+                accumulator.add(item["code"], templates.get(alpha_hash), item["metrics"])
+                counts["imported"] += 1
+
+            # New alphas are inserted with their latest result in place; only
+            # alphas that already existed need the (index-heavy) UPDATE.
+            conn.executemany(
+                f"""
+                INSERT INTO alphas (
+                    alpha_hash, alpha_id, code, normalized_code, canonical_hash, source, status,
+                    latest_simulation_id, latest_metrics_json, latest_result_link,
+                    {", ".join(METRIC_COLUMNS)}, created_at, updated_at
+                ) VALUES (?, ?, ?, ?, ?, 'import', 'simulated', ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    (
+                        alpha_hash, latest[alpha_hash]["alpha_id"], item["code"], item["normalized"],
+                        canonical_hash(item["normalized"]),
+                        *latest[alpha_hash]["values"], now, now,
+                    )
+                    for alpha_hash, item in new_alphas.items()
+                ),
+            )
+            conn.executemany(
+                """
+                INSERT INTO simulations (
+                    simulation_id, alpha_hash, alpha_id, job_id, status,
+                    params_json, metrics_json, result_link, error, source,
+                    created_at, completed_at
+                ) VALUES (?, ?, ?, NULL, ?, ?, ?, ?, NULL, 'import', ?, ?)
+                """,
+                simulations,
+            )
+            conn.executemany(
+                """
+                UPDATE alphas
+                SET alpha_id = COALESCE(alpha_id, ?),
+                    status = CASE
+                        WHEN status IN ('promoted', 'rejected', 'simulated') THEN status
+                        ELSE 'simulated'
+                    END,
+                    latest_simulation_id = ?,
+                    latest_metrics_json = ?,
+                    latest_result_link = COALESCE(?, latest_result_link),
+                    sharpe = ?,
+                    fitness = ?,
+                    turnover = ?,
+                    subsharpe = ?,
+                    passed = ?,
+                    updated_at = ?
+                WHERE alpha_hash = ?
+                  AND (
+                    latest_simulation_id IS NULL
+                    OR EXISTS (
+                        SELECT 1 FROM simulations s
+                        WHERE s.simulation_id = alphas.latest_simulation_id
+                          AND s.source = 'import'
+                    )
+                  )
+                """,
+                (
+                    (state["alpha_id"], *state["values"], now, alpha_hash)
+                    for alpha_hash, state in latest.items()
+                    if alpha_hash not in new_alphas
+                ),
+            )
+            conn.executemany(
+                """
+                INSERT INTO alpha_events (
+                    event_id, alpha_hash, event_type, reason, payload_json, created_at
+                ) VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                events,
+            )
+            accumulator.flush(conn)
+            if checkpoint:
+                conn.execute(
+                    """
+                    INSERT INTO alpha_imports (
+                        path, file_size, file_mtime, rows_done, imported,
+                        duplicates, invalid, status, updated_at, byte_offset, prefix_hash
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(path) DO UPDATE SET
+                        file_size = excluded.file_size,
+                        file_mtime = excluded.file_mtime,
+                        rows_done = excluded.rows_done,
+                        byte_offset = excluded.byte_offset,
+                        prefix_hash = excluded.prefix_hash,
+                        imported = alpha_imports.imported + excluded.imported,
+                        duplicates = alpha_imports.duplicates + excluded.duplicates,
+                        invalid = alpha_imports.invalid + excluded.invalid,
+                        status = excluded.status,
+                        updated_at = excluded.updated_at
+                    """,
+                    (
+                        checkpoint["path"],
+                        checkpoint["file_size"],
+                        checkpoint["file_mtime"],
+                        checkpoint["rows_done"],
+                        counts["imported"],
+                        counts["duplicates"],
+                        counts["invalid"],
+                        checkpoint.get("status", "running"),
+                        now,
+                        checkpoint.get("byte_offset"),
+                        checkpoint.get("prefix_hash"),
+                    ),
+                )
+        return counts
+
+    def pending_enrichment(
+        self,
+        endpoints: Iterable[str],
+        *,
+        limit: int = 100,
+        max_attempts: int = 3,
+    ) -> List[Dict[str, Any]]:
+        """Simulated alphas with an ``alpha_id`` that still miss some *endpoints*.
+
+        An endpoint counts as missing until it is fetched successfully or has
+        failed ``max_attempts`` times.  Newest alphas come first.
+        """
+        endpoints = list(endpoints)
+        if not endpoints:
+            return []
+        missing_clause = " OR ".join(
+            """
+            NOT EXISTS (
+                SELECT 1 FROM alpha_enrichment e
+                WHERE e.alpha_id = a.alpha_id AND e.endpoint = ?
+                  AND (e.status = 'done' OR e.attempts >= ?)
+            )
+            """
+            for _ in endpoints
+        )
+        values: List[Any] = []
+        for endpoint in endpoints:
+            values.extend([endpoint, max_attempts])
+        values.append(max(int(limit), 1))
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT a.alpha_hash, a.alpha_id FROM alphas a
+                WHERE a.alpha_id IS NOT NULL
+                  AND a.status IN ('simulated', 'promoted')
+                  AND ({missing_clause})
+                ORDER BY a.updated_at DESC
+                LIMIT ?
+                """,
+                values,
+            ).fetchall()
+            state = self._enrichment_state_conn(conn, [row["alpha_id"] for row in rows])
+        pending = []
+        for row in rows:
+            done = state.get(row["alpha_id"], {})
+            pending.append({
+                "alpha_hash": row["alpha_hash"],
+                "alpha_id": row["alpha_id"],
+                "endpoints": [
+                    endpoint for endpoint in endpoints
+                    if endpoint not in done
+                    or (done[endpoint]["status"] != "done" and done[endpoint]["attempts"] < max_attempts)
+                ],
+            })
+        return pending
+
+    def enrichment_state(self, alpha_ids: Iterable[str]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Return ``{alpha_id: {endpoint: {status, attempts, error, fetched_at}}}``."""
+        with self._connect() as conn:
+            return self._enrichment_state_conn(conn, list(alpha_ids))
+
+    def _enrichment_state_conn(self, conn: sqlite3.Connection, alpha_ids: List[str]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        state: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for start in range(0, len(alpha_ids), SQL_IN_CHUNK_SIZE):
+            chunk = alpha_ids[start:start + SQL_IN_CHUNK_SIZE]
+            placeholders = ", ".join("?" for _ in chunk)
+            for row in conn.execute(
+                f"""
+                SELECT alpha_id, endpoint, status, attempts, error, fetched_at
+                FROM alpha_enrichment WHERE alpha_id IN ({placeholders})
+                """,
+                chunk,
+            ):
+                state.setdefault(row["alpha_id"], {})[row["endpoint"]] = {
+                    "status": row["status"],
+                    "attempts": row["attempts"],
+                    "error": row["error"],
+                    "fetched_at": row["fetched_at"],
+                }
+        return state
+
+    def record_enrichment(
+        self,
+        alpha_id: str,
+        endpoint: str,
+        *,
+        metrics: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        """
+        Record one enrichment fetch and merge its metrics into ``latest_metrics``.
+
+        The alpha (and its ``updated_at``) is only written, and an ``enriched``
+        event added, when the merged metrics differ from the stored ones.
+        """
+        now = utc_now()
+        status = "failed" if error else "done"
+        with self._connect() as conn:
+            alpha = conn.execute(
+                "SELECT alpha_hash, latest_metrics_json FROM alphas WHERE alpha_id = ?",
+                (alpha_id,),
+            ).fetchone()
+            alpha_hash = alpha["alpha_hash"] if alpha else None
+            conn.execute(
+                """
+                INSERT INTO alpha_enrichment (
+                    alpha_id, endpoint, alpha_hash, status, attempts, error, fetched_at
+                ) VALUES (?, ?, ?, ?, 1, ?, ?)
+                ON CONFLICT(alpha_id, endpoint) DO UPDATE SET
+                    alpha_hash = COALESCE(excluded.alpha_hash, alpha_enrichment.alpha_hash),
+                    status = excluded.status,
+                    attempts = alpha_enrichment.attempts + 1,
+                    error = excluded.error,
+                    fetched_at = excluded.fetched_at
+                """,
+                (alpha_id, endpoint, alpha_hash, status, error, now),
+            )
+            if alpha is None or error or not metrics:
+                return
+            stored = _json_loads(alpha["latest_metrics_json"], {})
+            latest = {**stored, **metrics}
+            if latest == stored:
+                return
+            conn.execute(
+                f"""
+                UPDATE alphas
+                SET latest_metrics_json = ?,
+                    {", ".join(f"{column} = ?" for column in METRIC_COLUMNS)},
+                    updated_at = ?
+                WHERE alpha_hash = ?
+                """,
+                (_json_dumps(latest), *metric_column_values(latest), now, alpha_hash),
+            )
+            self._add_event_conn(
+                conn,
+                alpha_hash,
+                "enriched",
+                payload={"endpoint": endpoint, "metrics": sorted(metrics)},
+            )
+
+    def jobs_for_alpha_ids(self, alpha_ids: Iterable[str]) -> List[str]:
+        """Job ids whose simulations produced any of *alpha_ids*."""
+        alpha_ids = list(alpha_ids)
+        job_ids: set = set()
+        with self._connect() as conn:
+            for start in range(0, len(alpha_ids), SQL_IN_CHUNK_SIZE):
+                chunk = alpha_ids[start:start + SQL_IN_CHUNK_SIZE]
+                placeholders = ", ".join("?" for _ in chunk)
+                job_ids.update(
+                    row["job_id"]
+                    for row in conn.execute(
+                        f"""
+                        SELECT DISTINCT job_id FROM simulations
+                        WHERE alpha_id IN ({placeholders}) AND job_id IS NOT NULL
+                        """,
+                        chunk,
+                    )
+                )
+        return sorted(job_ids)
+
     def promote(self, identifier: str, *, reason: Optional[str] = None) -> Optional[Dict[str, Any]]:
         return self._set_status(identifier, "promoted", "promoted", reason=reason)
 
@@ -413,80 +1713,590 @@ class AlphaRegistry:
         source: Optional[str] = None,
         min_sharpe: Optional[float] = None,
         min_fitness: Optional[float] = None,
+        min_subsharpe: Optional[float] = None,
+        min_passed: Optional[float] = None,
+        max_turnover: Optional[float] = None,
+        order_by: str = "updated_at",
+        descending: bool = True,
+        after: Optional[str] = None,
         limit: int = 50,
     ) -> List[Dict[str, Any]]:
+        """List alphas filtered and ordered in SQL.
+
+        Ordering by a metric skips alphas without that metric.  *after* is a
+        cursor from ``list_cursor`` for the last row of the previous page;
+        rows continue strictly after it (keyset pagination).
+        """
+        if order_by not in ORDER_COLUMNS:
+            raise ValueError(f"Cannot order by {order_by!r}; choose from {', '.join(ORDER_COLUMNS)}.")
+        clauses, values = self._filter_clauses(
+            status=status,
+            source=source,
+            min_sharpe=min_sharpe,
+            min_fitness=min_fitness,
+            min_subsharpe=min_subsharpe,
+            min_passed=min_passed,
+            max_turnover=max_turnover,
+        )
+        if order_by in METRIC_COLUMNS:
+            clauses.append(f"{order_by} IS NOT NULL")
+        if after:
+            clauses.append(f"({order_by}, alpha_hash) {'<' if descending else '>'} (?, ?)")
+            values.extend(decode_cursor(after))
+
+        direction = "DESC" if descending else "ASC"
+        sql = "SELECT * FROM alphas"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY {order_by} {direction}, alpha_hash {direction} LIMIT ?"
+        values.append(max(int(limit), 1))
+
+        with self._connect() as conn:
+            return [self._alpha_row_to_dict(row) for row in conn.execute(sql, values).fetchall()]
+
+    @staticmethod
+    def _filter_clauses(
+        *,
+        status: Optional[str] = None,
+        source: Optional[str] = None,
+        min_sharpe: Optional[float] = None,
+        min_fitness: Optional[float] = None,
+        min_subsharpe: Optional[float] = None,
+        min_passed: Optional[float] = None,
+        max_turnover: Optional[float] = None,
+        table: str = "",
+    ) -> Tuple[List[str], List[Any]]:
+        prefix = f"{table}." if table else ""
         clauses: List[str] = []
         values: List[Any] = []
         if status:
-            clauses.append("status = ?")
+            clauses.append(f"{prefix}status = ?")
             values.append(status)
         if source:
-            clauses.append("source = ?")
+            clauses.append(f"{prefix}source = ?")
             values.append(source)
+        for column, op, bound in (
+            ("sharpe", ">=", min_sharpe),
+            ("fitness", ">=", min_fitness),
+            ("subsharpe", ">=", min_subsharpe),
+            ("passed", ">=", min_passed),
+            ("turnover", "<=", max_turnover),
+        ):
+            if bound is not None:
+                clauses.append(f"{prefix}{column} {op} ?")
+                values.append(float(bound))
+        return clauses, values
 
-        sql = "SELECT * FROM alphas"
-        if clauses:
-            sql += " WHERE " + " AND ".join(clauses)
-        sql += " ORDER BY updated_at DESC"
+    def search_alphas(
+        self,
+        query: str,
+        *,
+        any_term: bool = False,
+        status: Optional[str] = None,
+        source: Optional[str] = None,
+        min_sharpe: Optional[float] = None,
+        min_fitness: Optional[float] = None,
+        min_subsharpe: Optional[float] = None,
+        min_passed: Optional[float] = None,
+        max_turnover: Optional[float] = None,
+        order_by: str = "recent",
+        limit: int = 50,
+    ) -> List[Dict[str, Any]]:
+        """Find alphas whose code contains operator/field tokens.
 
+        ``order_by="recent"`` (newest registered first) stops after *limit*
+        matches and is the fastest; ``"rank"`` sorts by FTS relevance and any
+        ``ORDER_COLUMNS`` value sorts descending by that column.
+        """
+        if order_by not in SEARCH_ORDERS and order_by not in ORDER_COLUMNS:
+            raise ValueError(
+                f"Cannot order by {order_by!r}; choose from {', '.join(SEARCH_ORDERS + ORDER_COLUMNS)}."
+            )
+        clauses, values = self._filter_clauses(
+            status=status,
+            source=source,
+            min_sharpe=min_sharpe,
+            min_fitness=min_fitness,
+            min_subsharpe=min_subsharpe,
+            min_passed=min_passed,
+            max_turnover=max_turnover,
+            table="a",
+        )
+        if self.fts_enabled:
+            match = code_search_query(query, any_term=any_term)
+            sql = (
+                "SELECT a.* FROM alphas_fts f JOIN alphas a ON a.rowid = f.rowid "
+                "WHERE alphas_fts MATCH ?"
+            )
+            values.insert(0, match)
+            recent_order = "f.rowid DESC"
+            rank_order = "f.rank"
+        else:
+            terms = [term.rstrip("*") for term in query.split() if term.rstrip("*")]
+            if not terms:
+                raise ValueError("Search query is empty.")
+            likes = ["a.normalized_code LIKE ? ESCAPE '\\'" for _ in terms]
+            sql = "SELECT a.* FROM alphas a WHERE (" + (" OR " if any_term else " AND ").join(likes) + ")"
+            escaped = [term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") for term in terms]
+            values[0:0] = [f"%{term}%" for term in escaped]
+            recent_order = rank_order = "a.rowid DESC"
+        if clauses:
+            sql += " AND " + " AND ".join(clauses)
+        if order_by == "recent":
+            sql += f" ORDER BY {recent_order}"
+        elif order_by == "rank":
+            sql += f" ORDER BY {rank_order}"
+        else:
+            if order_by in METRIC_COLUMNS:
+                sql += f" AND a.{order_by} IS NOT NULL"
+            sql += f" ORDER BY a.{order_by} DESC, a.alpha_hash DESC"
+        sql += " LIMIT ?"
+        values.append(max(int(limit), 1))
         with self._connect() as conn:
-            rows = [self._alpha_row_to_dict(row) for row in conn.execute(sql, values).fetchall()]
+            return [self._alpha_row_to_dict(row) for row in conn.execute(sql, values).fetchall()]
 
-        def passes_metric(alpha: Dict[str, Any]) -> bool:
-            metrics = alpha.get("latest_metrics") or {}
-            if min_sharpe is not None:
-                try:
-                    if float(metrics.get("sharpe", 0)) < min_sharpe:
-                        return False
-                except (TypeError, ValueError):
-                    return False
-            if min_fitness is not None:
-                try:
-                    if float(metrics.get("fitness", 0)) < min_fitness:
-                        return False
-                except (TypeError, ValueError):
-                    return False
-            return True
+    def stats(
+        self,
+        dimension: str = "template",
+        *,
+        keys: Optional[Iterable[str]] = None,
+        min_simulations: int = 1,
+        order_by: str = "simulations",
+        descending: bool = True,
+        limit: int = 50,
+    ) -> List[Dict[str, Any]]:
+        """Aggregate performance per template, dataset field or operator.
 
-        return [row for row in rows if passes_metric(row)][:max(int(limit), 1)]
+        Each entry has the number of completed simulations, the pass rate
+        (``passed`` > 0), the mean passed-check count, and mean, standard
+        deviation and p25/p50/p75/p90 of sharpe, fitness and turnover.
+        """
+        if dimension not in STATS_DIMENSIONS:
+            raise ValueError(f"Unknown stats dimension {dimension!r}; choose from {', '.join(STATS_DIMENSIONS)}.")
+        if order_by not in STATS_ORDERS:
+            raise ValueError(f"Cannot order stats by {order_by!r}; choose from {', '.join(STATS_ORDERS)}.")
+        order_expr = {
+            "simulations": "simulations",
+            "pass_rate": "CAST(passes AS REAL) / simulations",
+            "passed": "passed_sum / simulations",
+        }.get(order_by) or f"{order_by}_sum / NULLIF({order_by}_n, 0)"
+        clauses = ["dimension = ?", "simulations >= ?"]
+        values: List[Any] = [dimension, max(int(min_simulations), 1)]
+        keys = [str(key) for key in keys or []]
+        if keys:
+            clauses.append(f"key IN ({', '.join('?' for _ in keys)})")
+            values.extend(keys)
+        values.append(max(int(limit), 1))
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT * FROM alpha_stats
+                WHERE {' AND '.join(clauses)}
+                ORDER BY {order_expr} IS NULL, {order_expr} {'DESC' if descending else 'ASC'}, key
+                LIMIT ?
+                """,
+                values,
+            ).fetchall()
+            bins: Dict[Tuple[str, str], List[Tuple[int, int]]] = {}
+            found = [row["key"] for row in rows]
+            for start in range(0, len(found), SQL_IN_CHUNK_SIZE):
+                chunk = found[start:start + SQL_IN_CHUNK_SIZE]
+                for row in conn.execute(
+                    f"""
+                    SELECT key, metric, bin, count FROM alpha_stat_bins
+                    WHERE dimension = ? AND key IN ({', '.join('?' for _ in chunk)})
+                    ORDER BY key, metric, bin
+                    """,
+                    [dimension, *chunk],
+                ):
+                    bins.setdefault((row["key"], row["metric"]), []).append((row["bin"], row["count"]))
+        return [self._stats_row_to_dict(row, bins) for row in rows]
+
+    @staticmethod
+    def list_cursor(alpha: Dict[str, Any], order_by: str = "updated_at") -> str:
+        """Cursor that makes ``list_alphas(after=...)`` continue after *alpha*."""
+        return encode_cursor([alpha.get(order_by), alpha["alpha_hash"]])
 
     def get_alpha(self, identifier: str, *, conn: Optional[sqlite3.Connection] = None) -> Optional[Dict[str, Any]]:
-        owns_conn = conn is None
-        conn = conn or self._connect()
-        try:
-            row = conn.execute(
-                """
-                SELECT * FROM alphas
-                WHERE alpha_hash = ? OR alpha_id = ?
-                """,
-                (identifier, identifier),
-            ).fetchone()
+        """Look up an alpha by hash or WQ alpha ID.
+
+        Calls without *conn* go through the read cache; with *conn* (inside a
+        write transaction) the uncommitted state is read directly.
+        """
+        if conn is not None:
+            row = self._fetch_alpha_row(conn, identifier)
             return self._alpha_row_to_dict(row) if row else None
-        finally:
-            if owns_conn:
+        cached, version = self._cache.lookup(identifier)
+        if cached is None:
+            conn = self._connect()
+            try:
+                row = self._fetch_alpha_row(conn, identifier)
+            finally:
                 conn.close()
+            if row is None:
+                return None
+            cached = dict(row)
+            self._cache.store(cached, version)
+        return self._alpha_row_to_dict(cached)
+
+    @staticmethod
+    def _fetch_alpha_row(conn: sqlite3.Connection, identifier: str) -> Optional[sqlite3.Row]:
+        # Two probes so each one uses its own index (an OR across both
+        # columns cannot use either index well).
+        row = conn.execute("SELECT * FROM alphas WHERE alpha_hash = ?", (identifier,)).fetchone()
+        if row is None:
+            row = conn.execute("SELECT * FROM alphas WHERE alpha_id = ?", (identifier,)).fetchone()
+        return row
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters of this registry's ``get_alpha`` cache."""
+        return self._cache.stats()
+
+    def iter_alphas(self, *, page_size: int = STREAM_PAGE_SIZE, **filters: Any) -> Iterator[Dict[str, Any]]:
+        """Stream every alpha matching ``list_alphas`` *filters*, one keyset page at a time."""
+        order_by = filters.get("order_by", "updated_at")
+        after = filters.pop("after", None)
+        filters.pop("limit", None)
+        while True:
+            page = self.list_alphas(after=after, limit=page_size, **filters)
+            yield from page
+            if len(page) < page_size:
+                return
+            after = self.list_cursor(page[-1], order_by)
+
+    def simulations_page(
+        self,
+        alpha_hash: str,
+        *,
+        after: Optional[str] = None,
+        limit: int = STREAM_PAGE_SIZE,
+    ) -> List[Dict[str, Any]]:
+        """Newest-first simulations of *alpha_hash*, continuing after the cursor *after*."""
+        clause = ""
+        values: List[Any] = [alpha_hash]
+        if after:
+            clause = "AND (created_at, simulation_id) < (?, ?)"
+            values.extend(decode_cursor(after))
+        values.append(max(int(limit), 1))
+        with self._connect() as conn:
+            return [
+                self._simulation_row_to_dict(row)
+                for row in conn.execute(
+                    f"""
+                    SELECT * FROM simulations WHERE alpha_hash = ? {clause}
+                    ORDER BY created_at DESC, simulation_id DESC LIMIT ?
+                    """,
+                    values,
+                )
+            ]
+
+    def events_page(
+        self,
+        alpha_hash: str,
+        *,
+        after: Optional[str] = None,
+        limit: int = STREAM_PAGE_SIZE,
+        include_archived: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """Newest-first events of *alpha_hash*, continuing after the cursor *after*.
+
+        With *include_archived* the archive database is read as if its events
+        were still in the registry.
+        """
+        archived = include_archived and os.path.exists(self.archive_path)
+        source = "alpha_events"
+        if archived:
+            source = (
+                "(SELECT * FROM main.alpha_events UNION ALL "
+                "SELECT event_id, alpha_hash, event_type, reason, payload_json, created_at "
+                "FROM archive.alpha_events)"
+            )
+        clause = ""
+        values: List[Any] = [alpha_hash]
+        if after:
+            clause = "AND (created_at, event_id) < (?, ?)"
+            values.extend(decode_cursor(after))
+        values.append(max(int(limit), 1))
+        conn = self._connect()
+        try:
+            if archived:
+                conn.execute("ATTACH DATABASE ? AS archive", (self.archive_path,))
+            return [
+                self._event_row_to_dict(row)
+                for row in conn.execute(
+                    f"""
+                    SELECT * FROM {source} WHERE alpha_hash = ? {clause}
+                    ORDER BY created_at DESC, event_id DESC LIMIT ?
+                    """,
+                    values,
+                )
+            ]
+        finally:
+            conn.close()
+
+    @staticmethod
+    def history_cursor(row: Dict[str, Any]) -> str:
+        """Cursor that makes ``simulations_page``/``events_page`` continue after *row*."""
+        return encode_cursor([row["created_at"], row.get("simulation_id") or row["event_id"]])
+
+    def iter_simulations(self, alpha_hash: str, *, page_size: int = STREAM_PAGE_SIZE) -> Iterator[Dict[str, Any]]:
+        """Stream the simulations of *alpha_hash*, newest first."""
+        after = None
+        while True:
+            page = self.simulations_page(alpha_hash, after=after, limit=page_size)
+            yield from page
+            if len(page) < page_size:
+                return
+            after = self.history_cursor(page[-1])
+
+    def iter_events(
+        self,
+        alpha_hash: str,
+        *,
+        include_archived: bool = False,
+        page_size: int = STREAM_PAGE_SIZE,
+    ) -> Iterator[Dict[str, Any]]:
+        """Stream the events of *alpha_hash*, newest first."""
+        after = None
+        while True:
+            page = self.events_page(alpha_hash, after=after, limit=page_size, include_archived=include_archived)
+            yield from page
+            if len(page) < page_size:
+                return
+            after = self.history_cursor(page[-1])
 
-    def history(self, identifier: str) -> Optional[Dict[str, Any]]:
+    def history(
+        self,
+        identifier: str,
+        *,
+        include_archived: bool = False,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """An alpha with its simulations and events, newest first.
+
+        Without *limit* everything is returned.  With *limit* at most that
+        many simulations and events are returned, plus ``next_cursor`` to
+        pass back as *cursor* for the next page (None once both are done).
+        """
         alpha = self.get_alpha(identifier)
         if alpha is None:
             return None
         alpha_hash = alpha["alpha_hash"]
+        if limit is None:
+            return {
+                "alpha": alpha,
+                "simulations": list(self.iter_simulations(alpha_hash)),
+                "events": list(self.iter_events(alpha_hash, include_archived=include_archived)),
+            }
+
+        # The cursor holds one position per stream; False marks a stream
+        # that is already exhausted.
+        limit = max(int(limit), 1)
+        positions = decode_cursor(cursor) if cursor else [None, None]
+        pages: List[List[Dict[str, Any]]] = []
+        next_positions: List[Any] = []
+        for position, fetch in zip(positions, (
+            lambda after: self.simulations_page(alpha_hash, after=after, limit=limit),
+            lambda after: self.events_page(alpha_hash, after=after, limit=limit, include_archived=include_archived),
+        )):
+            page = [] if position is False else fetch(position)
+            pages.append(page)
+            next_positions.append(self.history_cursor(page[-1]) if len(page) == limit else False)
+        return {
+            "alpha": alpha,
+            "simulations": pages[0],
+            "events": pages[1],
+            "next_cursor": encode_cursor(next_positions) if any(next_positions) else None,
+        }
+
+    @property
+    def archive_path(self) -> str:
+        """Archive database for old events, next to the registry file."""
+        return f"{os.path.splitext(self.db_path)[0]}-archive.sqlite"
+
+    def compact_queued_events(self) -> int:
+        """Collapse each alpha's ``queued`` events into one event with a count; returns rows removed.
+
+        The collapsed event keeps the first/last queue times, the most recent
+        job IDs and the params of the latest queue.
+        """
         with self._connect() as conn:
-            simulations = [
-                self._simulation_row_to_dict(row)
+            hashes = [
+                row["alpha_hash"]
                 for row in conn.execute(
-                    "SELECT * FROM simulations WHERE alpha_hash = ? ORDER BY created_at DESC",
-                    (alpha_hash,),
-                ).fetchall()
+                    """
+                    SELECT alpha_hash FROM alpha_events
+                    WHERE event_type = 'queued'
+                    GROUP BY alpha_hash HAVING COUNT(*) > 1
+                    """
+                )
             ]
-            events = [
-                self._event_row_to_dict(row)
+        removed = 0
+        for start in range(0, len(hashes), SQL_IN_CHUNK_SIZE):
+            chunk = hashes[start:start + SQL_IN_CHUNK_SIZE]
+            placeholders = ", ".join("?" for _ in chunk)
+            with self._connect() as conn:
+                grouped: Dict[str, List[sqlite3.Row]] = {}
                 for row in conn.execute(
-                    "SELECT * FROM alpha_events WHERE alpha_hash = ? ORDER BY created_at DESC",
-                    (alpha_hash,),
-                ).fetchall()
-            ]
-        return {"alpha": alpha, "simulations": simulations, "events": events}
+                    f"""
+                    SELECT * FROM alpha_events
+                    WHERE event_type = 'queued' AND alpha_hash IN ({placeholders})
+                    ORDER BY alpha_hash, created_at
+                    """,
+                    chunk,
+                ):
+                    grouped.setdefault(row["alpha_hash"], []).append(row)
+                conn.executemany(
+                    "DELETE FROM alpha_events WHERE event_id = ?",
+                    [(row["event_id"],) for rows in grouped.values() for row in rows],
+                )
+                conn.executemany(
+                    """
+                    INSERT INTO alpha_events (
+                        event_id, alpha_hash, event_type, reason, payload_json, created_at
+                    ) VALUES (?, ?, 'queued', NULL, ?, ?)
+                    """,
+                    [self._collapsed_queued_event(alpha_hash, rows) for alpha_hash, rows in grouped.items()],
+                )
+                removed += sum(len(rows) - 1 for rows in grouped.values())
+        return removed
+
+    @staticmethod
+    def _collapsed_queued_event(alpha_hash: str, rows: List[sqlite3.Row]) -> tuple:
+        count = 0
+        first_at = None
+        job_ids: List[str] = []
+        for row in rows:
+            payload = _json_loads(row["payload_json"], {}) or {}
+            count += int(payload.get("count", 1))
+            first_at = first_at or payload.get("first_at") or row["created_at"]
+            for job_id in payload.get("job_ids") or [payload.get("job_id")]:
+                if job_id and job_id not in job_ids:
+                    job_ids.append(job_id)
+        latest = _json_loads(rows[-1]["payload_json"], {}) or {}
+        payload = {
+            "count": count,
+            "first_at": first_at,
+            "last_at": rows[-1]["created_at"],
+            "job_id": job_ids[-1] if job_ids else None,
+            "job_ids": job_ids[-QUEUED_EVENT_JOB_IDS_KEPT:],
+            "params": latest.get("params", {}),
+        }
+        return (uuid.uuid4().hex, alpha_hash, _json_dumps(payload), rows[-1]["created_at"])
+
+    def archive_events(self, older_than_days: float = EVENT_ARCHIVE_AFTER_DAYS) -> int:
+        """Move events older than *older_than_days* into ``archive_path``; returns rows moved."""
+        cutoff = (
+            datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=older_than_days)
+        ).isoformat()
+        conn = self._connect()
+        try:
+            conn.execute("ATTACH DATABASE ? AS archive", (self.archive_path,))
+            conn.executescript(ARCHIVE_EVENTS_SCHEMA)
+            with conn:
+                conn.execute(
+                    """
+                    INSERT OR IGNORE INTO archive.alpha_events
+                    SELECT event_id, alpha_hash, event_type, reason, payload_json, created_at
+                    FROM main.alpha_events WHERE created_at < ?
+                    """,
+                    (cutoff,),
+                )
+                moved = conn.execute(
+                    "DELETE FROM main.alpha_events WHERE created_at < ?", (cutoff,)
+                ).rowcount
+            conn.execute("DETACH DATABASE archive")
+        finally:
+            conn.close()
+        return moved
+
+    def vacuum(self) -> None:
+        """VACUUM and ANALYZE the registry, then rebuild the code index.
+
+        VACUUM may renumber the implicit rowids that ``alphas_fts`` points at,
+        so the external-content index has to be rebuilt afterwards.
+        """
+        conn = self._connect()
+        try:
+            conn.execute("VACUUM")
+            conn.execute("ANALYZE")
+        finally:
+            conn.close()
+        self.rebuild_code_index()
+
+    def _timed_history_ms(self, alpha_hash: Optional[str], repeats: int = 3) -> Optional[float]:
+        if not alpha_hash:
+            return None
+        timings = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            self.history(alpha_hash)
+            timings.append((time.perf_counter() - started) * 1000)
+        return round(sorted(timings)[len(timings) // 2], 2)
+
+    def maintain(
+        self,
+        *,
+        archive_after_days: Optional[float] = EVENT_ARCHIVE_AFTER_DAYS,
+        vacuum: bool = True,
+    ) -> Dict[str, Any]:
+        """Apply event retention and compaction; returns a report that is also stored.
+
+        Collapses ``queued`` events, archives events older than
+        *archive_after_days* (``None`` keeps everything), then VACUUMs and
+        ANALYZEs.  The report compares file size, event count and the time
+        of ``history()`` for the alpha with the most events, before and after.
+        """
+        with self._connect() as conn:
+            events_before = conn.execute("SELECT COUNT(*) FROM alpha_events").fetchone()[0]
+            busiest = conn.execute(
+                """
+                SELECT alpha_hash FROM alpha_events
+                GROUP BY alpha_hash ORDER BY COUNT(*) DESC LIMIT 1
+                """
+            ).fetchone()
+        probe = busiest["alpha_hash"] if busiest else None
+        size_before = os.path.getsize(self.db_path)
+        history_before = self._timed_history_ms(probe)
+
+        collapsed = self.compact_queued_events()
+        archived = self.archive_events(archive_after_days) if archive_after_days is not None else 0
+        if vacuum:
+            self.vacuum()
+
+        with self._connect() as conn:
+            events_after = conn.execute("SELECT COUNT(*) FROM alpha_events").fetchone()[0]
+        size_after = os.path.getsize(self.db_path)
+        report = {
+            "size_before": size_before,
+            "size_after": size_after,
+            "reclaimed_bytes": size_before - size_after,
+            "events_before": events_before,
+            "events_after": events_after,
+            "queued_events_collapsed": collapsed,
+            "events_archived": archived,
+            "archive_path": self.archive_path if archived else None,
+            "vacuumed": vacuum,
+            "history_probe": probe,
+            "history_ms_before": history_before,
+            "history_ms_after": self._timed_history_ms(probe),
+        }
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO alpha_maintenance (run_at, report_json) VALUES (?, ?)",
+                (utc_now(), _json_dumps(report)),
+            )
+        return report
+
+    def last_maintenance(self) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT run_at, report_json FROM alpha_maintenance ORDER BY run_at DESC LIMIT 1"
+            ).fetchone()
+        if row is None:
+            return None
+        return {"run_at": row["run_at"], **(_json_loads(row["report_json"], {}) or {})}
 
     def _add_event_conn(
         self,
@@ -506,8 +2316,428 @@ class AlphaRegistry:
             (uuid.uuid4().hex, alpha_hash, event_type, reason, _json_dumps(payload or {}), utc_now()),
         )
 
+    @staticmethod
+    def export_columns(table: str) -> List[Tuple[str, str]]:
+        """``(name, "string" | "float")`` pairs of the flat export layout for *table*."""
+        spec = EXPORT_TABLES[table]
+        return [(column, "string") for column in spec["columns"]] + list(EXPORT_METRIC_TYPES.items())
+
+    def _export_range(self, table: str, since: Optional[str]) -> Tuple[str, List[Any]]:
+        ts_column, key_column = EXPORT_TABLES[table]["order"]
+        clause = f"{ts_column} <= ?"
+        values: List[Any] = []
+        if since:
+            clause = f"({ts_column}, {key_column}) > (?, ?) AND " + clause
+            values.extend(decode_cursor(since))
+        return clause, values
+
+    def export_profile(self, table: str, *, since: Optional[str] = None) -> Dict[str, Any]:
+        """Upper bound, row count and longest value per string column for the next export.
+
+        ``until`` freezes the export: rows written after this call, or in the
+        last ``SYNC_SETTLE_SECONDS``, wait for the next incremental export.
+        """
+        spec = EXPORT_TABLES[table]
+        ts_column = spec["order"][0]
+        with self._connect() as conn:
+            until = _settled_until(conn, table, ts_column)
+            if until is None:
+                return {"until": None, "rows": 0, "widths": {}}
+            strings = [name for name, kind in self.export_columns(table) if kind == "string"]
+            lengths = [
+                f"MAX(LENGTH({name}))" if name in spec["columns"]
+                else f"MAX(LENGTH(json_extract({spec['metrics']}, '$.{name}')))"
+                for name in strings
+            ]
+            clause, values = self._export_range(table, since)
+            row = conn.execute(
+                f"SELECT COUNT(*), {', '.join(lengths)} FROM {table} WHERE {clause}",
+                [*values, until],
+            ).fetchone()
+        return {
+            "until": until,
+            "rows": row[0],
+            "widths": {name: row[index + 1] or 0 for index, name in enumerate(strings)},
+        }
+
+    def iter_export_chunks(
+        self,
+        table: str,
+        *,
+        until: str,
+        since: Optional[str] = None,
+        chunk_size: int = EXPORT_CHUNK_SIZE,
+    ) -> Iterator[Tuple[List[Dict[str, Any]], str]]:
+        """Yield ``(rows, cursor)`` chunks of flat export rows in watermark order.
+
+        Each chunk is a separate short query, so writers are never blocked for
+        the length of an export.  *cursor* is the watermark after that chunk.
+        """
+        spec = EXPORT_TABLES[table]
+        ts_column, key_column = spec["order"]
+        columns = self.export_columns(table)
+        conn = self._connect()
+        try:
+            while True:
+                clause, values = self._export_range(table, since)
+                rows = conn.execute(
+                    f"""
+                    SELECT * FROM {table} WHERE {clause}
+                    ORDER BY {ts_column}, {key_column}
+                    LIMIT ?
+                    """,
+                    [*values, until, max(int(chunk_size), 1)],
+                ).fetchall()
+                if not rows:
+                    return
+                since = encode_cursor([rows[-1][ts_column], rows[-1][key_column]])
+                yield [self._export_row(row, spec, columns) for row in rows], since
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _export_row(row: sqlite3.Row, spec: Dict[str, Any], columns: List[Tuple[str, str]]) -> Dict[str, Any]:
+        metrics = _json_loads(row[spec["metrics"]], {}) or {}
+        data: Dict[str, Any] = {}
+        for name, kind in columns:
+            value = row[name] if name in spec["columns"] else metrics.get(name)
+            if kind == "float":
+                data[name] = _metric_float(value)
+            else:
+                data[name] = None if value is None else str(value)
+        return data
+
+    def export_watermark(self, target: str, table: str) -> Optional[str]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT cursor FROM alpha_exports WHERE target = ? AND table_name = ?",
+                (target, table),
+            ).fetchone()
+        return row["cursor"] if row else None
+
+    def set_export_watermark(self, target: str, table: str, cursor: str, rows: int) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO alpha_exports (target, table_name, cursor, rows, exported_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(target, table_name) DO UPDATE SET
+                    cursor = excluded.cursor,
+                    rows = excluded.rows,
+                    exported_at = excluded.exported_at
+                """,
+                (target, table, cursor, rows, utc_now()),
+            )
+
+    @property
+    def node_id(self) -> str:
+        """Stable ID of this registry in change-set exchanges.
+
+        A registry file copied to another host gets a new ID there, so the
+        copy and the original still exchange changes with each other.
+        """
+        host = socket.gethostname()
+        with self._connect() as conn:
+            meta = dict(conn.execute(
+                "SELECT key, value FROM registry_meta WHERE key IN ('node_id', 'node_host')"
+            ).fetchall())
+            if meta.get("node_id") and meta.get("node_host") == host:
+                return meta["node_id"]
+            node_id = uuid.uuid4().hex[:12]
+            conn.executemany(
+                "INSERT OR REPLACE INTO registry_meta (key, value) VALUES (?, ?)",
+                (("node_id", node_id), ("node_host", host)),
+            )
+        return node_id
+
+    def sync_profile(self, table: str, *, since: Optional[str] = None) -> Dict[str, Any]:
+        """Upper bound and row count of the next change-set for *table*."""
+        ts_column, key_column = SYNC_TABLES[table]
+        clause, values = self._sync_range(table, since)
+        with self._connect() as conn:
+            until = _settled_until(conn, table, ts_column)
+            if until is None:
+                return {"until": None, "rows": 0}
+            rows = conn.execute(
+                f"SELECT COUNT(*) FROM {table} WHERE {clause} AND {ts_column} <= ?",
+                [*values, until],
+            ).fetchone()[0]
+        return {"until": until, "rows": rows}
+
+    def _sync_range(self, table: str, since: Optional[str], prefix: str = "") -> Tuple[str, List[Any]]:
+        ts_column, key_column = SYNC_TABLES[table]
+        clauses: List[str] = []
+        values: List[Any] = []
+        if since:
+            clauses.append(f"({prefix}{ts_column}, {prefix}{key_column}) > (?, ?)")
+            values.extend(decode_cursor(since))
+        if table == "alpha_events":
+            clauses.append(f"event_type NOT IN ({', '.join('?' for _ in SYNC_LOCAL_EVENT_TYPES)})")
+            values.extend(SYNC_LOCAL_EVENT_TYPES)
+        # Rows merged from another registry are not sent on again.
+        if table == "alphas":
+            clauses.append(f"({prefix}synced_updated_at IS NULL OR {prefix}synced_updated_at != {prefix}updated_at)")
+        else:
+            clauses.append(f"{prefix}origin_node IS NULL")
+        return " AND ".join(clauses) or "1", values
+
+    def iter_sync_changes(
+        self,
+        table: str,
+        *,
+        until: str,
+        since: Optional[str] = None,
+        chunk_size: int = SYNC_CHUNK_SIZE,
+    ) -> Iterator[Tuple[List[Dict[str, Any]], str]]:
+        """Yield ``(rows, cursor)`` chunks of raw *table* rows changed since *since*.
+
+        Alpha rows carry ``latest_simulated_at``/``latest_simulation_source``
+        so the receiving side can tell which latest result is newer.
+        """
+        ts_column, key_column = SYNC_TABLES[table]
+        select = (
+            "SELECT a.*, s.created_at AS latest_simulated_at, s.source AS latest_simulation_source "
+            "FROM alphas a LEFT JOIN simulations s ON s.simulation_id = a.latest_simulation_id"
+            if table == "alphas" else f"SELECT * FROM {table}"
+        )
+        prefix = "a." if table == "alphas" else ""
+        conn = self._connect()
+        try:
+            while True:
+                clause, values = self._sync_range(table, since, prefix)
+                rows = conn.execute(
+                    f"""
+                    {select}
+                    WHERE {clause} AND {prefix}{ts_column} <= ?
+                    ORDER BY {prefix}{ts_column}, {prefix}{key_column}
+                    LIMIT ?
+                    """,
+                    [*values, until, max(int(chunk_size), 1)],
+                ).fetchall()
+                if not rows:
+                    return
+                since = encode_cursor([rows[-1][ts_column], rows[-1][key_column]])
+                yield [dict(row) for row in rows], since
+        finally:
+            conn.close()
+
+    def sync_alphas(self, alpha_hashes: Iterable[str]) -> List[Dict[str, Any]]:
+        """Alpha rows in change-set layout for *alpha_hashes* (missing hashes are skipped)."""
+        hashes = list(alpha_hashes)
+        rows: List[Dict[str, Any]] = []
+        with self._connect() as conn:
+            for start in range(0, len(hashes), SQL_IN_CHUNK_SIZE):
+                chunk = hashes[start:start + SQL_IN_CHUNK_SIZE]
+                rows.extend(dict(row) for row in conn.execute(
+                    f"""
+                    SELECT a.*, s.created_at AS latest_simulated_at, s.source AS latest_simulation_source
+                    FROM alphas a LEFT JOIN simulations s ON s.simulation_id = a.latest_simulation_id
+                    WHERE a.alpha_hash IN ({", ".join("?" for _ in chunk)})
+                    """,
+                    chunk,
+                ))
+        return rows
+
+    def apply_sync_changes(self, table: str, rows: List[Dict[str, Any]], *, origin: Optional[str] = None) -> Dict[str, int]:
+        """
+        Merge change-set rows from another registry (node *origin*) in one transaction.
+
+        Alphas are merged field by field with ``_merge_synced_alpha``;
+        simulations and events are append-only and keyed by their IDs, and a
+        simulation whose alpha already has the same result link is a
+        duplicate.  Applying the same rows twice changes nothing.  Rows whose
+        alpha is unknown here are counted as ``orphans`` and skipped.  Merged
+        rows are marked so this registry's change-sets do not echo them back.
+        """
+        if table not in SYNC_TABLES:
+            raise ValueError(f"Unknown sync table {table!r}.")
+        with self._connect() as conn:
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute(f"PRAGMA cache_size = -{IMPORT_CACHE_KIB}")
+            if table == "alphas":
+                return self._apply_synced_alphas(conn, rows)
+            if table == "simulations":
+                return self._apply_synced_simulations(conn, rows, origin)
+            return self._apply_synced_events(conn, rows, origin)
+
+    @staticmethod
+    def _table_columns(conn: sqlite3.Connection, table: str) -> List[str]:
+        return [row["name"] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+    def _known_alphas(self, conn: sqlite3.Connection, alpha_hashes: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        hashes = list(set(alpha_hashes))
+        known: Dict[str, Dict[str, Any]] = {}
+        for start in range(0, len(hashes), SQL_IN_CHUNK_SIZE):
+            chunk = hashes[start:start + SQL_IN_CHUNK_SIZE]
+            for row in conn.execute(
+                f"""
+                SELECT a.*, s.created_at AS latest_simulated_at, s.source AS latest_simulation_source
+                FROM alphas a LEFT JOIN simulations s ON s.simulation_id = a.latest_simulation_id
+                WHERE a.alpha_hash IN ({", ".join("?" for _ in chunk)})
+                """,
+                chunk,
+            ):
+                known[row["alpha_hash"]] = dict(row)
+        return known
+
+    def _apply_synced_alphas(self, conn: sqlite3.Connection, rows: List[Dict[str, Any]]) -> Dict[str, int]:
+        counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+        columns = self._table_columns(conn, "alphas")
+        known = self._known_alphas(conn, (row["alpha_hash"] for row in rows))
+        merged_rows: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            alpha_hash = row["alpha_hash"]
+            local = merged_rows.get(alpha_hash) or known.get(alpha_hash)
+            merged = _merge_synced_alpha(local, row) if local else dict(row)
+            if merged.get("normalized_code") is None:
+                merged["normalized_code"] = normalize_code(merged.get("code"))
+            # The sender may run other canonicalization rules; hash locally.
+            merged["canonical_hash"] = canonical_hash(merged["normalized_code"])
+            # Only a merge that added nothing the sender lacks stays out of the next change-set.
+            sender_has_all = all(
+                merged.get(column) == row.get(column)
+                for column in columns if column not in ("canonical_hash", "synced_updated_at")
+            )
+            merged["synced_updated_at"] = merged["updated_at"] if sender_has_all else None
+            merged_rows[alpha_hash] = merged
+
+        # alpha_id is UNIQUE: an ID held by a different alpha here stays there.
+        ids = list({row["alpha_id"] for row in merged_rows.values() if row.get("alpha_id")})
+        claimed: Dict[str, str] = {}
+        for start in range(0, len(ids), SQL_IN_CHUNK_SIZE):
+            chunk = ids[start:start + SQL_IN_CHUNK_SIZE]
+            for row in conn.execute(
+                f"SELECT alpha_id, alpha_hash FROM alphas WHERE alpha_id IN ({', '.join('?' for _ in chunk)})",
+                chunk,
+            ):
+                claimed[row["alpha_id"]] = row["alpha_hash"]
+
+        changed: List[Dict[str, Any]] = []
+        for alpha_hash, merged in merged_rows.items():
+            alpha_id = merged.get("alpha_id")
+            if alpha_id and claimed.setdefault(alpha_id, alpha_hash) != alpha_hash:
+                merged["alpha_id"] = (known.get(alpha_hash) or {}).get("alpha_id")
+            local = known.get(alpha_hash)
+            if local is None:
+                counts["inserted"] += 1
+            elif all(merged.get(column) == local.get(column) for column in columns if column != "synced_updated_at"):
+                counts["unchanged"] += 1
+                continue
+            else:
+                counts["updated"] += 1
+            changed.append(merged)
+
+        updates = ", ".join(f"{column} = excluded.{column}" for column in columns if column != "alpha_hash")
+        conn.executemany(
+            f"""
+            INSERT INTO alphas ({", ".join(columns)}) VALUES ({", ".join("?" for _ in columns)})
+            ON CONFLICT(alpha_hash) DO UPDATE SET {updates}
+            """,
+            ([row.get(column) for column in columns] for row in changed),
+        )
+        return counts
+
+    def _apply_synced_simulations(
+        self, conn: sqlite3.Connection, rows: List[Dict[str, Any]], origin: Optional[str],
+    ) -> Dict[str, int]:
+        counts = {"inserted": 0, "duplicates": 0, "orphans": 0}
+        columns = self._table_columns(conn, "simulations")
+        alphas = self._known_alphas(conn, (row["alpha_hash"] for row in rows))
+        ids = [row["simulation_id"] for row in rows]
+        hashes = list(alphas)
+        seen_ids = set()
+        seen_links = set()
+        for start in range(0, len(ids), SQL_IN_CHUNK_SIZE):
+            chunk = ids[start:start + SQL_IN_CHUNK_SIZE]
+            seen_ids.update(row[0] for row in conn.execute(
+                f"SELECT simulation_id FROM simulations WHERE simulation_id IN ({', '.join('?' for _ in chunk)})",
+                chunk,
+            ))
+        for start in range(0, len(hashes), SQL_IN_CHUNK_SIZE):
+            chunk = hashes[start:start + SQL_IN_CHUNK_SIZE]
+            seen_links.update(
+                (row["alpha_hash"], row["result_link"])
+                for row in conn.execute(
+                    f"""
+                    SELECT alpha_hash, result_link FROM simulations
+                    WHERE alpha_hash IN ({', '.join('?' for _ in chunk)}) AND result_link IS NOT NULL
+                    """,
+                    chunk,
+                )
+            )
+
+        inserts: List[List[Any]] = []
+        accumulator = _StatsAccumulator(self.code_vocabulary())
+        for row in rows:
+            alpha = alphas.get(row["alpha_hash"])
+            if alpha is None:
+                counts["orphans"] += 1
+                continue
+            link_key = (row["alpha_hash"], row.get("result_link"))
+            if row["simulation_id"] in seen_ids or (row.get("result_link") and link_key in seen_links):
+                counts["duplicates"] += 1
+                continue
+            seen_ids.add(row["simulation_id"])
+            seen_links.add(link_key)
+            inserts.append([row.get(column) for column in columns if column != "origin_node"] + [origin or "sync"])
+            if row.get("status") == "done":
+                accumulator.add(alpha["code"], alpha.get("template_id"), _json_loads(row.get("metrics_json"), {}))
+            counts["inserted"] += 1
+        columns = [column for column in columns if column != "origin_node"] + ["origin_node"]
+        conn.executemany(
+            f"INSERT INTO simulations ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+            inserts,
+        )
+        accumulator.flush(conn)
+        return counts
+
+    def _apply_synced_events(
+        self, conn: sqlite3.Connection, rows: List[Dict[str, Any]], origin: Optional[str],
+    ) -> Dict[str, int]:
+        counts = {"inserted": 0, "duplicates": 0, "orphans": 0}
+        known = self._known_alphas(conn, (row["alpha_hash"] for row in rows))
+        inserts = []
+        for row in rows:
+            if row["alpha_hash"] not in known:
+                counts["orphans"] += 1
+                continue
+            inserts.append((
+                row["event_id"], row["alpha_hash"], row["event_type"], row.get("reason"),
+                row.get("payload_json"), row["created_at"], origin or "sync",
+            ))
+        before = conn.total_changes
+        conn.executemany(
+            """
+            INSERT OR IGNORE INTO alpha_events (
+                event_id, alpha_hash, event_type, reason, payload_json, created_at, origin_node
+            ) VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            inserts,
+        )
+        counts["inserted"] = conn.total_changes - before
+        counts["duplicates"] = len(inserts) - counts["inserted"]
+        return counts
+
+    def applied_sync_files(self, node_id: str) -> set:
+        with self._connect() as conn:
+            return {
+                row["file_name"]
+                for row in conn.execute("SELECT file_name FROM alpha_sync_files WHERE node_id = ?", (node_id,))
+            }
+
+    def mark_sync_file_applied(self, node_id: str, file_name: str, records: int) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO alpha_sync_files (node_id, file_name, records, applied_at)
+                VALUES (?, ?, ?, ?)
+                """,
+                (node_id, file_name, records, utc_now()),
+            )
+
     def _alpha_row_to_dict(self, row: sqlite3.Row) -> Dict[str, Any]:
         data = dict(row)
+        data.pop("synced_updated_at", None)
         data["latest_metrics"] = _json_loads(data.pop("latest_metrics_json", None), {})
         return data
 
@@ -517,11 +2747,46 @@ class AlphaRegistry:
         data["metrics"] = _json_loads(data.pop("metrics_json", None), {})
         return data
 
+    def _stats_row_to_dict(
+        self,
+        row: sqlite3.Row,
+        bins: Dict[Tuple[str, str], List[Tuple[int, int]]],
+    ) -> Dict[str, Any]:
+        simulations = row["simulations"]
+        data: Dict[str, Any] = {
+            "dimension": row["dimension"],
+            "key": row["key"],
+            "simulations": simulations,
+            "passes": row["passes"],
+            "pass_rate": round(row["passes"] / simulations, 4) if simulations else None,
+            "passed_mean": round(row["passed_sum"] / simulations, 4) if simulations else None,
+        }
+        for metric, width in STATS_BIN_WIDTHS.items():
+            n = row[f"{metric}_n"]
+            mean = row[f"{metric}_sum"] / n if n else None
+            variance = max(row[f"{metric}_sumsq"] / n - mean * mean, 0.0) if n else None
+            data[f"{metric}_mean"] = round(mean, 4) if mean is not None else None
+            data[f"{metric}_std"] = round(math.sqrt(variance), 4) if variance is not None else None
+            for name, value in _histogram_quantiles(bins.get((row["key"], metric), []), width).items():
+                data[f"{metric}_{name}"] = value
+        data["updated_at"] = row["updated_at"]
+        return data
+
     def _event_row_to_dict(self, row: sqlite3.Row) -> Dict[str, Any]:
         data = dict(row)
         data["payload"] = _json_loads(data.pop("payload_json", None), {})
         return data
 
 
+_REGISTRIES: Dict[str, AlphaRegistry] = {}
+_REGISTRIES_LOCK = Lock()
+
+
 def get_registry() -> AlphaRegistry:
-    return AlphaRegistry(os.environ.get("BRAIN_ALPHA_REGISTRY_PATH", DEFAULT_DB_PATH))
+    """Shared registry for the configured path, so its schema check and read cache are reused."""
+    db_path = os.environ.get("BRAIN_ALPHA_REGISTRY_PATH", DEFAULT_DB_PATH)
+    with _REGISTRIES_LOCK:
+        registry = _REGISTRIES.get(db_path)
+        if registry is None:
+            registry = _REGISTRIES[db_path] = AlphaRegistry(db_path)
+        return registry
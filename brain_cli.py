@@ -3,14 +3,15 @@
 """
 brain_cli.py — WorldQuant Brain Toolbox Command-Line Interface.
 
-Provides eleven command groups for AI-agent usage:
+Provides twelve command groups for AI-agent usage:
   auth       Login status, login, persona completion
   datasets   List, refresh, show, search, export-fields
   operators  List, refresh, show, search WQ Brain operators
   template   List, show, save, delete, placeholders
   generate   Preview strategies, generate file
-  simulate   Enqueue, run, status, stop, results, reconcile, list
-  alpha      List, show, history, promote, reject registry entries
+  simulate   Enqueue, run, status, stop, results, reconcile, resume-dropped, list
+  alpha      List, search, show, history, promote, reject, enrich, import, export, stats registry entries
+  registry   Maintain the alpha registry database (event retention, VACUUM/ANALYZE)
   backtest   List, show, filter, score, diversity, export
   evolution  Run, from-backtest, auto-run, status, stop, results, list
   telegram   Run Telegram bot polling and send status notifications
@@ -26,7 +27,6 @@ Usage:
 from __future__ import annotations
 
 import argparse
-import ast
 import json
 import logging
 import os
@@ -41,6 +41,7 @@ if SCRIPT_DIR not in sys.path:
 import cli_services as svc
 import brain_worker as worker
 import telegram_integration as tg
+import wq_cassette
 
 # ---------------------------------------------------------------------------
 # Output helpers
@@ -218,48 +219,112 @@ def cmd_datasets(args):
     sub = args.datasets_cmd
 
     if sub == "list":
-        items = svc.datasets_list(args.datasets_dir)
+        items = svc.datasets_list(args.datasets_dir, partition=args.partition)
         if args.json:
             _out(items, True)
         else:
-            _table(items, ["dataset_id", "rows", "size_bytes"])
+            _table(items, ["partition", "dataset_id", "rows", "size_bytes"])
 
     elif sub == "refresh":
+        try:
+            partitions = svc.dataset_partitions(args.partitions)
+        except ValueError as exc:
+            _err(str(exc))
         print("Refreshing datasets from WQ Brain API…", file=sys.stderr)
         result = svc.datasets_refresh(
             datasets_dir=args.datasets_dir,
             credentials_path=args.credentials,
+            max_workers=args.workers,
+            requests_per_minute=args.requests_per_minute,
+            partitions=partitions,
+            restart=args.restart,
             progress_cb=_progress,
         )
         _out(result, args.json)
 
     elif sub == "show":
-        df = svc.datasets_show(args.dataset_id, args.datasets_dir)
+        partition = args.partition or svc.DEFAULT_PARTITION
+        df = svc.datasets_show(args.dataset_id, args.datasets_dir, partition=partition)
         if df is None:
-            _err(f"Dataset '{args.dataset_id}' not found locally. Try: datasets refresh")
+            _err(f"Dataset '{args.dataset_id}' not found locally for {svc.partition_key(partition)}. "
+                 "Try: datasets refresh")
         limit = getattr(args, "limit", 50)
         rows  = df.head(limit).to_dict(orient="records")
         if args.json:
-            _out({"dataset_id": args.dataset_id, "total": len(df), "rows": rows}, True)
+            _out({"partition": svc.partition_key(partition), "dataset_id": args.dataset_id,
+                  "total": len(df), "rows": rows}, True)
         else:
-            print(f"Dataset: {args.dataset_id}  ({len(df)} fields)")
+            print(f"Dataset: {args.dataset_id} [{svc.partition_key(partition)}]  ({len(df)} fields)")
             _table(rows, ["Field", "Description", "Type", "Coverage"])
 
+    elif sub == "search" and args.semantic:
+        result = svc.datasets_semantic_search(
+            args.query,
+            datasets_dir=args.datasets_dir,
+            dataset_id=args.dataset_id,
+            limit=args.limit or svc.SEMANTIC_SEARCH_LIMIT,
+            partition=args.partition,
+            rerank=args.rerank,
+        )
+        if result.get("status") == "error":
+            _err(result["message"])
+        if args.json:
+            _out(result["results"], True)
+        else:
+            how = "reranked by Gemini" if args.rerank else "local index"
+            print(f"Top {len(result['results'])} fields for '{args.query}' ({how}):")
+            _table(result["results"], ["score", "partition", "dataset_id", "field", "description"])
+
     elif sub == "search":
+        if args.rerank:
+            _err("--rerank requires --semantic.")
         results = svc.datasets_search(
             args.query,
             datasets_dir=args.datasets_dir,
             dataset_id=getattr(args, "dataset_id", None),
+            limit=getattr(args, "limit", None),
+            partition=args.partition,
         )
         if args.json:
             _out(results, True)
         else:
             print(f"Found {len(results)} fields matching '{args.query}':")
-            _table(results, ["dataset_id", "field", "description", "coverage"])
+            _table(results, ["partition", "dataset_id", "field", "description", "coverage"])
+
+    elif sub == "graph":
+        if not args.json:
+            print("Building field similarity graph…", file=sys.stderr)
+        result = svc.datasets_graph(args.datasets_dir, rebuild=args.rebuild)
+        if result.get("status") == "error":
+            _err(result["message"])
+        _out(result, args.json)
+
+    elif sub == "diverse":
+        fields = None
+        if args.fields_file:
+            try:
+                fields = svc.read_field_list(args.fields_file)
+            except OSError as exc:
+                _err(f"Cannot read {args.fields_file}: {exc}")
+        result = svc.datasets_diverse(
+            args.n,
+            datasets_dir=args.datasets_dir,
+            dataset_id=args.dataset_id,
+            partition=args.partition,
+            fields=fields,
+        )
+        if result.get("status") == "error":
+            _err(result["message"])
+        if args.json:
+            _out(result["results"], True)
+        else:
+            print(f"{len(result['results'])} diverse fields (requested {args.n}):")
+            _table(result["results"], ["dataset_id", "field", "coverage", "users", "alphas", "cluster_size"])
 
     elif sub == "export-fields":
         result = svc.datasets_export_fields(
-            args.dataset_id, args.output, args.datasets_dir
+            args.dataset_id, args.output, args.datasets_dir,
+            partition=args.partition or svc.DEFAULT_PARTITION,
         )
         _out(result, args.json)
 
@@ -439,7 +504,8 @@ def cmd_generate(args):
 
         output = getattr(args, "output", None) or os.path.join(svc.ALPHAS_DIR,
             f"generated_{__import__('datetime').datetime.now().strftime('%Y%m%d_%H%M%S')}.py")
-        result = svc.generate_file(previews, output, sim_params or None)
+        result = svc.generate_file(previews, output, sim_params or None,
+                                   template_id=svc.template_id_for_code(template))
         _out(result, args.json)
 
     else:
@@ -450,29 +516,43 @@ def cmd_generate(args):
 # simulate group
 # ---------------------------------------------------------------------------
 
+STREAMED_PARAMS_SUFFIXES = (".jsonl", ".csv", ".py")
+
+
+def _streamed_params_file(args) -> Optional[str]:
+    """Return --params-file when it can be enqueued incrementally."""
+    fp = getattr(args, "params_file", None)
+    if fp and fp.endswith(STREAMED_PARAMS_SUFFIXES):
+        return fp
+    return None
+
+
+def _early_stop_from_args(args) -> Optional[dict]:
+    """Build the job's early-stop policy dict from --early-stop-* flags."""
+    threshold = getattr(args, "early_stop_threshold", None)
+    if threshold is None:
+        return None
+    policy = {
+        "threshold":   threshold,
+        "group_by":    args.early_stop_group_by,
+        "min_results": args.early_stop_min_results,
+        "confidence":  args.early_stop_confidence,
+        "action":      args.early_stop_action,
+    }
+    try:
+        svc.EarlyStopPolicy.from_dict(policy)
+    except ValueError as exc:
+        _err(str(exc))
+    return policy
+
+
 def _load_params_from_arg(args) -> list:
-    """Load simulation parameters from CSV or JSON file, or inline JSON."""
+    """Load simulation parameters from CSV, JSON, JSONL or .py file, or inline JSON."""
     if getattr(args, "params_file", None):
-        fp = args.params_file
-        if fp.endswith(".json"):
-            with open(fp, "r", encoding="utf-8") as fh:
-                return json.load(fh)
-        elif fp.endswith(".py"):
-            with open(fp, "r", encoding="utf-8") as fh:
-                module_ast = ast.parse(fh.read(), filename=fp)
-            for node in module_ast.body:
-                if isinstance(node, ast.Assign):
-                    for target in node.targets:
-                        if isinstance(target, ast.Name) and target.id == "DATA":
-                            value = ast.literal_eval(node.value)
-                            if not isinstance(value, list):
-                                _err("Python strategy file DATA must be a list of strategy dicts.")
-                            return value
-            _err("Python strategy file is missing a top-level DATA = [...] assignment.")
-        else:  # CSV
-            import pandas as pd
-            df = pd.read_csv(fp)
-            return df.to_dict(orient="records")
+        try:
+            return list(svc.iter_params_file(args.params_file))
+        except (OSError, ValueError) as exc:
+            _err(str(exc))
     if getattr(args, "params_json", None):
         return json.loads(args.params_json)
     if getattr(args, "code", None):
@@ -490,23 +570,45 @@ def _load_params_from_arg(args) -> list:
     _err("Provide --params-file, --params-json, or --code.")
 
 
+def _enqueue_from_args(args) -> dict:
+    """Create a job from --params-file/--params-json/--code, skipping repeats unless --resimulate."""
+    dedup = not args.resimulate
+    early_stop = _early_stop_from_args(args)
+    streamed = _streamed_params_file(args)
+    if streamed:
+        return svc.simulate_enqueue_file(streamed, credentials_path=args.credentials,
+                                         early_stop=early_stop, dedup=dedup)
+    params = _load_params_from_arg(args)
+    skipped = {}
+    if dedup:
+        report = {}
+        params = list(svc.dedupe_simulation_params(params, report))
+        skipped = {"skipped_duplicates": report["duplicates"], "skipped_simulated": report["simulated"]}
+        if not params:
+            return {"job_id": None, "queued": 0, "status": "skipped", **skipped}
+    job_id = svc.simulate_enqueue(params, credentials_path=args.credentials, early_stop=early_stop)
+    return {"job_id": job_id, "queued": len(params), "status": "pending", **skipped}
+
+
 def cmd_simulate(args):
     sub = args.simulate_cmd
 
     if sub == "enqueue":
-        params = _load_params_from_arg(args)
-        job_id = svc.simulate_enqueue(params, credentials_path=args.credentials)
-        result = {"job_id": job_id, "queued": len(params), "status": "pending"}
-        _out(result, args.json)
+        _out(_enqueue_from_args(args), args.json)
 
     elif sub == "run":
         # Support running immediately (no pre-enqueue required)
         if getattr(args, "job_id", None):
             job_id = args.job_id
         else:
-            params = _load_params_from_arg(args)
-            job_id = svc.simulate_enqueue(params, credentials_path=args.credentials)
-            print(f"Created job: {job_id}", file=sys.stderr)
+            enqueued = _enqueue_from_args(args)
+            if enqueued.get("status") == "error":
+                _err(enqueued["message"])
+            if enqueued["job_id"] is None:
+                _out(enqueued, args.json)
+                return
+            job_id = enqueued["job_id"]
+            print(f"Created job: {job_id} ({enqueued['queued']} items)", file=sys.stderr)
 
         print(f"Running simulation job {job_id}…", file=sys.stderr)
         result = svc.simulate_run(job_id, progress_cb=_progress)
@@ -524,9 +626,31 @@ def cmd_simulate(args):
 
     elif sub == "results":
         limit = getattr(args, "limit", 100)
-        data  = svc.simulate_results(args.job_id, limit=limit)
+        filters = {
+            "min_passed":  args.min_passed,
+            "min_sharpe":  args.min_sharpe,
+            "min_fitness": args.min_fitness,
+            "sort_by":     args.sort_by,
+            "ascending":   args.ascending,
+        }
+        if args.ndjson:
+            # One JSON object per line, written as rows are read.
+            if svc.simulate_status(args.job_id) is None:
+                _err(f"Job '{args.job_id}' not found.")
+            try:
+                offset = int(args.cursor) if args.cursor else args.offset
+            except ValueError:
+                _err(f"Invalid cursor: {args.cursor}")
+            for row in svc.iter_simulate_results(args.job_id, offset=offset, limit=limit, **filters):
+                sys.stdout.write(json.dumps(row, ensure_ascii=False, default=str) + "\n")
+                sys.stdout.flush()
+            return
+        data  = svc.simulate_results(args.job_id, limit=max(limit, 1), offset=args.offset,
+                                     cursor=args.cursor, **filters)
         if data is None:
             _err(f"Job '{args.job_id}' not found.")
+        if data.get("status") == "error":
+            _err(data["message"])
         if args.json:
             _out(data, True)
         else:
@@ -539,12 +663,15 @@ def cmd_simulate(args):
                     "Summary: "
                     f"completed={summary.get('completed_count', 0)}  "
                     f"failed={summary.get('failed_count', 0)}  "
-                    f"recovered={summary.get('recovered_count', 0)}"
+                    f"recovered={summary.get('recovered_count', 0)}  "
+                    f"dropped={summary.get('dropped_count', 0)}"
                 )
             rows = data.get("rows", [])
             print(f"\n{len(rows)} rows (of {data.get('total', '?')} total):")
             if rows:
                 _table(rows[:25], ["passed", "sharpe", "fitness", "turnover", "universe", "code"])
+            if data.get("next_cursor"):
+                print(f"\nNext page: --cursor {data['next_cursor']}")
 
     elif sub == "reconcile":
         result = svc.simulate_reconcile(
@@ -554,6 +681,11 @@ def cmd_simulate(args):
         )
         _out(result, args.json)
 
+    elif sub == "resume-dropped":
+        result = svc.simulate_resume_dropped(
+            args.job_id, credentials_path=args.credentials if args.credentials_given else None)
+        _out(result, args.json)
+
     elif sub == "list":
         jobs = svc.simulate_list()
         if args.json:
@@ -576,17 +708,53 @@ def cmd_alpha(args):
     sub = args.alpha_cmd
 
     if sub == "list":
-        items = svc.alpha_list(
-            status=getattr(args, "status", None),
-            source=getattr(args, "source", None),
-            min_sharpe=getattr(args, "min_sharpe", None),
-            min_fitness=getattr(args, "min_fitness", None),
-            limit=getattr(args, "limit", 50),
-        )
+        try:
+            page = svc.alpha_list_page(
+                cursor=args.cursor,
+                status=getattr(args, "status", None),
+                source=getattr(args, "source", None),
+                min_sharpe=getattr(args, "min_sharpe", None),
+                min_fitness=getattr(args, "min_fitness", None),
+                min_subsharpe=getattr(args, "min_subsharpe", None),
+                min_passed=getattr(args, "min_passed", None),
+                max_turnover=getattr(args, "max_turnover", None),
+                order_by=getattr(args, "order_by", "updated_at"),
+                descending=not getattr(args, "ascending", False),
+                limit=getattr(args, "limit", 50),
+            )
+        except ValueError as exc:
+            _err(str(exc))
+        items = page["items"]
+        if args.json:
+            # Plain list unless paging was asked for, so existing consumers keep working.
+            _out(page if args.cursor is not None else items, True)
+        else:
+            _table(items, ["alpha_hash", "alpha_id", "status", "source", "sharpe", "fitness",
+                           "latest_result_link", "code"])
+            if page["next_cursor"]:
+                print(f"\nNext page: --cursor {page['next_cursor']}")
+
+    elif sub == "search":
+        try:
+            items = svc.alpha_search(
+                " ".join(args.query),
+                any_term=args.any_term,
+                status=args.status,
+                source=args.source,
+                min_sharpe=args.min_sharpe,
+                min_fitness=args.min_fitness,
+                min_subsharpe=args.min_subsharpe,
+                min_passed=args.min_passed,
+                max_turnover=args.max_turnover,
+                order_by=args.order_by,
+                limit=args.limit,
+            )
+        except ValueError as exc:
+            _err(str(exc))
         if args.json:
             _out(items, True)
         else:
-            _table(items, ["alpha_hash", "alpha_id", "status", "source", "latest_result_link", "code"])
+            _table(items, ["alpha_hash", "alpha_id", "status", "sharpe", "fitness", "code"], max_col_width=60)
 
     elif sub == "show":
         alpha = svc.alpha_show(args.identifier)
@@ -595,7 +763,17 @@ def cmd_alpha(args):
         _out(alpha, args.json)
 
     elif sub == "history":
-        data = svc.alpha_history(args.identifier)
+        if args.cursor and args.limit is None:
+            _err("--cursor needs --limit.")
+        try:
+            data = svc.alpha_history(
+                args.identifier,
+                include_archived=args.archived,
+                limit=args.limit,
+                cursor=args.cursor,
+            )
+        except ValueError as exc:
+            _err(str(exc))
         if data is None:
             _err(f"Alpha '{args.identifier}' not found.")
         _out(data, args.json)
@@ -612,6 +790,69 @@ def cmd_alpha(args):
             _err(f"Alpha '{args.identifier}' not found.")
         _out(alpha, args.json)
 
+    elif sub == "enrich":
+        endpoints = [e.strip() for e in args.endpoints.split(",") if e.strip()] if args.endpoints else None
+        result = svc.alpha_enrich(
+            job_id=getattr(args, "job_id", None),
+            endpoints=endpoints,
+            limit=args.limit,
+            max_workers=args.workers,
+            requests_per_minute=args.rpm,
+            credentials_path=args.credentials,
+            progress_cb=_progress,
+        )
+        _out(result, args.json)
+
+    elif sub == "stats":
+        result = svc.alpha_stats(
+            dimension=args.by,
+            keys=args.keys or None,
+            min_simulations=args.min_simulations,
+            order_by=args.order_by,
+            descending=not args.ascending,
+            limit=args.limit,
+            rebuild=args.rebuild,
+        )
+        if result["status"] == "error":
+            _err(result["message"])
+        if args.json:
+            _out(result, True)
+        else:
+            _table(result["items"], ["key", "simulations", "pass_rate", "sharpe_mean", "sharpe_p50",
+                                     "sharpe_p90", "fitness_mean", "fitness_p50", "turnover_p50"])
+
+    elif sub == "export":
+        tables = [t.strip() for t in args.tables.split(",") if t.strip()] if args.tables else None
+        result = svc.alpha_export(
+            fmt=args.format,
+            output_dir=args.output,
+            tables=tables,
+            incremental=args.incremental,
+            chunk_size=args.chunk_size,
+            progress_cb=_progress,
+        )
+        if result["status"] == "error":
+            _err(result["message"])
+        if args.json:
+            _out(result, True)
+        else:
+            _table(result["files"], ["table", "rows", "incremental", "file"], max_col_width=80)
+
+    elif sub == "import":
+        result = svc.alpha_import(
+            paths=args.files or None,
+            data_dir=args.data_dir,
+            chunk_size=args.chunk_size,
+            restart=args.restart,
+            progress_cb=_progress,
+        )
+        if args.json:
+            _out(result, True)
+        else:
+            _table(result["files"], ["file", "status", "rows", "imported", "duplicates", "invalid"])
+            print(f"Imported {result['imported']} simulations "
+                  f"({result['duplicates']} duplicates, {result['invalid']} invalid rows skipped).")
+
     else:
         _err(f"Unknown alpha sub-command: {sub}")
 
@@ -858,6 +1099,66 @@ def cmd_telegram(args):
         _err(f"Unknown telegram sub-command: {sub}")
 
 
+# ---------------------------------------------------------------------------
+# registry group
+# ---------------------------------------------------------------------------
+
+def cmd_registry(args):
+    sub = args.registry_cmd
+
+    if sub == "maintain":
+        report = svc.registry_maintain(
+            archive_after_days=None if args.no_archive else args.archive_after_days,
+            vacuum=not args.no_vacuum,
+        )
+        if args.json:
+            _out(report, True)
+        else:
+            print(f"Size:    {report['size_before']} -> {report['size_after']} bytes "
+                  f"({report['reclaimed_bytes']} reclaimed)")
+            print(f"Events:  {report['events_before']} -> {report['events_after']} "
+                  f"({report['queued_events_collapsed']} queued events collapsed, "
+                  f"{report['events_archived']} archived)")
+            if report["archive_path"]:
+                print(f"Archive: {report['archive_path']}")
+            if report["history_probe"]:
+                print(f"history(): {report['history_ms_before']} ms -> {report['history_ms_after']} ms "
+                      f"(alpha {report['history_probe']})")
+
+    elif sub == "sync":
+        if args.export_only and args.import_only:
+            _err("--export-only and --import-only are mutually exclusive.")
+        result = svc.registry_sync(
+            args.dir,
+            export=not args.import_only,
+            import_changes=not args.export_only,
+            chunk_size=args.chunk_size,
+            progress_cb=_progress,
+        )
+        if result["status"] == "error":
+            _err(result["message"])
+        if args.json:
+            _out(result, True)
+        else:
+            print(f"Node: {result['node_id']}")
+            exported = result.get("exported")
+            if exported is not None:
+                rows = ", ".join(f"{table}={count}" for table, count in exported["rows"].items())
+                print(f"Exported: {exported['file'] or 'nothing new'} ({rows})")
+            for entry in result.get("imported") or []:
+                if entry.get("error"):
+                    print(f"Skipped {entry['node_id']}/{entry['file']}: {entry['error']}")
+                    continue
+                parts = [
+                    f"{table} " + " ".join(f"{key}={value}" for key, value in entry[table].items())
+                    for table in svc.REGISTRY_SYNC_TABLES if entry.get(table)
+                ]
+                print(f"Applied {entry['node_id']}/{entry['file']}: {'; '.join(parts) or 'empty'}")
+
+    else:
+        _err(f"Unknown registry sub-command: {sub}")
+
+
 # ---------------------------------------------------------------------------
 # worker group
 # ---------------------------------------------------------------------------
@@ -871,6 +1172,7 @@ def cmd_worker(args):
         runner = worker.BrainWorker(
             credentials_path=args.credentials,
             poll_interval=getattr(args, "poll_interval", worker.DEFAULT_POLL_INTERVAL),
+            enrich=getattr(args, "enrich", False),
         )
         runner.run_forever()
 
@@ -890,7 +1192,8 @@ def build_parser() -> argparse.ArgumentParser:
         prog="brain_cli",
         description="WorldQuant Brain Toolbox CLI — AI-agent friendly interface.",
         formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="Global flags (usable anywhere): --json  --credentials FILE",
+        epilog="Global flags (usable anywhere): --json  --credentials FILE  "
+               "--record-cassette FILE  --replay-cassette FILE  --replay-speed X",
     )
 
     sub_root = root.add_subparsers(dest="group", metavar="<group>")
@@ -919,25 +1222,69 @@ def build_parser() -> argparse.ArgumentParser:
     ds_sub = p_ds.add_subparsers(dest="datasets_cmd", metavar="<cmd>")
     ds_sub.required = True
 
-    ds_sub.add_parser("list", help="List locally cached datasets.")
+    def _add_partition_arg(p, help_text):
+        p.add_argument("--partition", type=svc.parse_partition, default=None, metavar="REGION/UNIVERSE/DELAY",
+                       help=help_text)
+
+    p_ds_list = ds_sub.add_parser("list", help="List locally cached datasets.")
+    _add_partition_arg(p_ds_list, "Only datasets of this partition (default: all).")
 
-    ds_sub.add_parser("refresh",
+    p_ds_refresh = ds_sub.add_parser("refresh",
         help="Fetch all dataset field metadata from WQ Brain API and cache locally.")
+    p_ds_refresh.add_argument("--workers", type=int, default=svc.DATASET_REFRESH_MAX_WORKERS,
+                              help="Datasets fetched in parallel.")
+    p_ds_refresh.add_argument("--requests-per-minute", type=float,
+                              default=svc.DATASET_REFRESH_REQUESTS_PER_MINUTE,
+                              dest="requests_per_minute",
+                              help="Shared request rate across all workers.")
+    p_ds_refresh.add_argument("--restart", action="store_true",
+                              help="Ignore an unfinished refresh checkpoint and start over.")
+    p_ds_refresh.add_argument("--partition", action="append", dest="partitions", default=None,
+                              metavar="REGION/UNIVERSE/DELAY",
+                              help="Partition to refresh; repeat for several "
+                                   "(default: BRAIN_DATASET_PARTITIONS or USA/TOP3000/1).")
 
     p_ds_show = ds_sub.add_parser("show", help="Show fields for a dataset.")
     p_ds_show.add_argument("dataset_id", help="Dataset ID (e.g., fundamental6).")
     p_ds_show.add_argument("--limit", type=int, default=50)
+    _add_partition_arg(p_ds_show, "Partition of the dataset (default: USA/TOP3000/1).")
 
     p_ds_search = ds_sub.add_parser("search",
         help="Search field names and descriptions across all/one dataset.")
     p_ds_search.add_argument("query", help="Search term.")
     p_ds_search.add_argument("--dataset-id", default=None, dest="dataset_id",
                               help="Restrict search to one dataset.")
+    p_ds_search.add_argument("--limit", type=int, default=None,
+                              help="Return at most this many fields "
+                                   "(default: all; 20 with --semantic).")
+    p_ds_search.add_argument("--semantic", action="store_true",
+                              help="Rank fields by meaning with the local vector index "
+                                   "instead of substring matching.")
+    p_ds_search.add_argument("--rerank", action="store_true",
+                              help="With --semantic, let Gemini reorder the top candidates "
+                                   "(needs GEMINI_API_KEY).")
+    _add_partition_arg(p_ds_search, "Only search this partition (default: all).")
+
+    p_ds_graph = ds_sub.add_parser("graph",
+        help="Build the field similarity graph used by 'datasets diverse'.")
+    p_ds_graph.add_argument("--rebuild", action="store_true",
+                            help="Rebuild even if the graph matches the catalog.")
+
+    p_ds_diverse = ds_sub.add_parser("diverse",
+        help="Pick N fields, one per cluster of near-duplicate fields.")
+    p_ds_diverse.add_argument("n", type=int, nargs="?", default=svc.DIVERSE_FIELDS_COUNT,
+                              help=f"Number of fields (default: {svc.DIVERSE_FIELDS_COUNT}).")
+    p_ds_diverse.add_argument("--dataset-id", default=None, dest="dataset_id",
+                              help="Only pick from one dataset.")
+    p_ds_diverse.add_argument("--fields-file", default=None, dest="fields_file",
+                              help="Only pick from the field names in this file (one per line).")
+    _add_partition_arg(p_ds_diverse, "Only pick from this partition (default: all).")
 
     p_ds_export = ds_sub.add_parser("export-fields",
         help="Export a dataset's fields to a CSV file.")
     p_ds_export.add_argument("dataset_id")
     p_ds_export.add_argument("output", help="Output CSV path.")
+    _add_partition_arg(p_ds_export, "Partition of the dataset (default: USA/TOP3000/1).")
 
     # ── operators ────────────────────────────────────────────────────────────
     p_ops = sub_root.add_parser("operators", help="WQ Brain operator metadata commands.")
@@ -1036,7 +1383,8 @@ def build_parser() -> argparse.ArgumentParser:
     def _add_param_args(p):
         pg = p.add_mutually_exclusive_group()
         pg.add_argument("--params-file", dest="params_file", metavar="FILE",
-                         help="CSV or JSON file with simulation parameters.")
+                         help="CSV, JSON, JSONL or generated .py file with simulation parameters "
+                              "(CSV/JSONL/.py are streamed into the job).")
         pg.add_argument("--params-json", dest="params_json", metavar="JSON",
                          help="Inline JSON array of parameter dicts.")
         pg.add_argument("--code", help="Single alpha expression (shorthand).")
@@ -1046,6 +1394,26 @@ def build_parser() -> argparse.ArgumentParser:
         p.add_argument("--region",         default="USA")
         p.add_argument("--truncation",     type=float, default=0.08)
         p.add_argument("--universe",       default="TOP3000")
+        p.add_argument("--resimulate", action="store_true",
+                       help="Keep items whose canonical code and settings repeat an earlier item "
+                            "or already have a result in the alpha registry.")
+        es = p.add_argument_group("early stop")
+        es.add_argument("--early-stop-threshold", dest="early_stop_threshold", type=float, default=None,
+                        metavar="SCORE",
+                        help="Stop simulating a group once its composite-score upper bound "
+                             "falls below SCORE.")
+        es.add_argument("--early-stop-group-by", dest="early_stop_group_by", default="template_id",
+                        metavar="KEY",
+                        help="Params key that defines a group (default: template_id; "
+                             "e.g. field for a placeholder value).")
+        es.add_argument("--early-stop-min-results", dest="early_stop_min_results", type=int, default=30,
+                        help="Completed rows needed before a group can be stopped (default 30).")
+        es.add_argument("--early-stop-confidence", dest="early_stop_confidence", type=float, default=0.95,
+                        help="One-sided confidence of the upper bound (default 0.95).")
+        es.add_argument("--early-stop-action", dest="early_stop_action", choices=["drop", "defer"],
+                        default="drop",
+                        help="drop: record remaining items on the job for resume-dropped; "
+                             "defer: run them after the rest of the batch.")
 
     p_enq = sim_sub.add_parser("enqueue",
         help="Enqueue a simulation job without running it.")
@@ -1065,13 +1433,31 @@ def build_parser() -> argparse.ArgumentParser:
 
     p_res = sim_sub.add_parser("results", help="Show simulation results.")
     p_res.add_argument("job_id")
-    p_res.add_argument("--limit", type=int, default=100)
+    p_res.add_argument("--limit", type=int, default=100,
+                       help="Rows per page (with --ndjson, 0 streams every matching row).")
+    p_res.add_argument("--offset", type=int, default=0)
+    p_res.add_argument("--cursor", default=None,
+                       help="next_cursor from the previous page (overrides --offset).")
+    p_res.add_argument("--min-passed", type=int, default=None, dest="min_passed",
+                       help="Only rows with at least this many passed checks.")
+    p_res.add_argument("--min-sharpe", type=float, default=None, dest="min_sharpe")
+    p_res.add_argument("--min-fitness", type=float, default=None, dest="min_fitness")
+    p_res.add_argument("--sort-by", default=None, dest="sort_by", choices=svc.SIM_CSV_HEADER,
+                       help="Sort by a result column (descending unless --ascending).")
+    p_res.add_argument("--ascending", action="store_true")
+    p_res.add_argument("--ndjson", action="store_true",
+                       help="Stream matching rows as newline-delimited JSON.")
 
     p_reconcile = sim_sub.add_parser(
         "reconcile",
         help="Recover failed job items whose simulation URL later completed.")
     p_reconcile.add_argument("job_id")
 
+    p_resume = sim_sub.add_parser(
+        "resume-dropped",
+        help="Enqueue the items an early-stop policy dropped as a new job.")
+    p_resume.add_argument("job_id")
+
     sim_sub.add_parser("list", help="List all simulation jobs.")
 
     # ── alpha ─────────────────────────────────────────────────────────────────
@@ -1091,13 +1477,50 @@ def build_parser() -> argparse.ArgumentParser:
                               help="Filter by alpha source.")
     p_alpha_list.add_argument("--min-sharpe", type=float, default=None, dest="min_sharpe")
     p_alpha_list.add_argument("--min-fitness", type=float, default=None, dest="min_fitness")
+    p_alpha_list.add_argument("--min-subsharpe", type=float, default=None, dest="min_subsharpe")
+    p_alpha_list.add_argument("--min-passed", type=int, default=None, dest="min_passed")
+    p_alpha_list.add_argument("--max-turnover", type=float, default=None, dest="max_turnover")
+    p_alpha_list.add_argument("--order-by", default="updated_at", dest="order_by",
+                              choices=list(svc.ALPHA_ORDER_COLUMNS),
+                              help="Sort column (default: updated_at). Metric orders skip alphas without that metric.")
+    p_alpha_list.add_argument("--ascending", action="store_true")
     p_alpha_list.add_argument("--limit", type=int, default=50)
+    p_alpha_list.add_argument("--cursor", nargs="?", const="", default=None,
+                              help="Page with keyset cursors: bare --cursor starts at the first page; "
+                                   "pass the printed next_cursor to continue.")
+
+    p_alpha_search = alpha_sub.add_parser(
+        "search",
+        help="Search alpha code by operator/field tokens, e.g. 'ts_regression anl10_*'.")
+    p_alpha_search.add_argument("query", nargs="+",
+                                help="Tokens to match; a trailing * matches a prefix. All must match unless --any.")
+    p_alpha_search.add_argument("--any", action="store_true", dest="any_term",
+                                help="Match alphas containing any of the tokens.")
+    p_alpha_search.add_argument("--status", default=None,
+                                choices=["candidate", "simulated", "promoted", "rejected", "failed"])
+    p_alpha_search.add_argument("--source", default=None)
+    p_alpha_search.add_argument("--min-sharpe", type=float, default=None, dest="min_sharpe")
+    p_alpha_search.add_argument("--min-fitness", type=float, default=None, dest="min_fitness")
+    p_alpha_search.add_argument("--min-subsharpe", type=float, default=None, dest="min_subsharpe")
+    p_alpha_search.add_argument("--min-passed", type=int, default=None, dest="min_passed")
+    p_alpha_search.add_argument("--max-turnover", type=float, default=None, dest="max_turnover")
+    p_alpha_search.add_argument("--order-by", default="recent", dest="order_by",
+                                choices=list(svc.ALPHA_SEARCH_ORDERS + svc.ALPHA_ORDER_COLUMNS),
+                                help="recent (newest first, default), rank (relevance), "
+                                     "or a column sorted descending.")
+    p_alpha_search.add_argument("--limit", type=int, default=50)
 
     p_alpha_show = alpha_sub.add_parser("show", help="Show one alpha by hash or WQ alpha ID.")
     p_alpha_show.add_argument("identifier", help="alpha_hash or alpha_id")
 
     p_alpha_history = alpha_sub.add_parser("history", help="Show alpha simulation and event history.")
     p_alpha_history.add_argument("identifier", help="alpha_hash or alpha_id")
+    p_alpha_history.add_argument("--archived", action="store_true",
+                                 help="Also include events moved to the archive by `registry maintain`.")
+    p_alpha_history.add_argument("--limit", type=int, default=None,
+                                 help="Return at most this many simulations and events, plus a next_cursor.")
+    p_alpha_history.add_argument("--cursor", default=None,
+                                 help="next_cursor from the previous page (needs --limit).")
 
     p_alpha_promote = alpha_sub.add_parser("promote", help="Mark an alpha as promoted.")
     p_alpha_promote.add_argument("identifier", help="alpha_hash or alpha_id")
@@ -1107,6 +1530,90 @@ def build_parser() -> argparse.ArgumentParser:
     p_alpha_reject.add_argument("identifier", help="alpha_hash or alpha_id")
     p_alpha_reject.add_argument("--reason", required=True)
 
+    p_alpha_enrich = alpha_sub.add_parser(
+        "enrich",
+        help="Fetch extra statistics (self-correlation, yearly stats, PnL) for completed alphas.")
+    p_alpha_enrich.add_argument("--job-id", dest="job_id", default=None,
+                                help="Enrich this simulation job's alphas (default: newest pending in the registry).")
+    p_alpha_enrich.add_argument("--endpoints", default=None,
+                                help="Comma-separated endpoints: "
+                                     f"{', '.join(svc.ENRICHMENT_ENDPOINTS)} "
+                                     f"(default: {','.join(svc.DEFAULT_ENRICHMENT_ENDPOINTS)}).")
+    p_alpha_enrich.add_argument("--limit", type=int, default=100,
+                                help="Max registry alphas to pick up when --job-id is not given.")
+    p_alpha_enrich.add_argument("--workers", type=int, default=svc.ENRICHMENT_MAX_WORKERS)
+    p_alpha_enrich.add_argument("--rpm", type=float, default=svc.ENRICHMENT_REQUESTS_PER_MINUTE,
+                                help="Enrichment requests per minute across all workers.")
+
+    p_alpha_stats = alpha_sub.add_parser(
+        "stats",
+        help="Simulation counts, pass rate and metric quantiles per template, field or operator.")
+    p_alpha_stats.add_argument("keys", nargs="*",
+                               help="Only these templates / fields / operators (default: all).")
+    p_alpha_stats.add_argument("--by", default="template", choices=list(svc.ALPHA_STATS_DIMENSIONS))
+    p_alpha_stats.add_argument("--min-simulations", type=int, default=1, dest="min_simulations")
+    p_alpha_stats.add_argument("--order-by", default="simulations", dest="order_by",
+                               choices=list(svc.ALPHA_STATS_ORDERS),
+                               help="Sort key; metric names sort by their mean.")
+    p_alpha_stats.add_argument("--ascending", action="store_true")
+    p_alpha_stats.add_argument("--limit", type=int, default=50)
+    p_alpha_stats.add_argument("--rebuild", action="store_true",
+                               help="Recompute the aggregates from all simulations first "
+                                    "(e.g. after downloading new datasets).")
+
+    p_alpha_export = alpha_sub.add_parser(
+        "export",
+        help="Export alphas and simulations as flat, typed Parquet / Arrow / NPZ files.")
+    p_alpha_export.add_argument("--format", default="parquet", choices=list(svc.ALPHA_EXPORT_FORMATS),
+                                help="parquet/arrow need pyarrow; npz needs numpy.")
+    p_alpha_export.add_argument("--output", default=svc.EXPORTS_DIR,
+                                help="Output directory (default: .brain_cli/exports).")
+    p_alpha_export.add_argument("--tables", default=None,
+                                help=f"Comma-separated tables (default: {','.join(svc.ALPHA_EXPORT_TABLES)}).")
+    p_alpha_export.add_argument("--incremental", action="store_true",
+                                help="Only rows created or updated since the last export to this directory/format.")
+    p_alpha_export.add_argument("--chunk-size", type=int, default=svc.ALPHA_EXPORT_CHUNK_SIZE,
+                                dest="chunk_size", help="Rows read and written per chunk.")
+
+    p_alpha_import = alpha_sub.add_parser(
+        "import",
+        help="Backfill historical result CSVs (data/*.csv) into the registry; resumable.")
+    p_alpha_import.add_argument("files", nargs="*",
+                                help="Result CSVs to import (default: every CSV in --data-dir).")
+    p_alpha_import.add_argument("--data-dir", default=svc.DATA_DIR, dest="data_dir")
+    p_alpha_import.add_argument("--chunk-size", type=int, default=svc.ALPHA_IMPORT_CHUNK_SIZE,
+                                dest="chunk_size", help="Rows per transaction.")
+    p_alpha_import.add_argument("--restart", action="store_true",
+                                help="Ignore saved progress and re-read every file from the start.")
+
+    # ── registry ──────────────────────────────────────────────────────────────
+    p_registry = sub_root.add_parser("registry", help="Alpha registry database maintenance.")
+    registry_sub = p_registry.add_subparsers(dest="registry_cmd", metavar="<cmd>")
+    registry_sub.required = True
+
+    p_registry_maintain = registry_sub.add_parser(
+        "maintain",
+        help="Collapse queued events, archive old events, VACUUM/ANALYZE and report the effect.")
+    p_registry_maintain.add_argument("--archive-after-days", type=float, default=svc.EVENT_ARCHIVE_AFTER_DAYS,
+                                     dest="archive_after_days",
+                                     help="Move events older than this many days to the archive database.")
+    p_registry_maintain.add_argument("--no-archive", action="store_true", dest="no_archive",
+                                     help="Keep all events in the registry.")
+    p_registry_maintain.add_argument("--no-vacuum", action="store_true", dest="no_vacuum",
+                                     help="Skip VACUUM/ANALYZE.")
+
+    p_registry_sync = registry_sub.add_parser(
+        "sync",
+        help="Exchange registry change-sets with other machines through a shared directory.")
+    p_registry_sync.add_argument("--dir", default=svc.REGISTRY_SYNC_DIR,
+                                 help="Shared sync directory (default: $BRAIN_REGISTRY_SYNC_DIR).")
+    p_registry_sync.add_argument("--export-only", action="store_true", dest="export_only",
+                                 help="Only write local changes.")
+    p_registry_sync.add_argument("--import-only", action="store_true", dest="import_only",
+                                 help="Only merge other nodes' change-sets.")
+    p_registry_sync.add_argument("--chunk-size", type=int, default=svc.REGISTRY_SYNC_CHUNK_SIZE,
+                                 dest="chunk_size", help="Rows per read/merge transaction.")
+
     # ── backtest ─────────────────────────────────────────────────────────────
     p_bt = sub_root.add_parser("backtest", help="Backtest data commands.")
     p_bt.add_argument("--data-dir", default=svc.DATA_DIR, dest="data_dir")
@@ -1231,6 +1738,8 @@ def build_parser() -> argparse.ArgumentParser:
     p_worker_run.add_argument("--log-level", default="INFO",
                               choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
                               help="Console log level for the worker loop (default: INFO).")
+    p_worker_run.add_argument("--enrich", action="store_true",
+                              help="Also run the alpha enrichment stage in a background thread.")
 
     worker_sub.add_parser("status", help="Show whether the persistent worker is running.")
 
@@ -1249,6 +1758,7 @@ DISPATCH = {
     "generate":  cmd_generate,
     "simulate":  cmd_simulate,
     "alpha":     cmd_alpha,
+    "registry":  cmd_registry,
     "backtest":  cmd_backtest,
     "evolution": cmd_evolution,
     "telegram":  cmd_telegram,
@@ -1256,18 +1766,30 @@ DISPATCH = {
 }
 
 
+# Global flags that are exported as environment variables so worker
+# processes started from this CLI inherit them.
+ENV_GLOBAL_FLAGS = {
+    "--record-cassette": wq_cassette.RECORD_ENV,
+    "--replay-cassette": wq_cassette.REPLAY_ENV,
+    "--replay-speed":    wq_cassette.SPEED_ENV,
+}
+
+
 def _preprocess_global_flags(argv: list) -> tuple:
     """
-    Extract --json and --credentials FILE from anywhere in the argument list
-    so they work whether placed before or after the subcommand group.
-    Returns (cleaned_argv, json_flag, credentials_value).
+    Extract --json, --credentials FILE and the cassette flags from anywhere in
+    the argument list so they work whether placed before or after the
+    subcommand group.
+    Returns (cleaned_argv, json_flag, credentials_value); credentials_value is
+    None when --credentials was not given.
     """
     json_flag    = False
-    credentials  = svc.CREDS_PATH
+    credentials  = None
     cleaned      = []
     i = 0
     while i < len(argv):
         tok = argv[i]
+        flag = tok.split("=", 1)[0]
         if tok == "--json":
             json_flag = True
         elif tok in ("--credentials", "--credentials=") and i + 1 < len(argv):
@@ -1275,6 +1797,11 @@ def _preprocess_global_flags(argv: list) -> tuple:
             i += 1
         elif tok.startswith("--credentials="):
             credentials = tok.split("=", 1)[1]
+        elif flag in ENV_GLOBAL_FLAGS and "=" in tok:
+            os.environ[ENV_GLOBAL_FLAGS[flag]] = tok.split("=", 1)[1]
+        elif tok in ENV_GLOBAL_FLAGS and i + 1 < len(argv):
+            os.environ[ENV_GLOBAL_FLAGS[tok]] = argv[i + 1]
+            i += 1
         else:
             cleaned.append(tok)
         i += 1
@@ -1292,7 +1819,9 @@ def main():
 
     # Inject the pre-processed global flags into the namespace
     args.json        = json_flag
-    args.credentials = credentials
+    args.credentials = credentials if credentials is not None else svc.CREDS_PATH
+    # Commands that fall back to a stored credentials path need to know whether one was given.
+    args.credentials_given = credentials is not None
 
     # Propagate shared flags down
     if not hasattr(args, "datasets_dir"):
@@ -18,6 +18,10 @@ SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 WORKER_STATE_FILE = os.path.join(svc.CLI_STATE_DIR, "worker.json")
 DEFAULT_POLL_INTERVAL = 3
 SCAN_SUMMARY_INTERVAL_SECONDS = 30
+ENRICHMENT_INTERVAL_SECONDS = 60
+ENRICHMENT_BATCH_SIZE = 50
+REGISTRY_MAINTENANCE_INTERVAL_SECONDS = 24 * 60 * 60
+REGISTRY_SYNC_INTERVAL_SECONDS = 15 * 60
 
 
 def _ensure_state_dir():
@@ -75,14 +79,28 @@ def _status_counts(jobs: list[dict]) -> dict[str, int]:
     return counts
 
 
+class _WorkerStopFlag:
+    """Stop flag for background stages, tripped when the worker is stopping."""
+
+    def __init__(self, worker: "BrainWorker"):
+        self._worker = worker
+
+    def check(self) -> bool:
+        return self._worker._stop_requested
+
+
 class BrainWorker:
-    def __init__(self, credentials_path: str = svc.CREDS_PATH, poll_interval: int = DEFAULT_POLL_INTERVAL):
+    def __init__(self, credentials_path: str = svc.CREDS_PATH, poll_interval: int = DEFAULT_POLL_INTERVAL,
+                 enrich: bool = False):
         self.credentials_path = credentials_path
         self.poll_interval = poll_interval
+        self.enrich = enrich
         self._stop_requested = False
         self._telegram_thread: Optional[threading.Thread] = None
+        self._enrichment_thread: Optional[threading.Thread] = None
         self._last_scan_summary_at = 0.0
         self._last_scan_signature: Optional[tuple] = None
+        self._last_registry_sync_at = 0.0
 
     def request_stop(self, *_args):
         self._stop_requested = True
@@ -109,6 +127,37 @@ class BrainWorker:
         self._telegram_thread.start()
         logging.info("Telegram monitoring thread started.")
 
+    def _run_enrichment_loop(self):
+        stop_flag = _WorkerStopFlag(self)
+        while not self._stop_requested:
+            try:
+                result = svc.alpha_enrich(
+                    limit=ENRICHMENT_BATCH_SIZE,
+                    credentials_path=self.credentials_path,
+                    stop_flag=stop_flag,
+                )
+                if result.get("status") == "error":
+                    logging.warning("Alpha enrichment skipped: %s", result.get("message"))
+                elif result.get("enriched") or result.get("failed"):
+                    logging.info(
+                        "Alpha enrichment: enriched=%s cached=%s failed=%s",
+                        result.get("enriched"), result.get("cached"), result.get("failed"),
+                    )
+            except Exception:
+                logging.exception("Alpha enrichment pass failed.")
+            deadline = time.monotonic() + ENRICHMENT_INTERVAL_SECONDS
+            while not self._stop_requested and time.monotonic() < deadline:
+                time.sleep(1)
+
+    def _start_enrichment_thread(self):
+        self._enrichment_thread = threading.Thread(
+            target=self._run_enrichment_loop,
+            name="brain-enrichment-worker",
+            daemon=True,
+        )
+        self._enrichment_thread.start()
+        logging.info("Alpha enrichment thread started (interval=%ss).", ENRICHMENT_INTERVAL_SECONDS)
+
     def _next_pending_simulation_job(self, jobs: list[dict]) -> Optional[dict]:
         if any(job.get("status") == "running" for job in jobs):
             return None
@@ -134,8 +183,13 @@ class BrainWorker:
         self._last_scan_signature = signature
         self._last_scan_summary_at = now
         next_pending = pending_ids[0] if pending_ids else None
+        try:
+            cache = svc.alpha_cache_stats()
+        except Exception:
+            cache = {}
         logging.info(
-            "Worker scan: total=%s pending=%s running=%s done=%s failed=%s stopped=%s next_pending=%s",
+            "Worker scan: total=%s pending=%s running=%s done=%s failed=%s stopped=%s next_pending=%s "
+            "alpha_cache=%s/%s",
             len(jobs),
             counts.get("pending", 0),
             counts.get("running", 0),
@@ -143,13 +197,59 @@ class BrainWorker:
             counts.get("failed", 0),
             counts.get("stopped", 0),
             next_pending or "-",
+            cache.get("hits", 0),
+            cache.get("misses", 0),
         )
 
+    def _maintain_registry_if_due(self):
+        # Only called while no simulation job is running, so VACUUM does not
+        # hold the registry lock under an active job.
+        try:
+            if not svc.registry_maintenance_due(REGISTRY_MAINTENANCE_INTERVAL_SECONDS):
+                return
+            report = svc.registry_maintain()
+            logging.info(
+                "Registry maintenance: reclaimed=%s bytes events=%s->%s archived=%s history_ms=%s->%s",
+                report.get("reclaimed_bytes"),
+                report.get("events_before"),
+                report.get("events_after"),
+                report.get("events_archived"),
+                report.get("history_ms_before"),
+                report.get("history_ms_after"),
+            )
+        except Exception:
+            logging.exception("Registry maintenance failed.")
+
+    def _sync_registry_if_due(self):
+        # Runs only when BRAIN_REGISTRY_SYNC_DIR is set; other machines pick
+        # up the change-sets on their own schedule.
+        now = time.monotonic()
+        if not svc.REGISTRY_SYNC_DIR or now - self._last_registry_sync_at < REGISTRY_SYNC_INTERVAL_SECONDS:
+            return
+        self._last_registry_sync_at = now
+        try:
+            result = svc.registry_sync()
+            if result.get("status") == "error":
+                logging.warning("Registry sync skipped: %s", result.get("message"))
+                return
+            applied = [entry for entry in result.get("imported") or [] if not entry.get("error")]
+            logging.info(
+                "Registry sync: exported=%s applied_files=%s failed_files=%s",
+                result["exported"]["rows"],
+                len(applied),
+                len(result.get("imported") or []) - len(applied),
+            )
+        except Exception:
+            logging.exception("Registry sync failed.")
+
     def _run_pending_jobs_once(self):
         jobs = svc.simulate_list()
         self._log_scan_summary(jobs)
         job = self._next_pending_simulation_job(jobs)
         if job is None:
+            if not any(j.get("status") == "running" for j in jobs):
+                self._maintain_registry_if_due()
+                self._sync_registry_if_due()
             return
 
         job_id = job["id"]
@@ -172,6 +272,8 @@ class BrainWorker:
             WORKER_STATE_FILE,
         )
         self._start_telegram_thread()
+        if self.enrich:
+            self._start_enrichment_thread()
 
         signal.signal(signal.SIGTERM, self.request_stop)
         signal.signal(signal.SIGINT, self.request_stop)
@@ -9,25 +9,60 @@ or DataFrames so the CLI can easily serialise to JSON or plain text.
 
 from __future__ import annotations
 
+import ast
+import codecs
 import csv
 import datetime
+import gzip
+import hashlib
+import heapq
+import io
 import itertools
 import json
 import logging
+import math
 import os
 import re
+import statistics
 import sys
 import time
+import tokenize
 import uuid as _uuid_mod
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from threading import Lock, RLock
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 from urllib.parse import urljoin
 
 import pandas as pd
 import requests
-from alpha_registry import get_registry
+import wq_cassette
+from alpha_registry import (
+    ORDER_COLUMNS as ALPHA_ORDER_COLUMNS,
+    SEARCH_ORDERS as ALPHA_SEARCH_ORDERS,
+    EVENT_ARCHIVE_AFTER_DAYS,
+    EXPORT_CHUNK_SIZE as ALPHA_EXPORT_CHUNK_SIZE,
+    EXPORT_TABLES as ALPHA_EXPORT_TABLES,
+    SYNC_CHUNK_SIZE as REGISTRY_SYNC_CHUNK_SIZE,
+    SYNC_TABLES as REGISTRY_SYNC_TABLES,
+    STATS_DIMENSIONS as ALPHA_STATS_DIMENSIONS,
+    STATS_ORDERS as ALPHA_STATS_ORDERS,
+    alpha_id_from_link,
+    get_registry,
+    passed_float,
+    simulation_key,
+    template_id_for_code,
+)
+from fastexpr import canonical_hash
+from field_catalog import (
+    DEFAULT_PARTITION,
+    DISPLAY_COLUMNS as FIELD_DISPLAY_COLUMNS,
+    FIELDS_FILE_SUFFIX,
+    get_catalog as get_field_catalog,
+    parse_partition,
+    partition_dir,
+    partition_key,
+)
 from wq_session import (
     BRAIN_API_BASE,
     authenticate_with_brain,
@@ -60,6 +95,8 @@ DATAFIELDS_API  = f"{BRAIN_API_BASE}/data-fields"
 OPERATORS_API   = f"{BRAIN_API_BASE}/operators"
 OPERATORS_FILE  = os.path.join(OPERATORS_DIR, "operators.json")
 OPERATOR_DOCS_DIR = os.path.join(OPERATORS_DIR, "docs")
+ENRICHMENT_DIR  = os.path.join(CLI_STATE_DIR, "enrichment")
+EXPORTS_DIR     = os.path.join(CLI_STATE_DIR, "exports")
 DEFAULT_DATA_FIELD_OPTION = {
     "instrumentType": "EQUITY",
     "region": "USA",
@@ -84,6 +121,35 @@ SIMULATION_ERROR_STATUSES = {"ERROR", "TIMEOUT", "FAIL", "CANCELLED"}
 SIMULATION_DONE_STATUSES = {"COMPLETE", "WARNING"}
 SIMULATION_TRANSIENT_POLL_STATUSES = {500, 502, 503, 504}
 SIMULATION_POLL_BACKOFF_MAX_SECONDS = 60.0
+SIMULATION_ENQUEUE_CHUNK_SIZE = 1000
+ALPHA_IMPORT_CHUNK_SIZE = 5000
+# Extra per-alpha endpoints fetched by the enrichment stage, keyed by the
+# name used in the registry and the payload cache.
+ENRICHMENT_ENDPOINTS = {
+    "self_correlation": "/alphas/{alpha_id}/correlations/self",
+    "yearly_stats":     "/alphas/{alpha_id}/recordsets/yearly-stats",
+    "pnl":              "/alphas/{alpha_id}/recordsets/pnl",
+}
+DEFAULT_ENRICHMENT_ENDPOINTS = ("self_correlation", "yearly_stats")
+ENRICHMENT_MAX_WORKERS = 2
+ENRICHMENT_REQUESTS_PER_MINUTE = 30
+ENRICHMENT_MAX_POLLS = 20
+ALPHA_EXPORT_FORMATS = ("parquet", "arrow", "npz")
+# Shared directory (file drop) for `registry sync`; each registry writes its
+# change-sets to <dir>/<node_id>/ and reads everyone else's.
+REGISTRY_SYNC_DIR = os.environ.get("BRAIN_REGISTRY_SYNC_DIR", "")
+REGISTRY_SYNC_FORMAT = "brain-registry-changes/1"
+REGISTRY_SYNC_SUFFIX = ".jsonl.gz"
+# Dataset refresh: page sizes are tried largest first and the first size the
+# API accepts is kept; requests share one limiter across the worker pool.
+DATASET_REFRESH_PAGE_SIZES = (1000, 500, 100, 50)
+DATASET_REFRESH_MAX_WORKERS = 4
+DATASET_REFRESH_REQUESTS_PER_MINUTE = 60
+DATASET_REFRESH_CHECKPOINT = os.path.join(CLI_STATE_DIR, "datasets_refresh.json")
+SEMANTIC_SEARCH_LIMIT = 20
+# Local candidates handed to Gemini when reranking semantic search results.
+SEMANTIC_RERANK_CANDIDATES = 50
+DIVERSE_FIELDS_COUNT = 50
 _JOB_STORE_LOCK = RLock()
 
 # ---------------------------------------------------------------------------
@@ -173,16 +239,63 @@ def _sleep_with_stop(stop_flag, seconds: float) -> bool:
         time.sleep(min(30, remaining))
 
 
-def _simulation_params_by_uuid_or_alpha(job: dict, item: dict) -> dict:
-    params = ((job.get("params") or {}).get("params") or [])
+def _job_items_path(job_id: str) -> str:
+    return os.path.join(JOBS_DIR, f"{job_id}.items.jsonl")
+
+
+def iter_job_params(job: dict) -> Iterator[dict]:
+    """Yield a simulation job's params, whether stored inline or in an items file."""
+    job_params = job.get("params") or {}
+    items_file = job_params.get("params_file")
+    if not items_file:
+        yield from (job_params.get("params") or [])
+        return
+    with open(items_file, "r", encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def _job_params(job: dict) -> List[dict]:
+    return list(iter_job_params(job))
+
+
+def _job_params_count(job: dict) -> int:
+    job_params = job.get("params") or {}
+    if job_params.get("params_file"):
+        return int(job_params.get("params_count") or 0)
+    return len(job_params.get("params") or [])
+
+
+def _simulation_params_index(job: dict, items: List[dict]) -> Tuple[Dict[str, dict], Dict[str, dict]]:
+    """
+    Params of *items* by uuid and by code, read in one pass over the job's params.
+
+    Only params that some item refers to are kept; the first match wins.
+    """
+    uuids = {item.get("uuid") for item in items if item.get("uuid")}
+    codes = {str(item.get("alpha") or "").strip() for item in items} - {""}
+    by_uuid: Dict[str, dict] = {}
+    by_code: Dict[str, dict] = {}
+    for candidate in iter_job_params(job):
+        candidate_uuid = candidate.get("uuid")
+        if candidate_uuid in uuids and candidate_uuid not in by_uuid:
+            by_uuid[candidate_uuid] = candidate
+        code = str(candidate.get("code") or "").strip()
+        if code in codes and code not in by_code:
+            by_code[code] = candidate
+    return by_uuid, by_code
+
+
+def _simulation_params_by_uuid_or_alpha(index: Tuple[Dict[str, dict], Dict[str, dict]], item: dict) -> dict:
+    by_uuid, by_code = index
     item_uuid = item.get("uuid")
+    if item_uuid and item_uuid in by_uuid:
+        return dict(by_uuid[item_uuid])
     item_alpha = str(item.get("alpha") or "").strip()
-    for candidate in params:
-        if item_uuid and candidate.get("uuid") == item_uuid:
-            return dict(candidate)
-    for candidate in params:
-        if item_alpha and str(candidate.get("code") or "").strip() == item_alpha:
-            return dict(candidate)
+    if item_alpha and item_alpha in by_code:
+        return dict(by_code[item_alpha])
     return dict(item.get("simulation") or {})
 
 
@@ -190,16 +303,18 @@ def _refresh_simulation_summary(job: dict):
     completed_rows = list(job.get("completed_rows", []))
     failed_items = list(job.get("failed_items", []))
     recovered_items = list(job.get("recovered_items", []))
-    params = ((job.get("params") or {}).get("params") or [])
-    total = job.get("total_count") or len(params)
+    dropped_items = list(job.get("dropped_items", []))
+    total = job.get("total_count") or _job_params_count(job)
     completed_count = len(completed_rows)
     failed_count = len(failed_items)
     recovered_count = len(recovered_items)
-    processed_count = completed_count + failed_count
+    dropped_count = len(dropped_items)
+    processed_count = completed_count + failed_count + dropped_count
     job["total_count"] = total
     job["completed_count"] = completed_count
     job["failed_count"] = failed_count
     job["recovered_count"] = recovered_count
+    job["dropped_count"] = dropped_count
     job["processed_count"] = processed_count
     job["summary"] = {
         "status": job.get("status"),
@@ -208,6 +323,7 @@ def _refresh_simulation_summary(job: dict):
         "completed_count": completed_count,
         "failed_count": failed_count,
         "recovered_count": recovered_count,
+        "dropped_count": dropped_count,
     }
 
 
@@ -220,7 +336,7 @@ def _request_with_rate_limit_retry(session: requests.Session, method: str, url:
         if response.status_code == 429:
             if attempt >= max_retries:
                 return response
-            retry_after = int(response.headers.get("Retry-After", 300))
+            retry_after = _retry_after_seconds(response.headers, 300)
             if progress_cb:
                 progress_cb(f"Rate limited during {retry_context}; retrying in {retry_after}s…")
             time.sleep(retry_after)
@@ -230,7 +346,7 @@ def _request_with_rate_limit_retry(session: requests.Session, method: str, url:
                 return response
             if progress_cb:
                 progress_cb(f"WQ server returned {response.status_code} during {retry_context}; retrying in 10s…")
-            time.sleep(10)
+            wq_cassette.pace(10)
             continue
         return response
     return response
@@ -296,13 +412,45 @@ def _notify_login_issue(reason: str, detail: str = "", cooldown_key: str = "auth
 # Job state store (file-backed)
 # ---------------------------------------------------------------------------
 
+class RequestRateLimiter:
+    """
+    Request pacing shared by the threads of one bulk fetch (enrichment, dataset refresh).
+
+    Spaces request starts at least ``60 / requests_per_minute`` seconds apart
+    across all threads, and pushes the next slot back when WQ answers 429 so
+    every thread backs off together.  The interval is scaled by the cassette
+    replay speed while replaying; ``defer`` takes its wait as given, since
+    replayed ``Retry-After`` headers are already scaled (callers scale their
+    own fallback waits).
+    """
+
+    def __init__(self, requests_per_minute: float = ENRICHMENT_REQUESTS_PER_MINUTE):
+        self.interval = wq_cassette.scaled(60.0 / max(float(requests_per_minute), 0.001))
+        self._lock = Lock()
+        self._next_at = 0.0
+
+    def wait(self, stop_flag) -> bool:
+        with self._lock:
+            start_at = max(time.monotonic(), self._next_at)
+            self._next_at = start_at + self.interval
+        return _sleep_with_stop(stop_flag, start_at - time.monotonic())
+
+    def defer(self, seconds: float):
+        with self._lock:
+            self._next_at = max(self._next_at, time.monotonic() + max(float(seconds), 0.0))
+
+
 class JobStore:
     """Simple file-backed job state manager under .brain_cli/jobs/."""
 
     @staticmethod
-    def create(job_type: str, params: dict) -> str:
+    def new_id() -> str:
+        return _uuid_mod.uuid4().hex[:12]
+
+    @staticmethod
+    def create(job_type: str, params: dict, job_id: Optional[str] = None) -> str:
         with _JOB_STORE_LOCK:
-            job_id = _uuid_mod.uuid4().hex[:12]
+            job_id = job_id or JobStore.new_id()
             now    = datetime.datetime.now().isoformat()
             job    = {
                 "id":         job_id,
@@ -516,29 +664,183 @@ def auth_complete_from_credentials(credentials_path: str = CREDS_PATH,
 # Dataset service
 # ---------------------------------------------------------------------------
 
-def datasets_list(datasets_dir: str = DATASETS_DIR) -> List[dict]:
-    """List available local dataset CSVs."""
-    out = []
-    if not os.path.isdir(datasets_dir):
-        return out
-    for fn in sorted(os.listdir(datasets_dir)):
-        if fn.endswith("_fields_formatted.csv"):
-            ds_id = fn.replace("_fields_formatted.csv", "")
-            fp    = os.path.join(datasets_dir, fn)
-            size  = os.path.getsize(fp)
-            try:
-                df = pd.read_csv(fp, nrows=0)
-                rows = sum(1 for _ in open(fp, encoding="utf-8")) - 1
-            except Exception:
-                rows = -1
-            out.append({"dataset_id": ds_id, "file": fn, "rows": rows, "size_bytes": size})
-    return out
+def _dataset_csv_text(rows: List[dict]) -> str:
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=list(FIELD_DISPLAY_COLUMNS), lineterminator="\n")
+    writer.writeheader()
+    writer.writerows(rows)
+    return buf.getvalue()
+
+
+def _read_dataset_rows(path: str) -> Optional[Dict[str, dict]]:
+    try:
+        with open(path, "r", newline="", encoding="utf-8-sig") as fh:
+            return {row.get("Field", ""): row for row in csv.DictReader(fh)}
+    except (OSError, UnicodeDecodeError, csv.Error):
+        return None
+
+
+def _dataset_diff(old: Optional[Dict[str, dict]], rows: List[dict]) -> dict:
+    """Field names added, removed and changed (any column) between a local CSV and fetched rows."""
+    new = {str(row["Field"]): {key: "" if value is None else str(value) for key, value in row.items()}
+           for row in rows}
+    old = old or {}
+    return {
+        "added": sorted(set(new) - set(old)),
+        "removed": sorted(set(old) - set(new)),
+        "changed": sorted(
+            name for name in set(new) & set(old)
+            if any(new[name][key] != (old[name].get(key) or "") for key in FIELD_DISPLAY_COLUMNS)
+        ),
+    }
+
+
+class _PageSize:
+    """Largest page size the API has accepted so far, shared by the refresh threads."""
+
+    def __init__(self, sizes: Iterable[int] = DATASET_REFRESH_PAGE_SIZES):
+        self._sizes = sorted({int(size) for size in sizes}, reverse=True)
+        self._index = 0
+        self._lock = Lock()
+
+    @property
+    def value(self) -> int:
+        return self._sizes[self._index]
+
+    def reject(self, size: int) -> bool:
+        """Fall back below a rejected *size*; False once the smallest size was rejected."""
+        with self._lock:
+            if self.value == size and self._index + 1 < len(self._sizes):
+                self._index += 1
+            return self.value < size
+
+
+def _fetch_all_pages(session: requests.Session, limiter: RequestRateLimiter, page_size: _PageSize,
+                     url: str, params: dict, stop_flag, context: str, *, max_retries: int = 5) -> List[dict]:
+    """
+    GET every page of a WQ list endpoint under the shared limiter.
+
+    A page answered 429 or 5xx is retried up to *max_retries* times before the
+    error is raised.
+    """
+    results: List[dict] = []
+    offset = 0
+    retries = 0
+    while True:
+        if not limiter.wait(stop_flag):
+            raise RuntimeError("Stopped by user")
+        limit = page_size.value
+        r = session.get(url, params={**params, "limit": limit, "offset": offset}, timeout=30)
+        if r.status_code == 401:
+            clear_login_state()
+            persona_url = extract_persona_url(r)
+            if persona_url:
+                raise PermissionError(f"Persona verification required: {persona_url}")
+            raise PermissionError(f"Unauthorized while fetching {context}.")
+        transient = r.status_code == 429 or r.status_code in SIMULATION_TRANSIENT_POLL_STATUSES
+        if transient and retries < max_retries:
+            retries += 1
+            limiter.defer(_retry_after_seconds(r.headers, wq_cassette.scaled(30 if r.status_code == 429 else 10)))
+            continue
+        if r.status_code == 400 and page_size.reject(limit):
+            continue
+        r.raise_for_status()
+        retries = 0
+        body = r.json()
+        page = body.get("results", [])
+        results.extend(page)
+        # Advance by what came back, in case the API caps the page below *limit*.
+        offset += len(page)
+        if not page or offset >= body.get("count", 0):
+            return results
+
+
+def _refresh_one_dataset(session: requests.Session, limiter: RequestRateLimiter, page_size: _PageSize,
+                         datasets_dir: str, dataset_id: str, option: dict, stop_flag) -> dict:
+    fields = _fetch_all_pages(
+        session, limiter, page_size, DATAFIELDS_API,
+        {**option, "dataset.id": dataset_id}, stop_flag, f"fields for {dataset_id}",
+    )
+    rows = [_data_field_row(field) for field in fields]
+    outcome = {"dataset_id": dataset_id, "fields": len(rows), "status": "empty", "content_hash": None}
+    if not rows:
+        return outcome
+    text = _dataset_csv_text(rows)
+    content = text.encode("utf-8")
+    outcome["content_hash"] = hashlib.sha256(content).hexdigest()
+    path = os.path.join(datasets_dir, f"{dataset_id}{FIELDS_FILE_SUFFIX}")
+    try:
+        with open(path, "rb") as fh:
+            existing = fh.read()
+    except FileNotFoundError:
+        existing = None
+    if existing is not None and hashlib.sha256(existing).hexdigest() == outcome["content_hash"]:
+        outcome["status"] = "unchanged"
+        return outcome
+    outcome["status"] = "updated" if existing is not None else "added"
+    outcome["diff"] = _dataset_diff(_read_dataset_rows(path) if existing is not None else None, rows)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(content)
+    os.replace(tmp, path)
+    return outcome
+
+
+def _load_refresh_checkpoint(path: str, datasets_dir: str) -> Optional[dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            checkpoint = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    if checkpoint.get("datasets_dir") != os.path.abspath(datasets_dir) or "partitions" not in checkpoint:
+        return None
+    return checkpoint
+
+
+def _save_refresh_checkpoint(path: str, checkpoint: dict):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    checkpoint["updated_at"] = _now_iso()
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(checkpoint, fh, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def _partition_option(partition: Tuple[str, str, int]) -> dict:
+    region, universe, delay = partition
+    return {**DEFAULT_DATA_FIELD_OPTION, "region": region, "universe": universe, "delay": delay}
+
+
+def dataset_partitions(values: Optional[Iterable[str]] = None) -> List[Tuple[str, str, int]]:
+    """Parse ``REGION/UNIVERSE/DELAY`` strings; defaults to ``BRAIN_DATASET_PARTITIONS`` or USA/TOP3000/1."""
+    if not values:
+        values = [v for v in os.environ.get("BRAIN_DATASET_PARTITIONS", "").split(",") if v.strip()]
+    partitions = [parse_partition(value) for value in values or []]
+    return list(dict.fromkeys(partitions)) or [DEFAULT_PARTITION]
 
 
 def datasets_refresh(datasets_dir: str = DATASETS_DIR,
                      credentials_path: str = CREDS_PATH,
+                     partitions: Optional[Iterable[Tuple[str, str, int]]] = None,
+                     max_workers: int = DATASET_REFRESH_MAX_WORKERS,
+                     requests_per_minute: float = DATASET_REFRESH_REQUESTS_PER_MINUTE,
+                     restart: bool = False,
+                     checkpoint_path: str = DATASET_REFRESH_CHECKPOINT,
+                     stop_flag=None,
                      progress_cb=None) -> dict:
-    """Fetch all dataset field metadata from WQ Brain API and save locally."""
+    """
+    Fetch all dataset field metadata from WQ Brain API and save locally.
+
+    Every (region, universe, delay) partition in *partitions* (default:
+    ``dataset_partitions()``) is fetched into its own folder, with datasets
+    of all partitions sharing one bounded pool and one rate limiter.
+    Every finished dataset is written to a checkpoint, so a run that stops
+    (401, Persona, Ctrl-C) resumes with the remaining datasets unless
+    *restart* is set.  A CSV is only rewritten when its content hash
+    changed, and each rewritten dataset reports the fields that were
+    added, removed or changed.
+    """
+    partitions = list(dict.fromkeys(tuple(p) for p in partitions)) if partitions else dataset_partitions()
     try:
         session, kind, detail = get_session_for_request(credentials_path)
     except FileNotFoundError:
@@ -560,169 +862,238 @@ def datasets_refresh(datasets_dir: str = DATASETS_DIR,
         )
         return {"status": "error", "message": detail}
 
-    os.makedirs(datasets_dir, exist_ok=True)
-    refreshed = []
-    errors    = []
-
-    opt = dict(DEFAULT_DATA_FIELD_OPTION)
-    dataset_limit = 50
-    field_limit = 50
-    if progress_cb:
-        progress_cb(
-            "Fetching dataset list from WQ data-sets "
-            f"({opt['region']}/{opt['universe']}/delay={opt['delay']})."
-        )
+    stop_flag = stop_flag or _StopFlag()
+    limiter = RequestRateLimiter(requests_per_minute)
+    page_size = _PageSize()
+    checkpoint = None if restart else _load_refresh_checkpoint(checkpoint_path, datasets_dir)
+    if checkpoint is None:
+        checkpoint = {"datasets_dir": os.path.abspath(datasets_dir), "started_at": _now_iso(), "partitions": {}}
+    states = checkpoint["partitions"]
+    options = {partition_key(p): _partition_option(p) for p in partitions}
+    for key, option in options.items():
+        if key in states and states[key].get("option") != option:
+            del states[key]
+    missing = [p for p in partitions if partition_key(p) not in states]
 
-    dataset_ids: List[str] = []
-    offset = 0
-    while True:
-        params = {
-            **opt,
-            "limit": dataset_limit,
-            "offset": offset,
-        }
+    errors = []
+    message = None
+    with ThreadPoolExecutor(max_workers=max(int(max_workers), 1)) as executor:
         try:
-            r = _request_with_rate_limit_retry(
-                session,
-                "get",
-                DATASETS_API,
-                params=params,
-                timeout=20,
-                progress_cb=progress_cb,
-                retry_context="dataset list refresh",
-            )
-            if r.status_code == 401:
-                clear_login_state()
-                persona_url = extract_persona_url(r)
-                if persona_url:
+            if missing and progress_cb:
+                progress_cb(f"Fetching dataset lists for {', '.join(partition_key(p) for p in missing)}.")
+            list_futures = {
+                executor.submit(_fetch_all_pages, session, limiter, page_size, DATASETS_API,
+                                options[partition_key(p)], stop_flag, f"dataset list for {partition_key(p)}"): p
+                for p in missing
+            }
+            for fut in as_completed(list_futures):
+                key = partition_key(list_futures[fut])
+                try:
+                    datasets = fut.result()
+                except PermissionError as exc:
                     _notify_login_issue(
                         "Saved session expired during dataset list refresh.",
-                        persona_url,
-                        cooldown_key="datasets-list-persona",
+                        str(exc),
+                        cooldown_key="datasets-list-unauthorized",
                     )
-                    return {"status": "error", "message": f"Persona verification required: {persona_url}"}
-                _notify_login_issue(
-                    "Saved session expired during dataset list refresh.",
-                    "Unauthorized while fetching dataset list.",
-                    cooldown_key="datasets-list-unauthorized",
-                )
-                return {"status": "error", "message": "Unauthorized while fetching dataset list."}
-            r.raise_for_status()
-            body = r.json()
-        except Exception as exc:
-            return {"status": "error", "message": f"Error fetching dataset list: {exc}"}
-
-        results = body.get("results", [])
-        dataset_ids.extend(ds["id"] for ds in results if ds.get("id"))
-        if offset + dataset_limit >= body.get("count", 0) or not results:
-            break
-        offset += dataset_limit
-        time.sleep(1)
-
-    dataset_ids = sorted(set(dataset_ids))
-    if progress_cb:
-        progress_cb(f"Found {len(dataset_ids)} datasets. Fetching data fields.")
-
-    for i, ds_id in enumerate(dataset_ids):
-        if progress_cb:
-            progress_cb(f"Fetching {ds_id} ({i+1}/{len(dataset_ids)})…")
-        try:
-            rows = []
-            offset = 0
-            while True:
-                params = {
-                    **opt,
-                    "dataset.id": ds_id,
-                    "limit": field_limit,
-                    "offset": offset,
+                    return {"status": "error", "message": str(exc)}
+                except Exception as exc:
+                    errors.append(f"{key}: error fetching dataset list: {exc}")
+                    continue
+                states[key] = {
+                    "option": options[key],
+                    "dataset_ids": sorted({ds["id"] for ds in datasets if ds.get("id")}),
+                    "done": {},
                 }
-                r = _request_with_rate_limit_retry(
-                    session,
-                    "get",
-                    DATAFIELDS_API,
-                    params=params,
-                    timeout=20,
-                    progress_cb=progress_cb,
-                    retry_context=f"data fields refresh for {ds_id}",
-                )
-                if r.status_code == 401:
-                    clear_login_state()
-                    persona_url = extract_persona_url(r)
-                    if persona_url:
-                        _notify_login_issue(
-                            f"Saved session expired while refreshing data fields for {ds_id}.",
-                            persona_url,
-                            cooldown_key=f"data-fields-persona-{ds_id}",
-                        )
-                        return {"status": "error", "message": f"Persona verification required: {persona_url}"}
+                _save_refresh_checkpoint(checkpoint_path, checkpoint)
+
+            tasks = [
+                (p, ds_id)
+                for p in partitions if partition_key(p) in states
+                for ds_id in states[partition_key(p)]["dataset_ids"]
+                if ds_id not in states[partition_key(p)]["done"]
+            ]
+            total = sum(len(states[partition_key(p)]["dataset_ids"]) for p in partitions if partition_key(p) in states)
+            finished = total - len(tasks)
+            if progress_cb:
+                resumed = f", resuming after {finished} finished" if finished else ""
+                progress_cb(f"Found {total} datasets in {len(partitions)} partition(s){resumed}. "
+                            f"Fetching data fields with {max_workers} worker(s).")
+            for p in partitions:
+                os.makedirs(partition_dir(datasets_dir, p), exist_ok=True)
+            futures = {
+                executor.submit(_refresh_one_dataset, session, limiter, page_size, partition_dir(datasets_dir, p),
+                                ds_id, options[partition_key(p)], stop_flag): (p, ds_id)
+                for p, ds_id in tasks
+            }
+            for fut in as_completed(futures):
+                p, ds_id = futures[fut]
+                key = partition_key(p)
+                try:
+                    outcome = fut.result()
+                except PermissionError as exc:
+                    stop_flag.stop_requested = True
+                    executor.shutdown(wait=False, cancel_futures=True)
                     _notify_login_issue(
                         f"Saved session expired while refreshing data fields for {ds_id}.",
-                        f"Unauthorized while fetching fields for {ds_id}.",
-                        cooldown_key=f"data-fields-unauthorized-{ds_id}",
+                        str(exc),
+                        cooldown_key="data-fields-unauthorized",
                     )
-                    return {"status": "error", "message": f"Unauthorized while fetching fields for {ds_id}."}
-                r.raise_for_status()
-                body = r.json()
-                results = body.get("results", [])
-                for field in results:
-                    rows.append(_data_field_row(field))
-                if offset + field_limit >= body.get("count", 0) or not results:
+                    message = str(exc)
                     break
-                offset += field_limit
-                time.sleep(1)
-            if rows:
-                df  = pd.DataFrame(rows, columns=["Field", "Description", "Type", "Coverage", "Users", "Alphas"])
-                out = os.path.join(datasets_dir, f"{ds_id}_fields_formatted.csv")
-                df.to_csv(out, index=False)
-                refreshed.append(ds_id)
-        except Exception as exc:
-            errors.append(f"{ds_id}: {exc}")
+                except Exception as exc:
+                    if stop_flag.check():
+                        message = "Stopped by user"
+                        break
+                    errors.append(f"{key}:{ds_id}: {exc}")
+                    continue
+                states[key]["done"][ds_id] = outcome
+                finished += 1
+                _save_refresh_checkpoint(checkpoint_path, checkpoint)
+                if progress_cb:
+                    progress_cb(f"{outcome['status'].capitalize()} {key}:{ds_id} ({finished}/{total}, "
+                                f"{outcome['fields']} fields).")
+        except BaseException:
+            # Ctrl-C (or any other escape) must not leave the pool working through every
+            # queued dataset on exit; cancel them and keep what finished for the next run.
+            stop_flag.stop_requested = True
+            executor.shutdown(wait=False, cancel_futures=True)
+            _save_refresh_checkpoint(checkpoint_path, checkpoint)
+            raise
+
+    result = {"status": "ok", "total": total, "finished": 0, "refreshed": [], "unchanged": 0,
+              "diffs": {}, "partitions": {}}
+    for p in partitions:
+        key = partition_key(p)
+        state = states.get(key)
+        if state is None:
+            continue
+        outcomes = [state["done"][ds_id] for ds_id in state["dataset_ids"] if ds_id in state["done"]]
+        refreshed = [o["dataset_id"] for o in outcomes if o["status"] in ("added", "updated")]
+        unchanged = sum(1 for o in outcomes if o["status"] == "unchanged")
+        result["partitions"][key] = {"total": len(state["dataset_ids"]), "finished": len(outcomes),
+                                     "refreshed": len(refreshed), "unchanged": unchanged}
+        result["finished"] += len(outcomes)
+        result["unchanged"] += unchanged
+        prefix = "" if p == DEFAULT_PARTITION else f"{key}:"
+        result["refreshed"].extend(prefix + ds_id for ds_id in refreshed)
+        result["diffs"].update({prefix + o["dataset_id"]: o["diff"] for o in outcomes if o.get("diff")})
+    result.update(errors=errors, page_size=page_size.value, catalog=get_field_catalog(datasets_dir).last_sync)
+    if message is not None:
+        result.update(status="error", message=f"{message} (checkpoint kept; run again to resume)")
+        result["checkpoint"] = checkpoint_path
+    elif not errors:
+        os.remove(checkpoint_path)
+    else:
+        # Failed datasets are retried by the next run; the finished ones are not.
+        result["checkpoint"] = checkpoint_path
+    return result
+
 
-    return {"status": "ok", "refreshed": refreshed, "errors": errors, "total": len(dataset_ids)}
+def datasets_list(datasets_dir: str = DATASETS_DIR,
+                  partition: Optional[Tuple[str, str, int]] = None) -> List[dict]:
+    """List available local dataset CSVs (served from the field catalog)."""
+    return get_field_catalog(datasets_dir).list_datasets(partition=partition)
 
 
-def datasets_show(dataset_id: str, datasets_dir: str = DATASETS_DIR) -> Optional[pd.DataFrame]:
+def datasets_show(dataset_id: str, datasets_dir: str = DATASETS_DIR,
+                  partition: Tuple[str, str, int] = DEFAULT_PARTITION) -> Optional[pd.DataFrame]:
     """Return DataFrame of fields for *dataset_id*, or None if not found."""
-    fp = os.path.join(datasets_dir, f"{dataset_id}_fields_formatted.csv")
-    if not os.path.exists(fp):
+    catalog = get_field_catalog(datasets_dir)
+    if not catalog.has_dataset(dataset_id, partition=partition):
         return None
-    return pd.read_csv(fp)
+    return pd.DataFrame(catalog.fields(dataset_id, partition=partition), columns=list(FIELD_DISPLAY_COLUMNS))
 
 
 def datasets_search(query: str, datasets_dir: str = DATASETS_DIR,
-                    dataset_id: Optional[str] = None) -> List[dict]:
-    """Simple text search across field names and descriptions."""
-    results = []
-    if dataset_id:
-        targets = [dataset_id]
-    else:
-        targets = [e["dataset_id"] for e in datasets_list(datasets_dir)]
+                    dataset_id: Optional[str] = None,
+                    limit: Optional[int] = None,
+                    partition: Optional[Tuple[str, str, int]] = None) -> List[dict]:
+    """Case-insensitive substring search over field names and descriptions."""
+    return get_field_catalog(datasets_dir).search(query, dataset_id=dataset_id, partition=partition, limit=limit)
+
+
+def datasets_semantic_search(query: str, datasets_dir: str = DATASETS_DIR,
+                             dataset_id: Optional[str] = None,
+                             limit: int = SEMANTIC_SEARCH_LIMIT,
+                             partition: Optional[Tuple[str, str, int]] = None,
+                             rerank: bool = False) -> dict:
+    """
+    Fields closest in meaning to *query* from the local vector index.
+
+    With *rerank*, Gemini reorders (and prunes) the top local candidates.
+    """
+    catalog = get_field_catalog(datasets_dir)
+    try:
+        results = catalog.semantic_search(
+            query, dataset_id=dataset_id, partition=partition,
+            limit=max(limit, SEMANTIC_RERANK_CANDIDATES) if rerank else limit,
+        )
+    except ImportError as exc:
+        return {"status": "error", "message": f"Semantic search requires NumPy ({exc})."}
+    if rerank and results:
+        from field_vectors import gemini_rerank
+
+        try:
+            results = gemini_rerank(query, results, max_candidates=SEMANTIC_RERANK_CANDIDATES)
+        except Exception as exc:
+            return {"status": "error", "message": f"Gemini rerank failed: {exc}"}
+    result = {"status": "ok", "query": query, "reranked": rerank, "results": results[:limit]}
+    if rerank:
+        from gemini_search import get_cache
+
+        result["gemini_cache"] = get_cache().stats()
+    return result
+
+
+def datasets_graph(datasets_dir: str = DATASETS_DIR, rebuild: bool = False) -> dict:
+    """Build (or load) the field similarity graph and report its size."""
+    catalog = get_field_catalog(datasets_dir)
+    try:
+        from field_graph import load_graph
+
+        graph = load_graph(catalog, rebuild=rebuild)
+    except ImportError as exc:
+        return {"status": "error", "message": f"The field graph requires NumPy ({exc})."}
+    result = {"status": "ok", **graph.stats()}
+    if graph.build_seconds is not None:
+        result["build_seconds"] = graph.build_seconds
+    return result
+
+
+def datasets_diverse(n: int = DIVERSE_FIELDS_COUNT, datasets_dir: str = DATASETS_DIR,
+                     dataset_id: Optional[str] = None,
+                     partition: Optional[Tuple[str, str, int]] = None,
+                     fields: Optional[List[str]] = None) -> dict:
+    """
+    Up to *n* fields, one per similarity cluster, ranked by coverage then usage.
+
+    *fields* restricts the choice to those field names (e.g. a sweep's
+    candidate list).
+    """
+    catalog = get_field_catalog(datasets_dir)
+    try:
+        results = catalog.diverse_fields(n, dataset_id=dataset_id, partition=partition, fields=fields)
+    except ImportError as exc:
+        return {"status": "error", "message": f"Picking diverse fields requires NumPy ({exc})."}
+    return {"status": "ok", "requested": n, "results": results}
 
-    q = query.lower()
-    for ds_id in targets:
-        df = datasets_show(ds_id, datasets_dir)
-        if df is None:
-            continue
-        for _, row in df.iterrows():
-            field = str(row.get("Field", "")).lower()
-            desc  = str(row.get("Description", "")).lower()
-            if q in field or q in desc:
-                results.append({
-                    "dataset_id":  ds_id,
-                    "field":       row.get("Field", ""),
-                    "description": row.get("Description", ""),
-                    "type":        row.get("Type", ""),
-                    "coverage":    row.get("Coverage", ""),
-                })
-    return results
+
+def read_field_list(path: str) -> List[str]:
+    """Field names from a text file, one per line (blank lines and ``#`` comments skipped)."""
+    with open(path, "r", encoding="utf-8") as fh:
+        names = [line.split("#", 1)[0].strip() for line in fh]
+    return [name for name in names if name]
 
 
 def datasets_export_fields(dataset_id: str, output_path: str,
-                           datasets_dir: str = DATASETS_DIR) -> dict:
+                           datasets_dir: str = DATASETS_DIR,
+                           partition: Tuple[str, str, int] = DEFAULT_PARTITION) -> dict:
     """Export dataset fields CSV to *output_path*."""
-    df = datasets_show(dataset_id, datasets_dir)
+    df = datasets_show(dataset_id, datasets_dir, partition=partition)
     if df is None:
-        return {"status": "error", "message": f"Dataset '{dataset_id}' not found locally."}
+        return {"status": "error",
+                "message": f"Dataset '{dataset_id}' not found locally for {partition_key(partition)}."}
     df.to_csv(output_path, index=False)
     return {"status": "ok", "rows": len(df), "output": output_path}
 
@@ -1130,12 +1501,15 @@ def generate_preview(template: str, pools: Dict[str, List[str]],
 
 
 def generate_file(strategies: List[dict], output_path: str,
-                  sim_params: Optional[dict] = None) -> dict:
+                  sim_params: Optional[dict] = None,
+                  template_id: Optional[str] = None) -> dict:
     """
     Write a list of strategy dicts to a Python file in parameters.py format.
 
     Each strategy dict should have at least a ``code`` key.  Additional keys
-    become simulation parameters (decay, delay, etc.).
+    become simulation parameters (decay, delay, etc.).  Entries also carry
+    *template_id* and the strategy's placeholder values (its ``candidate``),
+    so early-stop policies and ``alpha stats --by template`` can group them.
     """
     defaults = {
         "decay": 4, "delay": 1, "neutralization": "SUBINDUSTRY",
@@ -1152,6 +1526,10 @@ def generate_file(strategies: List[dict], output_path: str,
         for k in PARAM_COLUMNS:
             if k in s and k != "code":
                 entry[k] = s[k]
+        if template_id or s.get("template_id"):
+            entry["template_id"] = s.get("template_id") or template_id
+        for k, v in (s.get("candidate") or {}).items():
+            entry.setdefault(k, v)
         lines.append(f"    {json.dumps(entry, ensure_ascii=False)},\n")
     lines.append("]\n")
 
@@ -1343,6 +1721,115 @@ def backtest_export(filename: str, output_path: str,
     return {"status": "ok", "rows": len(df), "output": output_path}
 
 
+# ---------------------------------------------------------------------------
+# Early termination
+# ---------------------------------------------------------------------------
+
+EARLY_STOP_ACTIONS = ("drop", "defer")
+
+
+class EarlyStopPolicy:
+    """
+    Stop spending simulations on groups whose results are clearly hopeless.
+
+    Items are grouped by one params key (``template_id`` by default, or any
+    placeholder value such as ``field``).  Composite scores of completed rows
+    are tracked per group; once a group has ``min_results`` rows and the upper
+    confidence bound of its mean score is still below ``threshold``, its
+    remaining items are dropped (recorded on the job for later resubmission)
+    or deferred to the end of the batch.
+    """
+
+    def __init__(self, threshold: float, group_by: str = "template_id",
+                 min_results: int = 30, confidence: float = 0.95,
+                 action: str = "drop"):
+        if action not in EARLY_STOP_ACTIONS:
+            raise ValueError(f"Early-stop action must be one of {EARLY_STOP_ACTIONS}.")
+        if not 0.5 <= confidence < 1.0:
+            raise ValueError("Early-stop confidence must be in [0.5, 1).")
+        self.threshold = float(threshold)
+        self.group_by = group_by
+        self.min_results = max(int(min_results), 2)
+        self.confidence = float(confidence)
+        self.action = action
+        self._z = statistics.NormalDist().inv_cdf(self.confidence)
+        self._lock = Lock()
+        self._stats: Dict[str, List[float]] = {}
+        self._hopeless: set = set()
+
+    @classmethod
+    def from_dict(cls, data: Optional[dict]) -> Optional["EarlyStopPolicy"]:
+        if not data or data.get("threshold") is None:
+            return None
+        return cls(
+            threshold=data["threshold"],
+            group_by=data.get("group_by") or "template_id",
+            min_results=data.get("min_results", 30),
+            confidence=data.get("confidence", 0.95),
+            action=data.get("action") or "drop",
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "threshold": self.threshold,
+            "group_by": self.group_by,
+            "min_results": self.min_results,
+            "confidence": self.confidence,
+            "action": self.action,
+        }
+
+    def group_key(self, item: dict) -> Optional[str]:
+        value = item.get(self.group_by)
+        if value is None or value == "":
+            return None
+        return str(value)
+
+    def _upper_bound(self, stats: List[float]) -> float:
+        n, mean, m2 = stats
+        if n < 2:
+            return float("inf")
+        std = math.sqrt(m2 / (n - 1))
+        return mean + self._z * std / math.sqrt(n)
+
+    def observe(self, item: dict, score: float) -> Optional[str]:
+        """Record a completed row's score; return the group key if it just became hopeless."""
+        key = self.group_key(item)
+        if key is None:
+            return None
+        with self._lock:
+            stats = self._stats.setdefault(key, [0, 0.0, 0.0])
+            stats[0] += 1
+            delta = score - stats[1]
+            stats[1] += delta / stats[0]
+            stats[2] += delta * (score - stats[1])
+            if (key not in self._hopeless and stats[0] >= self.min_results
+                    and self._upper_bound(stats) < self.threshold):
+                self._hopeless.add(key)
+                return key
+        return None
+
+    def is_hopeless(self, item: dict) -> bool:
+        key = self.group_key(item)
+        if key is None:
+            return False
+        with self._lock:
+            return key in self._hopeless
+
+    def summary(self) -> dict:
+        with self._lock:
+            groups = {
+                key: {
+                    "count": int(stats[0]),
+                    "mean_score": round(stats[1], 6),
+                    "upper_bound": round(self._upper_bound(stats), 6) if stats[0] >= 2 else None,
+                    "hopeless": key in self._hopeless,
+                }
+                for key, stats in self._stats.items()
+            }
+            hopeless = sorted(self._hopeless)
+        return {"policy": self.to_dict(), "hopeless_groups": hopeless, "groups": groups}
+
+
 # ---------------------------------------------------------------------------
 # CLI WQ Session (no Qt dependencies)
 # ---------------------------------------------------------------------------
@@ -1368,9 +1855,11 @@ class CLISimulationSession(requests.Session):
                  existing_session: Optional[requests.Session] = None,
                  job_id: Optional[str] = None,
                  output_csv: Optional[str] = None,
-                 progress_cb=None):
+                 progress_cb=None,
+                 early_stop: Optional[EarlyStopPolicy] = None):
         super().__init__()
         self._job_id     = job_id
+        self._early_stop = early_stop
         self._stop_flag  = _StopFlag(job_id)
         self._progress_cb = progress_cb
         self._csv_lock   = Lock()
@@ -1658,10 +2147,12 @@ class CLISimulationSession(requests.Session):
                 completed_count=0,
                 failed_count=0,
                 recovered_count=0,
+                dropped_count=0,
                 progress_message=f"Running 0/{total}",
                 completed_rows=[],
                 failed_items=[],
                 recovered_items=[],
+                dropped_items=[],
                 simulation_items=[],
                 summary={
                     "status": "running",
@@ -1670,6 +2161,7 @@ class CLISimulationSession(requests.Session):
                     "completed_count": 0,
                     "failed_count": 0,
                     "recovered_count": 0,
+                    "dropped_count": 0,
                 },
             )
 
@@ -1677,124 +2169,180 @@ class CLISimulationSession(requests.Session):
             writer = csv.writer(csv_fh)
             writer.writerow(SIM_CSV_HEADER)
 
-            with ThreadPoolExecutor(max_workers=3) as executor:
-                futures = {
-                    executor.submit(self._process_one, sim): sim
-                    for sim in params
-                }
-                for fut in as_completed(futures):
-                    if self._stop_flag.check():
-                        executor.shutdown(wait=False, cancel_futures=True)
-                        break
-                    try:
-                        result = fut.result()
-                        if result and "row" in result:
-                            with self._csv_lock:
-                                writer.writerow(result["row"])
-                                csv_fh.flush()
-                            if result.get("status") == "failed":
-                                row = result["row"]
-                                try:
-                                    get_registry().record_simulation(
-                                        str(row[14]) if len(row) > 14 else str(result.get("alpha", "")),
-                                        job_id=self._job_id,
-                                        status="failed",
-                                        params=result.get("simulation") or futures.get(fut) or {},
-                                        result_link=str(row[13]) if len(row) > 13 else None,
-                                        error=result.get("error", "Simulation failed."),
-                                    )
-                                except Exception as exc:
-                                    self._emit(f"Alpha registry update failed: {exc}")
-                                if self._job_id:
-                                    def _mark_failed_row(job):
-                                        completed_rows = list(job.get("completed_rows", []))
-                                        failed_items = list(job.get("failed_items", []))
-                                        failed_items.append({
-                                            "uuid": result.get("uuid"),
-                                            "error": result.get("error", "Simulation failed."),
-                                            "alpha": result.get("alpha"),
-                                            "simulation_url": result.get("simulation_url"),
-                                            "last_poll_status": result.get("last_poll_status"),
-                                            "last_progress": result.get("last_progress"),
-                                            "last_poll_at": result.get("last_poll_at"),
-                                            "alpha_id": result.get("alpha_id"),
-                                            "row": row,
-                                        })
-                                        job["failed_items"] = failed_items
-                                        _refresh_simulation_summary(job)
-                                        job["progress_message"] = f"Running {job['processed_count']}/{total}"
-                                    JobStore.mutate(self._job_id, _mark_failed_row)
-                                self._emit(f"Error: {result.get('error', 'Simulation failed.')}")
-                            else:
-                                completed.append(result)
-                                try:
-                                    get_registry().record_simulation_row(
-                                        result["row"],
-                                        job_id=self._job_id,
-                                        params=result.get("simulation") or {},
-                                    )
-                                except Exception as exc:
-                                    self._emit(f"Alpha registry update failed: {exc}")
-                                if self._job_id:
-                                    def _mark_completed(job):
-                                        completed_rows = list(job.get("completed_rows", []))
-                                        failed_items = list(job.get("failed_items", []))
-                                        completed_rows.append({
-                                            "uuid": result.get("uuid"),
-                                            "row": result["row"],
-                                            "simulation_url": result.get("simulation_url"),
-                                            "last_poll_status": result.get("last_poll_status"),
-                                            "last_progress": result.get("last_progress"),
-                                            "last_poll_at": result.get("last_poll_at"),
-                                            "alpha_id": result.get("alpha_id"),
-                                        })
-                                        job["completed_rows"] = completed_rows
-                                        _refresh_simulation_summary(job)
-                                        job["progress_message"] = f"Running {job['processed_count']}/{total}"
-                                    JobStore.mutate(self._job_id, _mark_completed)
-                                self._emit(f"Completed {len(completed)}/{len(params)}: "
-                                           f"{str(result['row'][14])[:40]}")
-                        elif result and "error" in result:
+            deferred = self._run_batch(params, writer, csv_fh, completed, total)
+            if deferred and not self._stop_flag.check():
+                self._emit(f"Early stop: running {len(deferred)} deprioritized items last.")
+                self._run_batch(deferred, writer, csv_fh, completed, total, allow_hopeless=True)
+
+        if self._job_id and JobStore.get(self._job_id) is not None:
+            JobStore.update(self._job_id, result_file=self._csv_file)
+        return completed
+
+    def _run_batch(self, params: List[dict], writer, csv_fh, completed: List[dict], total: int,
+                   *, allow_hopeless: bool = False) -> List[dict]:
+        """Simulate *params* concurrently; returns items deferred by the early-stop policy."""
+        deferred: List[dict] = []
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = {
+                executor.submit(self._process_one, sim, allow_hopeless=allow_hopeless): sim
+                for sim in params
+            }
+            for fut in as_completed(futures):
+                if self._stop_flag.check():
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    break
+                try:
+                    result = fut.result()
+                    if result and result.get("early_stop"):
+                        if result["early_stop"] == "defer":
+                            deferred.append(futures[fut])
+                        else:
+                            self._record_dropped(result, total)
+                        continue
+                    if result and "row" in result:
+                        with self._csv_lock:
+                            writer.writerow(result["row"])
+                            csv_fh.flush()
+                        if result.get("status") == "failed":
+                            row = result["row"]
                             try:
                                 get_registry().record_simulation(
-                                    str(result.get("alpha", "")),
+                                    str(row[14]) if len(row) > 14 else str(result.get("alpha", "")),
                                     job_id=self._job_id,
                                     status="failed",
-                                    params=futures.get(fut) or {},
-                                    error=result["error"],
+                                    params=result.get("simulation") or futures.get(fut) or {},
+                                    result_link=str(row[13]) if len(row) > 13 else None,
+                                    error=result.get("error", "Simulation failed."),
                                 )
                             except Exception as exc:
                                 self._emit(f"Alpha registry update failed: {exc}")
                             if self._job_id:
-                                def _mark_failed(job):
-                                    completed_rows = list(job.get("completed_rows", []))
+                                def _mark_failed_row(job):
                                     failed_items = list(job.get("failed_items", []))
                                     failed_items.append({
                                         "uuid": result.get("uuid"),
-                                        "error": result["error"],
+                                        "error": result.get("error", "Simulation failed."),
                                         "alpha": result.get("alpha"),
                                         "simulation_url": result.get("simulation_url"),
                                         "last_poll_status": result.get("last_poll_status"),
                                         "last_progress": result.get("last_progress"),
                                         "last_poll_at": result.get("last_poll_at"),
                                         "alpha_id": result.get("alpha_id"),
+                                        "row": row,
                                     })
                                     job["failed_items"] = failed_items
                                     _refresh_simulation_summary(job)
                                     job["progress_message"] = f"Running {job['processed_count']}/{total}"
-                                JobStore.mutate(self._job_id, _mark_failed)
-                            self._emit(f"Error: {result['error']}")
-                    except Exception as exc:
-                        self._emit(f"Future error: {exc}")
+                                JobStore.mutate(self._job_id, _mark_failed_row)
+                            self._emit(f"Error: {result.get('error', 'Simulation failed.')}")
+                        else:
+                            completed.append(result)
+                            try:
+                                get_registry().record_simulation_row(
+                                    result["row"],
+                                    job_id=self._job_id,
+                                    params=result.get("simulation") or {},
+                                )
+                            except Exception as exc:
+                                self._emit(f"Alpha registry update failed: {exc}")
+                            hopeless_group = self._observe_early_stop(result)
+                            if self._job_id:
+                                def _mark_completed(job):
+                                    completed_rows = list(job.get("completed_rows", []))
+                                    completed_rows.append({
+                                        "uuid": result.get("uuid"),
+                                        "row": result["row"],
+                                        "simulation_url": result.get("simulation_url"),
+                                        "last_poll_status": result.get("last_poll_status"),
+                                        "last_progress": result.get("last_progress"),
+                                        "last_poll_at": result.get("last_poll_at"),
+                                        "alpha_id": result.get("alpha_id"),
+                                    })
+                                    job["completed_rows"] = completed_rows
+                                    if self._early_stop is not None:
+                                        job["early_stop_state"] = self._early_stop.summary()
+                                    _refresh_simulation_summary(job)
+                                    job["progress_message"] = f"Running {job['processed_count']}/{total}"
+                                JobStore.mutate(self._job_id, _mark_completed)
+                            self._emit(f"Completed {len(completed)}/{total}: "
+                                       f"{str(result['row'][14])[:40]}")
+                            if hopeless_group is not None:
+                                self._emit(
+                                    f"Early stop: group {hopeless_group!r} is below the score threshold; "
+                                    f"remaining items will be {'dropped' if self._early_stop.action == 'drop' else 'deferred'}."
+                                )
+                    elif result and "error" in result:
+                        try:
+                            get_registry().record_simulation(
+                                str(result.get("alpha", "")),
+                                job_id=self._job_id,
+                                status="failed",
+                                params=futures.get(fut) or {},
+                                error=result["error"],
+                            )
+                        except Exception as exc:
+                            self._emit(f"Alpha registry update failed: {exc}")
+                        if self._job_id:
+                            def _mark_failed(job):
+                                failed_items = list(job.get("failed_items", []))
+                                failed_items.append({
+                                    "uuid": result.get("uuid"),
+                                    "error": result["error"],
+                                    "alpha": result.get("alpha"),
+                                    "simulation_url": result.get("simulation_url"),
+                                    "last_poll_status": result.get("last_poll_status"),
+                                    "last_progress": result.get("last_progress"),
+                                    "last_poll_at": result.get("last_poll_at"),
+                                    "alpha_id": result.get("alpha_id"),
+                                })
+                                job["failed_items"] = failed_items
+                                _refresh_simulation_summary(job)
+                                job["progress_message"] = f"Running {job['processed_count']}/{total}"
+                            JobStore.mutate(self._job_id, _mark_failed)
+                        self._emit(f"Error: {result['error']}")
+                except Exception as exc:
+                    self._emit(f"Future error: {exc}")
+        return deferred
+
+    def _observe_early_stop(self, result: dict) -> Optional[str]:
+        if self._early_stop is None:
+            return None
+        row_dict = dict(zip(SIM_CSV_HEADER, result["row"]))
+        return self._early_stop.observe(result.get("simulation") or {}, _compute_composite_score(row_dict))
 
-        if self._job_id and JobStore.get(self._job_id) is not None:
-            JobStore.update(self._job_id, result_file=self._csv_file)
-        return completed
+    def _record_dropped(self, result: dict, total: int):
+        self._emit(f"Early stop: dropped {str(result.get('alpha', ''))[:40]} (group {result.get('group')!r})")
+        if not self._job_id:
+            return
+
+        def _mark_dropped(job):
+            dropped_items = list(job.get("dropped_items", []))
+            dropped_items.append({
+                "uuid": result.get("uuid"),
+                "alpha": result.get("alpha"),
+                "group": result.get("group"),
+                "simulation": result.get("simulation"),
+                "dropped_at": _now_iso(),
+            })
+            job["dropped_items"] = dropped_items
+            _refresh_simulation_summary(job)
+            job["progress_message"] = f"Running {job['processed_count']}/{total}"
+
+        JobStore.mutate(self._job_id, _mark_dropped)
 
-    def _process_one(self, simulation: dict) -> Optional[dict]:
+    def _process_one(self, simulation: dict, *, allow_hopeless: bool = False) -> Optional[dict]:
         """Submit one alpha simulation, poll for completion, fetch details."""
         if self.login_expired or self._stop_flag.check():
             return None
+        if (not allow_hopeless and self._early_stop is not None
+                and self._early_stop.is_hopeless(simulation)):
+            return {
+                "uuid": simulation.get("uuid"),
+                "alpha": str(simulation.get("code", "")).strip(),
+                "group": self._early_stop.group_key(simulation),
+                "simulation": dict(simulation),
+                "early_stop": self._early_stop.action,
+            }
 
         alpha        = simulation.get("code", "").strip()
         delay        = simulation.get("delay", 1)
@@ -1995,20 +2543,281 @@ class CLISimulationSession(requests.Session):
 # Simulate service
 # ---------------------------------------------------------------------------
 
-def simulate_enqueue(params: List[dict], credentials_path: str = CREDS_PATH) -> str:
+def dedupe_simulation_params(params: Iterable[dict], report: Optional[dict] = None,
+                             chunk_size: int = SIMULATION_ENQUEUE_CHUNK_SIZE) -> Iterator[dict]:
+    """
+    Yield the items of *params* that would not repeat a simulation.
+
+    An item is dropped when an earlier item has the same canonical code and
+    settings (``duplicates``), or when the registry already holds a completed
+    result for them (``simulated``); the counts are added to *report*.
+    Canonical code ignores whitespace, parentheses, operand order of
+    commutative operators and dead assignments, so rewrites of one alpha are
+    caught too.
+    """
+    registry = get_registry()
+    report = report if report is not None else {}
+    report.setdefault("duplicates", 0)
+    report.setdefault("simulated", 0)
+    seen = set()
+    iterator = iter(params)
+    while True:
+        chunk = list(itertools.islice(iterator, max(int(chunk_size), 1)))
+        if not chunk:
+            return
+        keyed: List[Tuple[Optional[tuple], dict]] = []
+        for item in chunk:
+            if not str(item.get("code", "")).strip():
+                keyed.append((None, item))
+                continue
+            key = simulation_key(item)
+            if key in seen:
+                report["duplicates"] += 1
+                continue
+            seen.add(key)
+            keyed.append((key, item))
+        cached = registry.simulated_results(key for key, _ in keyed if key)
+        for key, item in keyed:
+            if key in cached:
+                report["simulated"] += 1
+                continue
+            yield item
+
+
+def simulate_enqueue(params: List[dict], credentials_path: str = CREDS_PATH,
+                     early_stop: Optional[dict] = None) -> str:
     """Create a new simulation job and return its job_id."""
-    job_id = JobStore.create("simulate", {
+    job_params = {
         "params":           params,
         "credentials_path": credentials_path,
-    })
+    }
+    if early_stop:
+        job_params["early_stop"] = early_stop
+    job_id = JobStore.create("simulate", job_params)
     registry = get_registry()
-    for item in params:
-        code = str(item.get("code", "")).strip()
-        if code:
-            registry.record_queued(code, job_id=job_id, params=item)
+    for start in range(0, len(params), SIMULATION_ENQUEUE_CHUNK_SIZE):
+        registry.record_queued_many(params[start:start + SIMULATION_ENQUEUE_CHUNK_SIZE], job_id=job_id)
     return job_id
 
 
+def _coerce_param_value(value: str) -> Any:
+    text = value.strip()
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return float(text)
+    except ValueError:
+        return value
+
+
+def _iter_csv_params(path: str) -> Iterator[dict]:
+    with open(path, "r", newline="", encoding="utf-8-sig") as fh:
+        for row in csv.DictReader(fh):
+            item = {}
+            for key, value in row.items():
+                if key is None or value is None or value == "":
+                    continue
+                item[key] = value if key == "code" else _coerce_param_value(value)
+            yield item
+
+
+def _iter_jsonl_params(path: str) -> Iterator[dict]:
+    with open(path, "r", encoding="utf-8") as fh:
+        for line_no, line in enumerate(fh, 1):
+            line = line.strip()
+            if not line:
+                continue
+            item = json.loads(line)
+            if not isinstance(item, dict):
+                raise ValueError(f"{path}:{line_no}: expected a JSON object per line.")
+            yield item
+
+
+def _split_data_entries(text: str) -> Tuple[List[str], str, bool]:
+    """
+    Split a fragment of a ``DATA`` list into complete entries.
+
+    Returns the source of each complete entry, the unfinished rest and
+    whether the list's closing ``]`` was reached.  Commas, comments and
+    brackets inside strings are handled by ``tokenize``; the fragment is
+    wrapped in ``[`` so its indentation does not matter.
+    """
+    source = "[\n" + text
+    line_starts = [0]
+    for line in source.splitlines(keepends=True):
+        line_starts.append(line_starts[-1] + len(line))
+
+    def offset(position: Tuple[int, int]) -> int:
+        return line_starts[position[0] - 1] + position[1] - 2
+
+    entries: List[str] = []
+    entry_start: Optional[int] = None
+    depth = 0
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(source).readline):
+            if token.type in (tokenize.COMMENT, tokenize.NL, tokenize.NEWLINE, tokenize.ENDMARKER):
+                continue
+            if token.type == tokenize.OP and token.string in "([{":
+                depth += 1
+                if depth == 2 and entry_start is None:
+                    entry_start = offset(token.start)
+                continue
+            if token.type == tokenize.OP and token.string in ")]}":
+                depth -= 1
+                if depth == 0:
+                    if entry_start is not None:
+                        entries.append(text[entry_start:offset(token.start)])
+                    return entries, "", True
+                continue
+            if depth == 1:
+                if token.type == tokenize.OP and token.string == ",":
+                    if entry_start is not None:
+                        entries.append(text[entry_start:offset(token.start)])
+                        entry_start = None
+                elif entry_start is None:
+                    entry_start = offset(token.start)
+    except tokenize.TokenError:
+        # The last entry continues on lines not read yet.
+        pass
+    return entries, text[entry_start:] if entry_start is not None else "", False
+
+
+def _iter_python_data_params(path: str) -> Iterator[dict]:
+    """
+    Stream the ``DATA = [...]`` list of a strategy file one entry at a time.
+
+    Entries written by ``generate_file`` sit one per line and parse as JSON.
+    Anything else (multi-line dict literals as in ``parameters.py``, several
+    entries on one line, trailing comments) is buffered and split with
+    ``_split_data_entries`` as soon as it forms complete entries.
+    """
+    in_data = False
+    buffer = ""
+    with open(path, "r", encoding="utf-8") as fh:
+        for line in fh:
+            if not in_data:
+                if not re.match(r"^DATA\s*=\s*\[", line.strip()):
+                    continue
+                in_data = True
+                line = line.split("[", 1)[1]
+            stripped = line.strip()
+            if not buffer:
+                if stripped.startswith("]"):
+                    return
+                if not stripped or stripped.startswith("#"):
+                    continue
+                try:
+                    item = json.loads(stripped.rstrip(","))
+                except ValueError:
+                    item = None
+                if isinstance(item, dict):
+                    yield item
+                    continue
+            buffer += line
+            entries, buffer, closed = _split_data_entries(buffer)
+            for entry in entries:
+                try:
+                    item = ast.literal_eval(entry.strip())
+                except (SyntaxError, ValueError):
+                    raise ValueError("Python strategy file DATA could not be parsed.") from None
+                if not isinstance(item, dict):
+                    raise ValueError("Python strategy file DATA must be a list of strategy dicts.")
+                yield item
+            if closed:
+                return
+    if not in_data:
+        raise ValueError("Python strategy file is missing a top-level DATA = [...] assignment.")
+    if buffer.strip():
+        raise ValueError("Python strategy file DATA could not be parsed.")
+
+
+def iter_params_file(path: str) -> Iterator[dict]:
+    """Incrementally yield simulation params from a .jsonl, .csv, .py or .json file."""
+    if path.endswith(".jsonl"):
+        return _iter_jsonl_params(path)
+    if path.endswith(".py"):
+        return _iter_python_data_params(path)
+    if path.endswith(".json"):
+        with open(path, "r", encoding="utf-8") as fh:
+            data = json.load(fh)
+        if not isinstance(data, list):
+            raise ValueError("JSON params file must contain a list of parameter dicts.")
+        return iter(data)
+    return _iter_csv_params(path)
+
+
+def simulate_enqueue_stream(params: Iterable[dict], credentials_path: str = CREDS_PATH,
+                            chunk_size: int = SIMULATION_ENQUEUE_CHUNK_SIZE,
+                            early_stop: Optional[dict] = None,
+                            dedup: bool = False) -> dict:
+    """
+    Create a simulation job from an iterable of params without holding them all.
+
+    Items are appended to ``.brain_cli/jobs/<job_id>.items.jsonl`` and, once
+    *params* has been read to the end, registered in the alpha registry one
+    chunk per transaction, so a params file that fails to parse partway
+    leaves neither the items file nor ``queued`` events for a job that was
+    never created.  The job JSON only references the items file, so it
+    stays small for very large batches.  With *dedup*, items are filtered
+    through ``dedupe_simulation_params`` and no job is created when nothing
+    is left.
+    """
+    job_id = JobStore.new_id()
+    items_path = _job_items_path(job_id)
+    registry = get_registry()
+    report = {"duplicates": 0, "simulated": 0}
+    if dedup:
+        params = dedupe_simulation_params(params, report, chunk_size=chunk_size)
+    count = 0
+    try:
+        with open(items_path, "w", encoding="utf-8") as fh:
+            for item in params:
+                if not str(item.get("code", "")).strip():
+                    continue
+                fh.write(json.dumps(item, ensure_ascii=False) + "\n")
+                count += 1
+    except BaseException:
+        if os.path.exists(items_path):
+            os.remove(items_path)
+        raise
+    skipped = {"skipped_duplicates": report["duplicates"], "skipped_simulated": report["simulated"]} if dedup else {}
+    if dedup and not count:
+        os.remove(items_path)
+        return {"job_id": None, "queued": 0, "status": "skipped", **skipped}
+    items = iter_job_params({"params": {"params_file": items_path}})
+    while True:
+        chunk = list(itertools.islice(items, max(int(chunk_size), 1)))
+        if not chunk:
+            break
+        registry.record_queued_many(chunk, job_id=job_id)
+    job_params = {
+        "params":           [],
+        "params_file":      items_path,
+        "params_count":     count,
+        "credentials_path": credentials_path,
+    }
+    if early_stop:
+        job_params["early_stop"] = early_stop
+    JobStore.create("simulate", job_params, job_id=job_id)
+    return {"job_id": job_id, "queued": count, "status": "pending", "params_file": items_path, **skipped}
+
+
+def simulate_enqueue_file(path: str, credentials_path: str = CREDS_PATH,
+                          chunk_size: int = SIMULATION_ENQUEUE_CHUNK_SIZE,
+                          early_stop: Optional[dict] = None,
+                          dedup: bool = False) -> dict:
+    """Stream a strategy file into a new simulation job."""
+    if not os.path.exists(path):
+        return {"status": "error", "message": f"Params file not found: {path}"}
+    try:
+        return simulate_enqueue_stream(iter_params_file(path), credentials_path,
+                                       chunk_size=chunk_size, early_stop=early_stop, dedup=dedup)
+    except ValueError as exc:
+        return {"status": "error", "message": str(exc)}
+
+
 def simulate_run(job_id: str, progress_cb=None) -> dict:
     """
     Execute a queued simulation job synchronously.
@@ -2021,32 +2830,47 @@ def simulate_run(job_id: str, progress_cb=None) -> dict:
     if job["status"] not in ("pending",):
         return {"status": "error", "message": f"Job {job_id} is already {job['status']}."}
 
+    params = _job_params(job)
+    try:
+        early_stop = EarlyStopPolicy.from_dict(job["params"].get("early_stop"))
+    except (TypeError, ValueError) as exc:
+        JobStore.update(job_id, status="failed", error=f"Invalid early-stop policy: {exc}",
+                        progress_message=f"Invalid early-stop policy: {exc}")
+        return JobStore.get(job_id)
+    if early_stop is not None and not any(early_stop.group_key(item) is not None for item in params):
+        message = (f"Early stop: no item has a '{early_stop.group_by}' value, so no group can be stopped. "
+                   "Regenerate the batch or pick another --early-stop-group-by.")
+        logging.warning("Job %s: %s", job_id, message)
+        if progress_cb:
+            progress_cb(message)
     JobStore.update(
         job_id,
         status="running",
         pid=os.getpid(),
-        total_count=len(job["params"]["params"]),
+        total_count=len(params),
         processed_count=0,
         completed_count=0,
         failed_count=0,
         recovered_count=0,
+        dropped_count=0,
         progress_message="Queued for worker execution.",
         completed_rows=[],
         failed_items=[],
         recovered_items=[],
+        dropped_items=[],
         simulation_items=[],
         summary={
             "status": "running",
-            "total_count": len(job["params"]["params"]),
+            "total_count": len(params),
             "processed_count": 0,
             "completed_count": 0,
             "failed_count": 0,
             "recovered_count": 0,
+            "dropped_count": 0,
         },
     )
     JobStore.clear_stop(job_id)
 
-    params           = job["params"]["params"]
     credentials_path = job["params"].get("credentials_path", CREDS_PATH)
     output_csv       = os.path.join(DATA_DIR,
                                     f"job_{job_id}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
@@ -2057,6 +2881,7 @@ def simulate_run(job_id: str, progress_cb=None) -> dict:
             job_id=job_id,
             output_csv=output_csv,
             progress_cb=progress_cb,
+            early_stop=early_stop,
         )
         if session.login_expired:
             JobStore.update(job_id, status="failed", error="Login failed.", progress_message="Login failed.")
@@ -2074,7 +2899,10 @@ def simulate_run(job_id: str, progress_cb=None) -> dict:
                 if stopped else
                 f"Completed. completed={done_job['completed_count']} "
                 f"failed={done_job['failed_count']} recovered={done_job['recovered_count']}"
+                + (f" dropped={done_job['dropped_count']}" if done_job.get("dropped_count") else "")
             )
+            if early_stop is not None:
+                done_job["early_stop_state"] = early_stop.summary()
         JobStore.mutate(job_id, _finish_job)
     except Exception as exc:
         JobStore.update(job_id, status="failed", error=str(exc), progress_message=str(exc))
@@ -2082,6 +2910,24 @@ def simulate_run(job_id: str, progress_cb=None) -> dict:
     return JobStore.get(job_id)
 
 
+def simulate_resume_dropped(job_id: str, credentials_path: Optional[str] = None) -> dict:
+    """
+    Enqueue the items an early-stop policy dropped from *job_id* as a new job.
+
+    The new job carries no early-stop policy, so every dropped item is
+    simulated.
+    """
+    job = JobStore.get(job_id)
+    if job is None:
+        return {"status": "error", "message": f"Job {job_id} not found."}
+    dropped = [item.get("simulation") for item in job.get("dropped_items", []) if item.get("simulation")]
+    if not dropped:
+        return {"status": "error", "message": f"Job {job_id} has no dropped items."}
+    creds = credentials_path or (job.get("params") or {}).get("credentials_path", CREDS_PATH)
+    new_job_id = simulate_enqueue(dropped, creds)
+    return {"job_id": new_job_id, "queued": len(dropped), "status": "pending", "source_job_id": job_id}
+
+
 def simulate_status(job_id: str) -> Optional[dict]:
     return JobStore.get(job_id)
 
@@ -2094,16 +2940,150 @@ def simulate_stop(job_id: str) -> dict:
     return {"status": "ok", "message": f"Stop requested for job {job_id}."}
 
 
-def simulate_results(job_id: str, limit: int = 100) -> Optional[dict]:
-    """Return results from a completed simulation job."""
+def _result_value(column: str, value: Optional[str]) -> Any:
+    if value is None or value == "":
+        return None
+    if column in ("code", "link"):
+        return value
+    return _coerce_param_value(value)
+
+
+def _result_number(row: dict, column: str) -> Optional[float]:
+    value = row.get(column)
+    if column == "passed":
+        # Older result files hold PASS/FAIL instead of a passed-check count.
+        return passed_float(value)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def iter_result_rows(result_file: str,
+                     min_passed: Optional[int] = None,
+                     min_sharpe: Optional[float] = None,
+                     min_fitness: Optional[float] = None) -> Iterator[dict]:
+    """Stream typed rows of a simulation result CSV, applying the given filters."""
+    thresholds = [("passed", min_passed), ("sharpe", min_sharpe), ("fitness", min_fitness)]
+    thresholds = [(column, float(bound)) for column, bound in thresholds if bound is not None]
+
+    def passes(row: dict) -> bool:
+        for column, bound in thresholds:
+            number = _result_number(row, column)
+            if number is None or number < bound:
+                return False
+        return True
+
+    with open(result_file, "r", newline="", encoding="utf-8") as fh:
+        for raw in csv.DictReader(fh):
+            row = {column: _result_value(column, value) for column, value in raw.items() if column is not None}
+            if passes(row):
+                yield row
+
+
+def _result_sort_key(column: str):
+    def key(row: dict):
+        number = _result_number(row, column)
+        if number is not None:
+            return (1, number, "")
+        value = row.get(column)
+        return (0, 0.0, "" if value is None else str(value))
+    return key
+
+
+def iter_simulate_results(job_id: str,
+                          offset: int = 0,
+                          limit: int = 0,
+                          min_passed: Optional[int] = None,
+                          min_sharpe: Optional[float] = None,
+                          min_fitness: Optional[float] = None,
+                          sort_by: Optional[str] = None,
+                          ascending: bool = False) -> Iterator[dict]:
+    """
+    Yield result rows of a simulation job without loading the whole CSV.
+
+    Without *sort_by* rows stream in file order.  With it, only the best
+    ``offset + limit`` rows are kept in memory (all matching rows when
+    *limit* is 0).
+    """
+    job = JobStore.get(job_id)
+    result_file = (job or {}).get("result_file")
+    if not result_file or not os.path.exists(result_file):
+        return
+    rows = iter_result_rows(result_file, min_passed=min_passed,
+                            min_sharpe=min_sharpe, min_fitness=min_fitness)
+    yield from _result_page(rows, offset, limit, sort_by, ascending)
+
+
+def _result_page(rows: Iterator[dict], offset: int, limit: int,
+                 sort_by: Optional[str], ascending: bool) -> Iterator[dict]:
+    offset = max(int(offset), 0)
+    limit = max(int(limit), 0)
+    if sort_by:
+        key = _result_sort_key(sort_by)
+        if limit:
+            pick = heapq.nsmallest if ascending else heapq.nlargest
+            rows = iter(pick(offset + limit, rows, key=key))
+        else:
+            rows = iter(sorted(rows, key=key, reverse=not ascending))
+    stop = offset + limit if limit else None
+    yield from itertools.islice(rows, offset, stop)
+
+
+def simulate_results(job_id: str, limit: int = 100,
+                     offset: int = 0,
+                     cursor: Optional[str] = None,
+                     min_passed: Optional[int] = None,
+                     min_sharpe: Optional[float] = None,
+                     min_fitness: Optional[float] = None,
+                     sort_by: Optional[str] = None,
+                     ascending: bool = False) -> Optional[dict]:
+    """
+    Return one page of results from a simulation job.
+
+    *cursor* is the ``next_cursor`` of the previous page (a row offset within
+    the filtered, sorted result set) and overrides *offset*.  ``total`` counts
+    all rows matching the filters; it is counted in the same pass over the
+    file that selects the page.
+    """
     job = JobStore.get(job_id)
     if job is None:
         return None
     result_file = job.get("result_file")
     if not result_file or not os.path.exists(result_file):
         return {"job": job, "rows": [], "message": "No result file found."}
-    df = pd.read_csv(result_file)
-    return {"job": job, "rows": df.head(limit).to_dict(orient="records"), "total": len(df)}
+    if cursor:
+        try:
+            offset = int(cursor)
+        except ValueError:
+            return {"status": "error", "message": f"Invalid cursor: {cursor}"}
+    if sort_by and sort_by not in SIM_CSV_HEADER:
+        return {"status": "error", "message": f"Unknown sort column: {sort_by}. Choose from {', '.join(SIM_CSV_HEADER)}."}
+    offset = max(int(offset), 0)
+    limit = max(int(limit), 1)
+    filters = {"min_passed": min_passed, "min_sharpe": min_sharpe, "min_fitness": min_fitness}
+
+    total = 0
+
+    def counted(rows: Iterator[dict]) -> Iterator[dict]:
+        nonlocal total
+        for row in rows:
+            total += 1
+            yield row
+
+    matching = counted(iter_result_rows(result_file, **filters))
+    rows = list(_result_page(matching, offset, limit, sort_by, ascending))
+    for _ in matching:
+        pass
+    next_offset = offset + len(rows)
+    return {
+        "job": job,
+        "rows": rows,
+        "total": total,
+        "offset": offset,
+        "limit": limit,
+        "next_cursor": str(next_offset) if next_offset < total else None,
+    }
 
 
 def _simulation_csv_contains_link(path: str, result_link: str) -> bool:
@@ -2162,12 +3142,13 @@ def simulate_reconcile(job_id: str, credentials_path: str = CREDS_PATH, progress
     recovered = []
     skipped = []
     errors = []
+    params_index = _simulation_params_index(job, failed_items)
 
     for item in failed_items:
         simulation_url = item.get("simulation_url")
         row_uuid = item.get("uuid") or _uuid_mod.uuid4().hex
         alpha = str(item.get("alpha") or "")
-        simulation = _simulation_params_by_uuid_or_alpha(job, item)
+        simulation = _simulation_params_by_uuid_or_alpha(params_index, item)
         if not alpha:
             alpha = str(simulation.get("code") or "")
         try:
@@ -2334,25 +3315,97 @@ def alpha_list(status: Optional[str] = None,
                source: Optional[str] = None,
                min_sharpe: Optional[float] = None,
                min_fitness: Optional[float] = None,
-               limit: int = 50) -> List[dict]:
+               limit: int = 50,
+               min_subsharpe: Optional[float] = None,
+               min_passed: Optional[float] = None,
+               max_turnover: Optional[float] = None,
+               order_by: str = "updated_at",
+               descending: bool = True,
+               after: Optional[str] = None) -> List[dict]:
     """List alpha records from the SQLite registry."""
     return get_registry().list_alphas(
         status=status,
         source=source,
         min_sharpe=min_sharpe,
         min_fitness=min_fitness,
+        min_subsharpe=min_subsharpe,
+        min_passed=min_passed,
+        max_turnover=max_turnover,
+        order_by=order_by,
+        descending=descending,
+        after=after,
         limit=limit,
     )
 
 
+def alpha_list_page(cursor: Optional[str] = None, limit: int = 50, **filters) -> dict:
+    """One keyset page of ``alpha_list`` plus ``next_cursor`` (None on the last page)."""
+    items = alpha_list(after=cursor or None, limit=limit, **filters)
+    next_cursor = None
+    if items and len(items) >= limit:
+        next_cursor = get_registry().list_cursor(items[-1], filters.get("order_by", "updated_at"))
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def alpha_search(query: str,
+                 any_term: bool = False,
+                 status: Optional[str] = None,
+                 source: Optional[str] = None,
+                 min_sharpe: Optional[float] = None,
+                 min_fitness: Optional[float] = None,
+                 min_subsharpe: Optional[float] = None,
+                 min_passed: Optional[float] = None,
+                 max_turnover: Optional[float] = None,
+                 order_by: str = "recent",
+                 limit: int = 50) -> List[dict]:
+    """Search registered alpha code by operator/field tokens (``anl10_*`` for prefixes)."""
+    return get_registry().search_alphas(
+        query,
+        any_term=any_term,
+        status=status,
+        source=source,
+        min_sharpe=min_sharpe,
+        min_fitness=min_fitness,
+        min_subsharpe=min_subsharpe,
+        min_passed=min_passed,
+        max_turnover=max_turnover,
+        order_by=order_by,
+        limit=limit,
+    )
+
+
+def registry_maintain(archive_after_days: Optional[float] = EVENT_ARCHIVE_AFTER_DAYS,
+                      vacuum: bool = True) -> dict:
+    """Collapse queued events, archive old events, VACUUM/ANALYZE, and report the effect."""
+    return {"status": "ok", **get_registry().maintain(archive_after_days=archive_after_days, vacuum=vacuum)}
+
+
+def registry_maintenance_due(interval_seconds: float) -> bool:
+    """True when the registry has not been maintained within *interval_seconds*."""
+    last = get_registry().last_maintenance()
+    if last is None:
+        return True
+    last_at = datetime.datetime.fromisoformat(last["run_at"])
+    age = datetime.datetime.now(datetime.timezone.utc) - last_at
+    return age.total_seconds() >= interval_seconds
+
+
 def alpha_show(identifier: str) -> Optional[dict]:
     """Return a single alpha by hash or WQ alpha ID."""
     return get_registry().get_alpha(identifier)
 
 
-def alpha_history(identifier: str) -> Optional[dict]:
-    """Return an alpha plus simulation and event history."""
-    return get_registry().history(identifier)
+def alpha_cache_stats() -> dict:
+    """Return hit/miss counters of this process's alpha lookup cache."""
+    return get_registry().cache_stats()
+
+
+def alpha_history(identifier: str,
+                  include_archived: bool = False,
+                  limit: Optional[int] = None,
+                  cursor: Optional[str] = None) -> Optional[dict]:
+    """Return an alpha plus simulation and event history, optionally one page at a time."""
+    return get_registry().history(identifier, include_archived=include_archived, limit=limit, cursor=cursor)
 
 
 def alpha_promote(identifier: str, reason: Optional[str] = None) -> Optional[dict]:
@@ -2365,6 +3418,742 @@ def alpha_reject(identifier: str, reason: str) -> Optional[dict]:
     return get_registry().reject(identifier, reason=reason)
 
 
+def alpha_stats(dimension: str = "template",
+                keys: Optional[List[str]] = None,
+                min_simulations: int = 1,
+                order_by: str = "simulations",
+                descending: bool = True,
+                limit: int = 50,
+                rebuild: bool = False) -> dict:
+    """Per-template, per-field or per-operator performance from the registry aggregates."""
+    registry = get_registry()
+    rebuilt = registry.rebuild_stats() if rebuild else None
+    try:
+        items = registry.stats(
+            dimension,
+            keys=keys,
+            min_simulations=min_simulations,
+            order_by=order_by,
+            descending=descending,
+            limit=limit,
+        )
+    except ValueError as exc:
+        return {"status": "error", "message": str(exc)}
+    result = {"status": "ok", "dimension": dimension, "items": items}
+    if rebuilt is not None:
+        result["rebuilt_from"] = rebuilt
+    return result
+
+
+def _iter_result_csv_rows(path: str, start: int = 0, digest=None) -> Iterator[Tuple[list, int]]:
+    """
+    Yield ``(row, offset)``: typed result rows in ``SIM_CSV_HEADER`` order and
+    the byte offset just past each.  Headerless files are read positionally.
+
+    *start* is an offset yielded by an earlier read; the rows before it are
+    not parsed again.  *digest* is updated with every byte read from there on.
+    """
+    with open(path, "r", newline="", encoding="utf-8-sig") as fh:
+        first = next(csv.reader(fh), None)
+    if first is None:
+        return
+    header = [cell.strip() for cell in first]
+    has_header = "code" in header
+    if has_header:
+        positions = [header.index(column) if column in header else None for column in SIM_CSV_HEADER]
+    else:
+        positions = list(range(len(SIM_CSV_HEADER)))
+    with open(path, "rb") as fh:
+        offset = start
+        fh.seek(start)
+        if not start:
+            bom = fh.read(len(codecs.BOM_UTF8))
+            if bom == codecs.BOM_UTF8:
+                offset = len(bom)
+                if digest is not None:
+                    digest.update(bom)
+            else:
+                fh.seek(0)
+
+        def lines() -> Iterator[str]:
+            # csv.reader pulls lines only as it needs them, so after each row
+            # *offset* is the end of that row.
+            nonlocal offset
+            for line in fh:
+                offset += len(line)
+                if digest is not None:
+                    digest.update(line)
+                yield line.decode("utf-8")
+
+        reader = csv.reader(lines())
+        if has_header and not start:
+            next(reader, None)
+        for raw in reader:
+            yield [
+                _result_value(column, raw[index]) if index is not None and index < len(raw) else None
+                for column, index in zip(SIM_CSV_HEADER, positions)
+            ], offset
+
+
+def _file_prefix_digest(path: str, length: int):
+    """SHA-256 object over the first *length* bytes of *path*, or None when the file is shorter."""
+    digest = hashlib.sha256()
+    remaining = length
+    with open(path, "rb") as fh:
+        while remaining > 0:
+            block = fh.read(min(remaining, 1 << 20))
+            if not block:
+                return None
+            digest.update(block)
+            remaining -= len(block)
+    return digest
+
+
+def _import_candidate_files(data_dir: str) -> List[str]:
+    if not os.path.isdir(data_dir):
+        return []
+    return [
+        os.path.join(data_dir, fn)
+        for fn in sorted(os.listdir(data_dir))
+        if fn.endswith(".csv")
+        and fn not in ("_header1.csv", "_header2.csv")
+        and not fn.endswith(".enrichment.csv")
+    ]
+
+
+def alpha_import(paths: Optional[List[str]] = None,
+                 data_dir: str = DATA_DIR,
+                 chunk_size: int = ALPHA_IMPORT_CHUNK_SIZE,
+                 restart: bool = False,
+                 progress_cb=None) -> dict:
+    """
+    Backfill historical result CSVs into the alpha registry.
+
+    Files are streamed in chunks of *chunk_size* rows, each loaded in one
+    transaction together with its resume checkpoint.  Finished files are
+    skipped while their size and mtime are unchanged.  A file that grew
+    resumes by seeking to the byte offset after the last imported row, once a
+    hash of the bytes before it matches the one saved with the checkpoint;
+    files that shrank or were rewritten are re-read from the start.  Rows already in the registry (same alpha hash and result link)
+    are skipped, so re-running is safe.  *restart* ignores saved progress.
+    """
+    registry = get_registry()
+    chunk_size = max(int(chunk_size), 1)
+    files = [os.path.abspath(p) for p in paths] if paths else _import_candidate_files(data_dir)
+    totals = {"imported": 0, "duplicates": 0, "invalid": 0}
+    summary: List[dict] = []
+    for path in files:
+        name = os.path.basename(path)
+        if not os.path.isfile(path):
+            summary.append({"file": name, "status": "error", "message": "File not found."})
+            continue
+        stat = os.stat(path)
+        checkpoint = None if restart else registry.import_checkpoint(path)
+        if restart:
+            registry.clear_import_checkpoint(path)
+        if (checkpoint and checkpoint["status"] == "done"
+                and checkpoint["file_size"] == stat.st_size
+                and checkpoint["file_mtime"] == stat.st_mtime):
+            summary.append({"file": name, "status": "skipped", "rows": checkpoint["rows_done"]})
+            continue
+        start, rows_done, digest = 0, 0, None
+        if checkpoint and stat.st_size >= checkpoint["file_size"] and checkpoint.get("byte_offset"):
+            digest = _file_prefix_digest(path, checkpoint["byte_offset"])
+            if digest is not None and digest.hexdigest() == checkpoint.get("prefix_hash"):
+                start, rows_done = checkpoint["byte_offset"], checkpoint["rows_done"]
+            else:
+                digest = None
+        if checkpoint and not start:
+            registry.clear_import_checkpoint(path)
+        digest = digest or hashlib.sha256()
+
+        counts = {"imported": 0, "duplicates": 0, "invalid": 0}
+        offset = start
+        state = {"path": path, "file_size": stat.st_size, "file_mtime": stat.st_mtime}
+        try:
+            rows = _iter_result_csv_rows(path, start, digest)
+            while True:
+                batch = list(itertools.islice(rows, chunk_size))
+                if not batch:
+                    break
+                rows_done += len(batch)
+                offset = batch[-1][1]
+                result = registry.import_simulation_rows(
+                    [row for row, _ in batch],
+                    source_file=name,
+                    checkpoint={**state, "rows_done": rows_done, "byte_offset": offset,
+                                "prefix_hash": digest.hexdigest(), "status": "running"},
+                )
+                for key in counts:
+                    counts[key] += result[key]
+                if progress_cb:
+                    progress_cb(f"{name}: {rows_done} rows read, {counts['imported']} imported")
+            registry.import_simulation_rows(
+                [], checkpoint={**state, "rows_done": rows_done, "byte_offset": offset,
+                                "prefix_hash": digest.hexdigest(), "status": "done"},
+            )
+        except (OSError, UnicodeDecodeError, csv.Error) as exc:
+            summary.append({"file": name, "status": "error", "rows": rows_done, "message": str(exc), **counts})
+        else:
+            summary.append({"file": name, "status": "done", "rows": rows_done, **counts})
+        for key in totals:
+            totals[key] += counts[key]
+    return {"status": "ok", "files": summary, **totals}
+
+
+# ---------------------------------------------------------------------------
+# Alpha export
+# ---------------------------------------------------------------------------
+
+class _ArrowExportWriter:
+    """Streams chunks into a Parquet or Arrow IPC file, one record batch per chunk."""
+
+    def __init__(self, path: str, columns: List[Tuple[str, str]], fmt: str):
+        import pyarrow as pa
+
+        self._pa = pa
+        self.schema = pa.schema([
+            (name, pa.float64() if kind == "float" else pa.string()) for name, kind in columns
+        ])
+        if fmt == "parquet":
+            import pyarrow.parquet as pq
+
+            self._writer = pq.ParquetWriter(path, self.schema)
+            self._sink = None
+        else:
+            self._sink = pa.OSFile(path, "wb")
+            self._writer = pa.ipc.new_file(self._sink, self.schema)
+
+    def write(self, rows: List[dict]):
+        batch = self._pa.RecordBatch.from_pydict(
+            {name: [row[name] for row in rows] for name in self.schema.names},
+            schema=self.schema,
+        )
+        self._writer.write_batch(batch)
+
+    def close(self):
+        self._writer.close()
+        if self._sink is not None:
+            self._sink.close()
+
+
+class _NpzExportWriter:
+    """
+    Builds an ``.npz`` (one array per column) with bounded memory.
+
+    Columns are filled chunk by chunk into ``.npy`` memmaps sized from
+    ``export_profile`` and zipped at the end.  Strings are fixed-width
+    unicode, missing floats are NaN and missing strings are empty.
+    """
+
+    def __init__(self, path: str, columns: List[Tuple[str, str]], profile: dict):
+        import numpy as np
+
+        self._np = np
+        self.path = path
+        self.columns = columns
+        self.capacity = profile["rows"]
+        self.count = 0
+        self._spill_dir = f"{path}.columns"
+        os.makedirs(self._spill_dir, exist_ok=True)
+        self._arrays = {
+            name: np.lib.format.open_memmap(
+                os.path.join(self._spill_dir, f"{name}.npy"),
+                mode="w+",
+                dtype=np.float64 if kind == "float" else f"<U{max(profile['widths'].get(name, 0), 1)}",
+                shape=(profile["rows"],),
+            )
+            for name, kind in columns
+        }
+
+    def write(self, rows: List[dict]):
+        # Rows updated while exporting drop out of the frozen range, so the
+        # profile count is an upper bound.
+        rows = rows[:self.capacity - self.count]
+        end = self.count + len(rows)
+        for name, kind in self.columns:
+            if kind == "float":
+                values = [self._np.nan if row[name] is None else row[name] for row in rows]
+            else:
+                values = ["" if row[name] is None else row[name] for row in rows]
+            self._arrays[name][self.count:end] = values
+        self.count = end
+
+    def close(self):
+        import zipfile
+
+        try:
+            with zipfile.ZipFile(self.path, "w", compression=zipfile.ZIP_STORED, allowZip64=True) as zf:
+                for name, array in self._arrays.items():
+                    with zf.open(f"{name}.npy", "w", force_zip64=True) as fh:
+                        self._np.lib.format.write_array(fh, array[:self.count], allow_pickle=False)
+        finally:
+            self._arrays.clear()
+            for fn in os.listdir(self._spill_dir):
+                os.remove(os.path.join(self._spill_dir, fn))
+            os.rmdir(self._spill_dir)
+
+
+def alpha_export(fmt: str = "parquet",
+                 output_dir: str = EXPORTS_DIR,
+                 tables: Optional[List[str]] = None,
+                 incremental: bool = False,
+                 chunk_size: int = ALPHA_EXPORT_CHUNK_SIZE,
+                 progress_cb=None) -> dict:
+    """
+    Export the registry's ``alphas`` and ``simulations`` as flat, typed columnar files.
+
+    Rows are streamed in chunks of *chunk_size*.  Every export records a
+    watermark per output directory and format; with *incremental* only rows
+    created or updated since that watermark are written.  Files are named
+    ``<table>_<timestamp>_full.<ext>`` or ``..._delta.<ext>``; a delta may
+    repeat an alpha from an earlier file, so keep the row with the newest
+    ``updated_at`` per ``alpha_hash``.
+    """
+    if fmt not in ALPHA_EXPORT_FORMATS:
+        return {"status": "error", "message": f"Unknown export format {fmt!r}; choose from {', '.join(ALPHA_EXPORT_FORMATS)}."}
+    tables = list(tables or ALPHA_EXPORT_TABLES)
+    unknown = [t for t in tables if t not in ALPHA_EXPORT_TABLES]
+    if unknown:
+        return {"status": "error", "message": f"Unknown table(s): {', '.join(unknown)}."}
+    try:
+        if fmt == "npz":
+            import numpy  # noqa: F401
+        else:
+            import pyarrow  # noqa: F401
+    except ImportError:
+        package = "numpy" if fmt == "npz" else "pyarrow"
+        return {"status": "error", "message": f"{fmt} export needs {package} (pip install {package})."}
+
+    registry = get_registry()
+    os.makedirs(output_dir, exist_ok=True)
+    target = f"{fmt}:{os.path.abspath(output_dir)}"
+    stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    files = []
+    for table in tables:
+        since = registry.export_watermark(target, table) if incremental else None
+        profile = registry.export_profile(table, since=since)
+        entry = {"table": table, "rows": 0, "file": None, "incremental": bool(since)}
+        files.append(entry)
+        if not profile["rows"]:
+            continue
+        path = os.path.join(output_dir, f"{table}_{stamp}_{'delta' if since else 'full'}.{fmt}")
+        tmp_path = f"{path}.tmp"
+        columns = registry.export_columns(table)
+        writer = (_NpzExportWriter(tmp_path, columns, profile) if fmt == "npz"
+                  else _ArrowExportWriter(tmp_path, columns, fmt))
+        cursor = since
+        try:
+            for rows, cursor in registry.iter_export_chunks(
+                table, until=profile["until"], since=since, chunk_size=chunk_size,
+            ):
+                writer.write(rows)
+                entry["rows"] += len(rows)
+                if progress_cb:
+                    progress_cb(f"{table}: {entry['rows']}/{profile['rows']} rows")
+        except BaseException:
+            writer.close()
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        writer.close()
+        os.replace(tmp_path, path)
+        registry.set_export_watermark(target, table, cursor, entry["rows"])
+        entry["file"] = path
+    return {"status": "ok", "format": fmt, "output_dir": output_dir, "files": files}
+
+
+def _write_change_set(registry, path: str, target: str, node_id: str,
+                      chunk_size: int, progress_cb=None) -> Tuple[Dict[str, int], Dict[str, Optional[str]]]:
+    counts = {table: 0 for table in REGISTRY_SYNC_TABLES}
+    cursors: Dict[str, Optional[str]] = {}
+    referenced = set()
+    written = set()
+    with gzip.open(path, "wt", encoding="utf-8") as fh:
+        fh.write(json.dumps({"format": REGISTRY_SYNC_FORMAT, "node_id": node_id,
+                             "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat()}) + "\n")
+        # Alphas go last so that every alpha a simulation or event refers to
+        # can be added even when the alpha itself did not change.
+        for table in ("simulations", "alpha_events", "alphas"):
+            since = registry.export_watermark(target, table)
+            cursors[table] = since
+            profile = registry.sync_profile(table, since=since)
+            if not profile["rows"]:
+                continue
+            for rows, cursor in registry.iter_sync_changes(
+                table, until=profile["until"], since=since, chunk_size=chunk_size,
+            ):
+                for row in rows:
+                    fh.write(json.dumps({"table": table, "row": row}, ensure_ascii=False) + "\n")
+                (written if table == "alphas" else referenced).update(row["alpha_hash"] for row in rows)
+                counts[table] += len(rows)
+                cursors[table] = cursor
+                if progress_cb:
+                    progress_cb(f"{table}: {counts[table]}/{profile['rows']} rows")
+        for row in registry.sync_alphas(referenced - written):
+            fh.write(json.dumps({"table": "alphas", "row": row}, ensure_ascii=False) + "\n")
+            counts["alphas"] += 1
+    return counts, cursors
+
+
+def registry_sync_export(sync_dir: str = REGISTRY_SYNC_DIR,
+                         chunk_size: int = REGISTRY_SYNC_CHUNK_SIZE,
+                         progress_cb=None) -> dict:
+    """
+    Write this registry's changes since the last export to *sync_dir* as one change-set.
+
+    The change-set is a gzipped JSONL file in ``<sync_dir>/<node_id>/``
+    holding the raw ``alphas``, ``simulations`` and ``alpha_events`` rows
+    created or updated since the previous export to that directory.  Nothing
+    is written when nothing changed.
+    """
+    if not sync_dir:
+        return {"status": "error", "message": "No sync directory; pass --dir or set BRAIN_REGISTRY_SYNC_DIR."}
+    registry = get_registry()
+    node_id = registry.node_id
+    node_dir = os.path.join(sync_dir, node_id)
+    os.makedirs(node_dir, exist_ok=True)
+    stamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+    path = os.path.join(node_dir, f"changes_{stamp}{REGISTRY_SYNC_SUFFIX}")
+    tmp_path = f"{path}.tmp"
+    target = f"sync:{os.path.abspath(sync_dir)}"
+    try:
+        counts, cursors = _write_change_set(registry, tmp_path, target, node_id,
+                                            max(int(chunk_size), 1), progress_cb)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    if not any(counts.values()):
+        os.remove(tmp_path)
+        return {"status": "ok", "node_id": node_id, "file": None, "rows": counts}
+    os.replace(tmp_path, path)
+    for table, cursor in cursors.items():
+        if cursor:
+            registry.set_export_watermark(target, table, cursor, counts[table])
+    return {"status": "ok", "node_id": node_id, "file": path, "rows": counts}
+
+
+def _iter_change_set(path: str, table: str, chunk_size: int) -> Iterator[List[dict]]:
+    chunk: List[dict] = []
+    with gzip.open(path, "rt", encoding="utf-8") as fh:
+        header = json.loads(fh.readline() or "{}")
+        if header.get("format") != REGISTRY_SYNC_FORMAT:
+            raise ValueError(f"Not a registry change-set: {os.path.basename(path)}")
+        for line in fh:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record.get("table") != table:
+                continue
+            chunk.append(record["row"])
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+def registry_sync_import(sync_dir: str = REGISTRY_SYNC_DIR,
+                         chunk_size: int = REGISTRY_SYNC_CHUNK_SIZE,
+                         progress_cb=None) -> dict:
+    """
+    Merge every other node's change-sets in *sync_dir* that this registry has not applied yet.
+
+    Each file is read once per table, alphas first, and merged in chunks of
+    *chunk_size* rows.  Merging is idempotent and order-independent, so a
+    file that fails half-way (e.g. still being copied) is simply retried on
+    the next run.
+    """
+    if not sync_dir:
+        return {"status": "error", "message": "No sync directory; pass --dir or set BRAIN_REGISTRY_SYNC_DIR."}
+    if not os.path.isdir(sync_dir):
+        return {"status": "error", "message": f"Sync directory not found: {sync_dir}"}
+    registry = get_registry()
+    node_id = registry.node_id
+    chunk_size = max(int(chunk_size), 1)
+    files: List[dict] = []
+    for peer in sorted(os.listdir(sync_dir)):
+        peer_dir = os.path.join(sync_dir, peer)
+        if peer == node_id or not os.path.isdir(peer_dir):
+            continue
+        applied = registry.applied_sync_files(peer)
+        for name in sorted(os.listdir(peer_dir)):
+            if not name.endswith(REGISTRY_SYNC_SUFFIX) or name in applied:
+                continue
+            path = os.path.join(peer_dir, name)
+            entry: Dict[str, Any] = {"node_id": peer, "file": name}
+            files.append(entry)
+            try:
+                for table in REGISTRY_SYNC_TABLES:
+                    totals: Dict[str, int] = {}
+                    for rows in _iter_change_set(path, table, chunk_size):
+                        for key, value in registry.apply_sync_changes(table, rows, origin=peer).items():
+                            totals[key] = totals.get(key, 0) + value
+                        if progress_cb:
+                            progress_cb(f"{peer}/{name} {table}: {sum(totals.values())} rows")
+                    entry[table] = totals
+            except (OSError, EOFError, ValueError, KeyError) as exc:
+                entry["error"] = str(exc)
+                continue
+            records = sum(sum(entry[table].values()) for table in REGISTRY_SYNC_TABLES)
+            registry.mark_sync_file_applied(peer, name, records)
+    return {"status": "ok", "node_id": node_id, "files": files}
+
+
+def registry_sync(sync_dir: str = REGISTRY_SYNC_DIR,
+                  export: bool = True,
+                  import_changes: bool = True,
+                  chunk_size: int = REGISTRY_SYNC_CHUNK_SIZE,
+                  progress_cb=None) -> dict:
+    """Export local changes to *sync_dir*, then merge other nodes' change-sets from it."""
+    result: Dict[str, Any] = {"status": "ok", "sync_dir": sync_dir}
+    for enabled, key, func in ((export, "exported", registry_sync_export),
+                               (import_changes, "imported", registry_sync_import)):
+        if not enabled:
+            continue
+        outcome = func(sync_dir, chunk_size=chunk_size, progress_cb=progress_cb)
+        if outcome.get("status") == "error":
+            return outcome
+        result["node_id"] = outcome["node_id"]
+        result[key] = outcome.get("files") if key == "imported" else {"file": outcome["file"], "rows": outcome["rows"]}
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Alpha enrichment service
+# ---------------------------------------------------------------------------
+
+def _enrichment_cache_path(alpha_id: str, endpoint: str) -> str:
+    return os.path.join(ENRICHMENT_DIR, _sanitize_filename(alpha_id), f"{endpoint}.json")
+
+
+def _load_enrichment_payload(alpha_id: str, endpoint: str) -> Optional[dict]:
+    path = _enrichment_cache_path(alpha_id, endpoint)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_enrichment_payload(alpha_id: str, endpoint: str, payload: dict):
+    path = _enrichment_cache_path(alpha_id, endpoint)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(payload, fh, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def _recordset_dicts(payload: dict) -> List[dict]:
+    names = [prop.get("name") for prop in (payload.get("schema") or {}).get("properties", [])]
+    return [dict(zip(names, record)) for record in payload.get("records") or []]
+
+
+def _enrichment_metrics(endpoint: str, payload: dict) -> dict:
+    """Reduce a cached endpoint payload to the metrics stored in the registry."""
+    if endpoint == "self_correlation":
+        return {
+            "correlation": payload.get("max", -1),
+            "self_correlation_min": payload.get("min"),
+        }
+    if endpoint == "yearly_stats":
+        return {"yearly_stats": _recordset_dicts(payload)}
+    if endpoint == "pnl":
+        records = payload.get("records") or []
+        last = records[-1] if records else []
+        return {
+            "pnl_days": len(records),
+            "pnl_last": last[1] if len(last) > 1 else None,
+        }
+    return {}
+
+
+def _fetch_enrichment_payload(session: requests.Session, limiter: RequestRateLimiter,
+                              alpha_id: str, endpoint: str, stop_flag) -> dict:
+    """GET one enrichment endpoint, waiting out 429s and still-computing responses."""
+    url = f"{BRAIN_API_BASE}{ENRICHMENT_ENDPOINTS[endpoint].format(alpha_id=alpha_id)}"
+    for _ in range(ENRICHMENT_MAX_POLLS):
+        if not limiter.wait(stop_flag):
+            raise RuntimeError("Stopped by user")
+        r = session.get(url, timeout=30)
+        if r.status_code == 401:
+            clear_login_state()
+            raise PermissionError("Unauthorized while fetching alpha enrichment.")
+        if r.status_code == 429:
+            limiter.defer(_retry_after_seconds(r.headers, wq_cassette.scaled(30)))
+            continue
+        if r.status_code in SIMULATION_TRANSIENT_POLL_STATUSES:
+            limiter.defer(_retry_after_seconds(r.headers, wq_cassette.scaled(10)))
+            continue
+        r.raise_for_status()
+        # WQ computes these lazily: an empty body with Retry-After means "not ready yet".
+        if "Retry-After" in r.headers and not r.content.strip():
+            if not _sleep_with_stop(stop_flag, _retry_after_seconds(r.headers, 2)):
+                raise RuntimeError("Stopped by user")
+            continue
+        payload = r.json()
+        if not isinstance(payload, dict):
+            raise ValueError(f"Unexpected {endpoint} payload for {alpha_id}.")
+        return payload
+    raise TimeoutError(f"{endpoint} for {alpha_id} was not ready after {ENRICHMENT_MAX_POLLS} polls.")
+
+
+def _enrich_one(session: requests.Session, limiter: RequestRateLimiter,
+                alpha_id: str, endpoint: str, stop_flag) -> dict:
+    payload = _load_enrichment_payload(alpha_id, endpoint)
+    cached = payload is not None
+    if payload is None:
+        payload = _fetch_enrichment_payload(session, limiter, alpha_id, endpoint, stop_flag)
+        _save_enrichment_payload(alpha_id, endpoint, payload)
+    metrics = _enrichment_metrics(endpoint, payload)
+    get_registry().record_enrichment(alpha_id, endpoint, metrics=metrics)
+    return {"alpha_id": alpha_id, "endpoint": endpoint, "cached": cached}
+
+
+def _enrichment_sidecar_path(result_file: str) -> str:
+    root, _ = os.path.splitext(result_file)
+    return f"{root}.enrichment.csv"
+
+
+def _write_enrichment_sidecar(job: dict, endpoints: Iterable[str]) -> Optional[str]:
+    """Rewrite ``<result>.enrichment.csv`` for *job* from the payload cache."""
+    result_file = job.get("result_file")
+    if not result_file:
+        return None
+    endpoints = list(endpoints)
+    rows = []
+    for item in job.get("completed_rows", []):
+        row = item.get("row") or []
+        link = str(row[13]) if len(row) > 13 else ""
+        alpha_id = item.get("alpha_id") or alpha_id_from_link(link)
+        if not alpha_id:
+            continue
+        out = {"alpha_id": alpha_id, "link": link, "code": row[14] if len(row) > 14 else ""}
+        for endpoint in endpoints:
+            payload = _load_enrichment_payload(alpha_id, endpoint)
+            if payload is None:
+                continue
+            for key, value in _enrichment_metrics(endpoint, payload).items():
+                out[key] = json.dumps(value, ensure_ascii=False) if isinstance(value, (list, dict)) else value
+        rows.append(out)
+    if not rows:
+        return None
+    columns = ["alpha_id", "link", "code"]
+    for out in rows:
+        columns.extend(key for key in out if key not in columns)
+    path = _enrichment_sidecar_path(result_file)
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.DictWriter(fh, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
+    return path
+
+
+def alpha_enrich(job_id: Optional[str] = None,
+                 endpoints: Optional[List[str]] = None,
+                 limit: int = 100,
+                 max_workers: int = ENRICHMENT_MAX_WORKERS,
+                 requests_per_minute: float = ENRICHMENT_REQUESTS_PER_MINUTE,
+                 credentials_path: str = CREDS_PATH,
+                 stop_flag=None,
+                 progress_cb=None) -> dict:
+    """
+    Fetch extra statistics for completed alphas, off the simulation path.
+
+    Picks alphas from *job_id* (or the registry's newest simulated alphas
+    that still miss an endpoint), fetches each endpoint through its own
+    bounded pool and rate limiter, caches payloads under
+    ``.brain_cli/enrichment/<alpha_id>/``, merges the derived metrics into the
+    registry and rewrites the ``.enrichment.csv`` sidecar of affected jobs.
+    """
+    endpoints = list(endpoints or DEFAULT_ENRICHMENT_ENDPOINTS)
+    stop_flag = stop_flag or _StopFlag()
+    unknown = [endpoint for endpoint in endpoints if endpoint not in ENRICHMENT_ENDPOINTS]
+    if unknown:
+        return {"status": "error", "message": f"Unknown enrichment endpoints: {', '.join(unknown)}. "
+                                              f"Choose from {', '.join(ENRICHMENT_ENDPOINTS)}."}
+    registry = get_registry()
+    if job_id:
+        job = JobStore.get(job_id)
+        if job is None:
+            return {"status": "error", "message": f"Job {job_id} not found."}
+        alpha_ids = []
+        for item in job.get("completed_rows", []):
+            row = item.get("row") or []
+            alpha_id = item.get("alpha_id") or alpha_id_from_link(str(row[13]) if len(row) > 13 else "")
+            if alpha_id and alpha_id not in alpha_ids:
+                alpha_ids.append(alpha_id)
+        state = registry.enrichment_state(alpha_ids)
+        tasks = [
+            (alpha_id, endpoint)
+            for alpha_id in alpha_ids
+            for endpoint in endpoints
+            if state.get(alpha_id, {}).get(endpoint, {}).get("status") != "done"
+        ]
+    else:
+        tasks = [
+            (item["alpha_id"], endpoint)
+            for item in registry.pending_enrichment(endpoints, limit=limit)
+            for endpoint in item["endpoints"]
+        ]
+
+    result = {"status": "ok", "endpoints": endpoints, "enriched": 0, "cached": 0, "failed": 0,
+              "errors": [], "sidecars": []}
+    if tasks:
+        try:
+            session, kind, detail = get_session_for_request(credentials_path)
+        except FileNotFoundError:
+            return {"status": "error", "message": f"Credentials file not found: {credentials_path}"}
+        except Exception as exc:
+            return {"status": "error", "message": f"Error preparing session: {exc}"}
+        if kind is not None:
+            return {"status": "error", "message": detail or "Login failed."}
+
+        if progress_cb:
+            progress_cb(f"Enriching {len(tasks)} alpha endpoint(s) with {max_workers} worker(s).")
+        limiter = RequestRateLimiter(requests_per_minute)
+        with ThreadPoolExecutor(max_workers=max(int(max_workers), 1)) as executor:
+            futures = {
+                executor.submit(_enrich_one, session, limiter, alpha_id, endpoint, stop_flag): (alpha_id, endpoint)
+                for alpha_id, endpoint in tasks
+            }
+            for fut in as_completed(futures):
+                alpha_id, endpoint = futures[fut]
+                try:
+                    outcome = fut.result()
+                except PermissionError as exc:
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    _notify_login_issue(
+                        "Saved session expired during alpha enrichment.",
+                        str(exc),
+                        cooldown_key="alpha-enrich-unauthorized",
+                    )
+                    result.update(status="error", message=str(exc))
+                    break
+                except Exception as exc:
+                    registry.record_enrichment(alpha_id, endpoint, error=str(exc))
+                    result["failed"] += 1
+                    result["errors"].append({"alpha_id": alpha_id, "endpoint": endpoint, "error": str(exc)})
+                    continue
+                result["cached" if outcome["cached"] else "enriched"] += 1
+                if progress_cb:
+                    progress_cb(f"Enriched {alpha_id} {endpoint}{' (cached)' if outcome['cached'] else ''}.")
+
+    job_ids = [job_id] if job_id else registry.jobs_for_alpha_ids({alpha_id for alpha_id, _ in tasks})
+    for affected_id in job_ids:
+        affected = JobStore.get(affected_id)
+        if affected is None or affected.get("type") != "simulate":
+            continue
+        sidecar = _write_enrichment_sidecar(affected, ENRICHMENT_ENDPOINTS)
+        if sidecar:
+            result["sidecars"].append(sidecar)
+    return result
+
+
 # ---------------------------------------------------------------------------
 # Evolution service
 # ---------------------------------------------------------------------------
@@ -2516,6 +4305,12 @@ def evolution_run(template: str, pools: Dict[str, List[str]],
             seen.add(key)
             code = _render_candidate(template, cand)
             code = _eliminate_dead_code(code)
+            # Different placeholder values can render the same expression
+            # (e.g. swapped operands of a commutative operator).
+            canonical = canonical_hash(code)
+            if canonical in seen:
+                continue
+            seen.add(canonical)
             results.append({"score": round(score, 6), "code": code, "candidate": cand})
         if len(results) >= top_k:
             break
@@ -2582,24 +4377,42 @@ def evolution_auto_run(template: str, pools: Dict[str, List[str]],
             })
             break
 
+        # Candidates are keyed by canonical code and settings: rewrites of
+        # one expression are simulated once, and expressions the registry
+        # already has a result for are scored from that result.
         round_params: List[dict] = []
-        candidate_by_code: Dict[str, Dict[str, str]] = {}
+        candidates_by_key: Dict[tuple, List[Dict[str, str]]] = {}
+        key_by_code: Dict[str, tuple] = {}
         for item in candidates:
             strategy = dict(sim_defaults)
             strategy["code"] = item["code"]
-            round_params.append(strategy)
-            candidate_by_code[_normalize_code(item["code"])] = item["candidate"]
-
-        sim_job_id = simulate_enqueue(round_params, credentials_path=credentials_path)
-        if progress_cb:
-            progress_cb(f"[auto-run] round {round_idx}: simulate job {sim_job_id}")
-        sim_job = simulate_run(
-            sim_job_id,
-            progress_cb=(lambda msg: progress_cb(
-                f"[auto-run] round {round_idx}: {msg}"
-            )) if progress_cb else None,
-        )
-        sim_status = (sim_job or {}).get("status")
+            key = key_by_code[item["code"]] = simulation_key(strategy)
+            if key not in candidates_by_key:
+                round_params.append(strategy)
+            candidates_by_key.setdefault(key, []).append(item["candidate"])
+        cached = get_registry().simulated_results(candidates_by_key)
+        round_params = [strategy for strategy in round_params if simulation_key(strategy) not in cached]
+        rows: List[dict] = [
+            {**result["metrics"], "code": result["code"], "link": result["result_link"]}
+            for result in cached.values()
+        ]
+        if progress_cb and cached:
+            progress_cb(f"[auto-run] round {round_idx}: reusing {len(cached)} registry result(s)")
+
+        sim_job_id = None
+        sim_status = "done"
+        sim_job: Optional[dict] = None
+        if round_params:
+            sim_job_id = simulate_enqueue(round_params, credentials_path=credentials_path)
+            if progress_cb:
+                progress_cb(f"[auto-run] round {round_idx}: simulate job {sim_job_id}")
+            sim_job = simulate_run(
+                sim_job_id,
+                progress_cb=(lambda msg: progress_cb(
+                    f"[auto-run] round {round_idx}: {msg}"
+                )) if progress_cb else None,
+            )
+            sim_status = (sim_job or {}).get("status")
         if sim_status != "done":
             final_status = sim_status or "failed"
             final_error = (sim_job or {}).get("error") or f"Simulation job {sim_job_id} ended with status {sim_status}."
@@ -2614,24 +4427,24 @@ def evolution_auto_run(template: str, pools: Dict[str, List[str]],
             })
             break
 
-        sim_output = simulate_results(sim_job_id, limit=max(1000, top_k * 5)) or {}
-        rows = sim_output.get("rows", [])
+        if sim_job_id:
+            rows = itertools.chain(rows, iter_simulate_results(sim_job_id))
 
         matched: List[Tuple[float, Dict[str, str], dict]] = []
         next_known_real_fitness: Dict[tuple, float] = {}
-        row_by_code: Dict[str, dict] = {}
+        row_by_key: Dict[tuple, dict] = {}
         for row in rows:
             code = str(row.get("code", "")).strip()
             if not code:
                 continue
-            norm_code = _normalize_code(code)
-            candidate = candidate_by_code.get(norm_code)
-            if candidate is None:
+            key = simulation_key({**sim_defaults, "code": code})
+            if key in row_by_key or key not in candidates_by_key:
                 continue
             score = _compute_composite_score(row)
-            matched.append((score, candidate, row))
-            next_known_real_fitness[_candidate_key(candidate)] = score
-            row_by_code[norm_code] = row
+            for candidate in candidates_by_key[key]:
+                matched.append((score, candidate, row))
+                next_known_real_fitness[_candidate_key(candidate)] = score
+            row_by_key[key] = row
 
         matched.sort(key=lambda x: -x[0])
         if not matched:
@@ -2652,7 +4465,7 @@ def evolution_auto_run(template: str, pools: Dict[str, List[str]],
         known_real_fitness = next_known_real_fitness
 
         for item in final_candidates:
-            matched_row = row_by_code.get(_normalize_code(item["code"]))
+            matched_row = row_by_key.get(key_by_code.get(item["code"]))
             if matched_row is not None:
                 item["real_fitness"] = round(_compute_composite_score(matched_row), 6)
                 item["simulation"] = {
@@ -2668,6 +4481,7 @@ def evolution_auto_run(template: str, pools: Dict[str, List[str]],
             "round": round_idx,
             "candidate_count": len(candidates),
             "simulation_job_id": sim_job_id,
+            "cached_results": len(cached),
             "matched_results": len(matched),
             "top_results": final_candidates[:min(5, len(final_candidates))],
         })
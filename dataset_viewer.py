@@ -1,11 +1,12 @@
 import sys
 import os
 import sqlite3
+import re
 import pandas as pd
-import json
 import threading
 import time
 import requests
+from collections import OrderedDict
 from dotenv import load_dotenv
 import google.generativeai as genai
 from PySide6.QtWidgets import (QApplication, QMainWindow, QTableView, QTreeView,
@@ -13,8 +14,8 @@ from PySide6.QtWidgets import (QApplication, QMainWindow, QTableView, QTreeView,
                               QLineEdit, QLabel, QComboBox, QFileSystemModel,
                               QHeaderView, QPushButton, QStatusBar, QTabWidget,
                               QMessageBox, QDialog, QTextEdit, QVBoxLayout, QFrame,
-                              QMenu, QProgressBar)
-from PySide6.QtCore import Qt, QDir, QModelIndex, QSortFilterProxyModel, Signal, Slot, QAbstractTableModel, QThread
+                              QMenu, QProgressBar, QInputDialog)
+from PySide6.QtCore import Qt, QDir, QModelIndex, QSortFilterProxyModel, Signal, Slot, QAbstractTableModel, QThread, QTimer
 from PySide6.QtGui import QColor, QFont, QPalette, QIcon, QAction
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
@@ -27,6 +28,9 @@ from wq_session import (
     load_persisted_session,
 )
 from telegram_integration import send_login_issue_notification
+from field_catalog import DISPLAY_COLUMNS, format_coverage, get_catalog, locate_fields_file
+from field_stats import summarize_sql
+from gemini_search import pick_fields
 
 # 載入環境變數
 load_dotenv()
@@ -39,7 +43,7 @@ try:
         GEMINI_AVAILABLE = True
     else:
         GEMINI_AVAILABLE = False
-        print("警告: 未找到有效的 GEMINI_API_KEY，語意搜索功能將不可用")
+        print("警告: 未找到有效的 GEMINI_API_KEY，AI 搜索只使用本地向量索引（不經 Gemini 重新排序）")
 except Exception as e:
     GEMINI_AVAILABLE = False
     print(f"Gemini API 初始化失敗: {str(e)}")
@@ -67,162 +71,112 @@ def set_chinese_font():
 
 set_chinese_font()
 
+# 數據集 .db 的格式版本；改變列類型或索引時遞增，舊檔會自動重建
+DATASET_DB_VERSION = 1
+DATASET_COLUMN_TYPES = {'Coverage': 'REAL', 'Users': 'INTEGER', 'Alphas': 'INTEGER'}
+DATASET_INDEXED_COLUMNS = ('Field', 'Type', 'Coverage', 'Users', 'Alphas')
+
+_RANGE_TERM = re.compile(r"^([A-Za-z_]+)\s*(>=|<=|>|<|=)\s*(-?\d+(?:\.\d+)?)%?$")
+
+
+def parse_range_filter(text, columns):
+    """Parse ``"Coverage>=80 Users<500"`` into ``[(column, operator, value)]`` for numeric columns."""
+    numeric = {name.lower(): name for name in columns if name in DATASET_COLUMN_TYPES}
+    ranges = []
+    for term in re.findall(r"[A-Za-z_]+\s*(?:>=|<=|>|<|=)\s*[-\d.]+%?|\S+", str(text or "")):
+        match = _RANGE_TERM.match(term.strip())
+        if match is None or match.group(1).lower() not in numeric:
+            raise ValueError(f"Invalid range filter '{term}'; use e.g. Coverage>=80 Users<500")
+        ranges.append((numeric[match.group(1).lower()], match.group(2), float(match.group(3))))
+    return ranges
+
+
+# 本地語意搜索回傳的字段數（有 Gemini 時再由它從中篩選排序）
+SEMANTIC_SEARCH_LIMIT = 30
+SEMANTIC_RERANK_CANDIDATES = 50
+DIVERSE_FIELDS_COUNT = 50
+
 class SemanticSearchWorker(QThread):
     finished = Signal(list)
     error = Signal(str)
     
-    def __init__(self, query, field_data):
+    def __init__(self, query, field_data, location=None):
         super().__init__()
         self.query = query
         self.field_data = field_data
+        # (datasets_dir, partition, dataset_id)；目錄內的數據集用本地向量索引搜索
+        self.location = location
         
     def run(self):
+        if self.location is not None:
+            self.run_local()
+            return
+        if not GEMINI_AVAILABLE:
+            self.error.emit("This file is not in the field catalog; semantic search needs GEMINI_API_KEY for it.")
+            return
         try:
             print(f"開始語意搜索，查詢: {self.query}")
             print(f"字段數據數量: {len(self.field_data)}")
-            
-            # 準備發送給 Gemini 的數據
-            prompt = self.create_search_prompt(self.query, self.field_data)
-            print(f"提示詞長度: {len(prompt)}")
-            
-            # 調用 Gemini API
-            model = genai.GenerativeModel('gemini-2.5-flash-lite')
-            response = model.generate_content(prompt)
-            print(f"Gemini 回應原始內容: {response.text}")
-            
-            # 解析回應
-            result_fields = self.parse_response(response.text)
-            print(f"解析後的字段列表: {result_fields}")
+
+            # 字段列表分塊並行送給 Gemini，結果按塊快取
+            result_fields = pick_fields(self.query, [(field, description or "") for field, description in self.field_data])
             print(f"找到的字段數量: {len(result_fields)}")
-            
+
             self.finished.emit(result_fields)
-            
+
         except Exception as e:
             print(f"語意搜索執行錯誤: {str(e)}")
             self.error.emit(f"語意搜索時發生錯誤: {str(e)}")
-    
-    def create_search_prompt(self, query, field_data):
-        """創建發送給 Gemini 的提示詞"""
-        # 將字段數據轉換為結構化格式
-        fields_info = []
-        for field, description in field_data:
-            fields_info.append({
-                "field": field,
-                "description": description
-            })
-        
-        prompt = f"""
-你是一個金融數據字段專家。請根據用戶的查詢需求，從以下字段列表中找出相關的字段。
 
-用戶查詢：{query}
+    def run_local(self):
+        """在本地向量索引中搜索，有 Gemini 時只把前幾名候選交給它重新排序"""
+        try:
+            from field_vectors import gemini_rerank
+
+            datasets_dir, partition, dataset_id = self.location
+            catalog = get_catalog(datasets_dir)
+            limit = SEMANTIC_RERANK_CANDIDATES if GEMINI_AVAILABLE else SEMANTIC_SEARCH_LIMIT
+            results = catalog.semantic_search(self.query, dataset_id=dataset_id, partition=partition, limit=limit)
+            print(f"本地語意搜索找到 {len(results)} 個候選字段")
+            if GEMINI_AVAILABLE and results:
+                try:
+                    results = gemini_rerank(self.query, results, max_candidates=SEMANTIC_RERANK_CANDIDATES)
+                except Exception as e:
+                    # 重新排序失敗時保留本地排序
+                    print(f"Gemini 重新排序失敗，使用本地結果: {str(e)}")
+            self.finished.emit([row["field"] for row in results[:SEMANTIC_SEARCH_LIMIT]])
+        except ImportError as e:
+            self.error.emit(f"Local semantic search requires NumPy: {str(e)}")
+        except Exception as e:
+            print(f"語意搜索執行錯誤: {str(e)}")
+            self.error.emit(f"語意搜索時發生錯誤: {str(e)}")
 
-可用字段列表：
-{json.dumps(fields_info, ensure_ascii=False, indent=2)}
 
-請分析用戶的查詢意圖，並返回相關的字段名稱列表。請只返回一個 JSON 格式的字段名稱數組，不要包含其他文字說明。
+class DiverseFieldsWorker(QThread):
+    """在背景挑選多樣化字段（第一次會建立相似度圖）"""
+    finished = Signal(list)
+    error = Signal(str)
 
-例如：["field1", "field2", "field3"]
+    def __init__(self, n, location, fields=None):
+        super().__init__()
+        self.n = n
+        # (datasets_dir, partition, dataset_id)
+        self.location = location
+        # 只在這些字段中挑選（None 表示整個數據集）
+        self.fields = fields
 
-請確保返回的是有效的 JSON 格式。
-"""
-        return prompt
-    
-    def parse_response(self, response_text):
-        """解析 Gemini 的回應"""
-        print(f"開始解析回應，原始長度: {len(response_text)}")
-        print(f"原始回應前500字符: {response_text[:500]}")
-        
+    def run(self):
         try:
-            # 清理回應文本，移除可能的markdown標記
-            cleaned_response = response_text.strip()
-            
-            if cleaned_response.startswith('```json'):
-                cleaned_response = cleaned_response[7:]
-                print("移除了 ```json 開頭")
-            elif cleaned_response.startswith('```'):
-                cleaned_response = cleaned_response[3:]
-                print("移除了 ``` 開頭")
-            
-            if cleaned_response.endswith('```'):
-                cleaned_response = cleaned_response[:-3]
-                print("移除了 ``` 結尾")
-            
-            cleaned_response = cleaned_response.strip()
-            print(f"清理後的回應: {cleaned_response}")
-            
-            # 嘗試解析 JSON
-            result = json.loads(cleaned_response)
-            print(f"JSON 解析成功，類型: {type(result)}")
-            
-            if isinstance(result, list):
-                print(f"返回列表，內容: {result}")
-                cleaned_result = [str(item).strip() for item in result if item]
-                print(f"清理後的列表: {cleaned_result}")
-                return cleaned_result
-            elif isinstance(result, dict):
-                print(f"返回字典，內容: {result}")
-                values = []
-                for key, value in result.items():
-                    if isinstance(value, list):
-                        values.extend([str(v).strip() for v in value if v])
-                    else:
-                        values.append(str(value).strip())
-                print(f"從字典提取的值: {values}")
-                return values
-            else:
-                print(f"不是列表或字典類型，而是: {type(result)}，值: {result}")
-                return []
-                
-        except json.JSONDecodeError as e:
-            print(f"JSON 解析失敗: {str(e)}")
-            
-            # 如果無法解析為 JSON，嘗試多種方式提取字段名稱
-            import re
-            
-            # 方法1：提取雙引號中的內容
-            fields = re.findall(r'"([^"]+)"', response_text)
-            print(f"方法1 - 通過雙引號提取的字段: {fields}")
-            
-            if not fields:
-                # 方法2：提取單引號中的內容
-                fields = re.findall(r"'([^']+)'", response_text)
-                print(f"方法2 - 通過單引號提取的字段: {fields}")
-            
-            if not fields:
-                # 方法3：查找可能的列表格式
-                list_match = re.search(r'\[(.*?)\]', response_text, re.DOTALL)
-                if list_match:
-                    list_content = list_match.group(1)
-                    # 分割並清理
-                    fields = [item.strip().strip('"').strip("'") 
-                             for item in list_content.split(',') if item.strip()]
-                    print(f"方法3 - 通過列表格式提取的字段: {fields}")
-            
-            if not fields:
-                # 方法4：嘗試按行分割並查找可能的字段名
-                lines = response_text.split('\n')
-                for line in lines:
-                    line = line.strip()
-                    if line and not line.startswith(('```', '//', '#', '以下', '例如')):
-                        # 移除常見的前綴符號
-                        line = re.sub(r'^[-*•]\s*', '', line)
-                        if line:
-                            fields.append(line.strip('"').strip("'"))
-                print(f"方法4 - 通過行分割提取的字段: {fields}")
-            
-            # 過濾和清理結果
-            cleaned_fields = []
-            for field in fields:
-                field = str(field).strip()
-                if field and len(field) > 0 and field not in ['field1', 'field2', 'field3', 'example']:
-                    cleaned_fields.append(field)
-            
-            print(f"最終清理後的字段列表: {cleaned_fields}")
-            return cleaned_fields
-            
+            datasets_dir, partition, dataset_id = self.location
+            catalog = get_catalog(datasets_dir)
+            results = catalog.diverse_fields(self.n, dataset_id=dataset_id, partition=partition, fields=self.fields)
+            print(f"挑選了 {len(results)} 個多樣化字段")
+            self.finished.emit([row["field"] for row in results])
+        except ImportError as e:
+            self.error.emit(f"Picking diverse fields requires NumPy: {str(e)}")
         except Exception as e:
-            print(f"解析過程中發生其他錯誤: {str(e)}")
-            return []
+            print(f"挑選多樣化字段錯誤: {str(e)}")
+            self.error.emit(f"挑選多樣化字段時發生錯誤: {str(e)}")
 
 
 BRAIN_API_BASE = "https://api.worldquantbrain.com"
@@ -495,16 +449,47 @@ class DatasetRefreshWorker(QThread):
 
 # 自定義 SQLite 表格模型
 class SqliteTableModel(QAbstractTableModel):
+    """
+    Table model over one SQLite table, read in blocks of ``BLOCK_ROWS`` rows.
+
+    Each block is one ``rowid`` range query for all columns.  At most
+    ``MAX_CACHED_BLOCKS`` blocks are kept (least recently used are dropped),
+    and whenever the view reaches another block the next blocks in the scroll
+    direction are prefetched once the event loop is idle, so scrolling stays
+    smooth on any table size.
+
+    Filtering (``set_filter``) and sorting (``sort``) run in SQL: the
+    matching rowids are numbered in sort order into a temp ``view_rows``
+    table, and blocks are read through it.  Model rows are positions in that
+    ordering; checked rows are kept as rowids so they survive re-filtering.
+    ``summary`` gives the chart summary of the visible rows from SQL
+    aggregates, computed once per filter.
+    """
+
+    BLOCK_ROWS = 256
+    MAX_CACHED_BLOCKS = 64
+    PREFETCH_BLOCKS = 2
+
     def __init__(self, db_path, table_name):
         super(SqliteTableModel, self).__init__()
         self.db_path = db_path
         self.table_name = table_name
         self.columns = ["Select"]  # 添加一個 checkbox 列
-        self.checked_rows = set()  # 存儲被勾選的行
-        self.cache = {}  # 用於緩存查詢結果
+        self.checked_rows = set()  # 存儲被勾選行的 rowid
+        self.blocks = OrderedDict()  # block number -> rows, LRU order
         self.total_rows = 0
         self.conn = None
         self.original_columns = []  # 存儲原始列名
+        self._first_rowid = None  # rowid of row 0 when rowids are contiguous
+        self._last_block = 0
+        self._pending_prefetch = set()
+        self.visible_rows = 0  # 過濾後的行數
+        self.filter_text = ""
+        self.filter_column = None
+        self.filter_ranges = []  # [(column, operator, value)]
+        self.order_by = None
+        self._use_view_rows = False
+        self._summary = None
         self.setup_connection()
 
     def setup_connection(self):
@@ -518,15 +503,158 @@ class SqliteTableModel(QAbstractTableModel):
             self.original_columns = [info[1] for info in cursor.fetchall()]
             self.columns.extend(self.original_columns)  # 將原始列名添加到 checkbox 列之後
             
-            # 獲取總行數
-            cursor.execute(f"SELECT COUNT(*) FROM {self.table_name}")
-            self.total_rows = cursor.fetchone()[0]
+            # 獲取總行數；rowid 連續時（to_sql 建立的表）按 rowid 範圍讀取
+            cursor.execute(f"SELECT COUNT(*), MIN(rowid), MAX(rowid) FROM {self.table_name}")
+            self.total_rows, min_rowid, max_rowid = cursor.fetchone()
+            if self.total_rows and max_rowid - min_rowid + 1 == self.total_rows:
+                self._first_rowid = min_rowid
+            self.visible_rows = self.total_rows
             
         except Exception as e:
             print(f"數據庫連接錯誤: {str(e)}")
 
+    @staticmethod
+    def _filter_text_expr(name):
+        """文字過濾比對的是顯示文字：Coverage 存成 REAL，顯示為 format_coverage 的 "85%"，NULL 顯示為空"""
+        if name == 'Coverage':
+            return "(CASE WHEN \"Coverage\" IS NULL THEN '' ELSE printf('%g%%', \"Coverage\") END)"
+        return f'CAST("{name}" AS TEXT)'
+
+    def _where(self):
+        """WHERE 子句與參數：文字（單列或全部列，不分大小寫）和數值範圍"""
+        clauses, params = [], []
+        if self.filter_text:
+            escaped = self.filter_text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            columns = [self.filter_column] if self.filter_column else self.original_columns
+            clauses.append("(" + " OR ".join(
+                f"{self._filter_text_expr(name)} LIKE ? ESCAPE '\\'" for name in columns
+            ) + ")")
+            params.extend([f"%{escaped}%"] * len(columns))
+        for name, operator, value in self.filter_ranges:
+            clauses.append(f'"{name}" {operator} ?')
+            params.append(value)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def _apply_view(self):
+        """依目前的過濾與排序重建 rowid 順序，並以 COUNT(*) 更新行數"""
+        where, params = self._where()
+        cursor = self.conn.cursor()
+        self.beginResetModel()
+        try:
+            self.blocks.clear()
+            self._summary = None
+            self._pending_prefetch.clear()
+            self._last_block = 0
+            self._use_view_rows = bool(where or self.order_by)
+            cursor.execute("DROP TABLE IF EXISTS temp.view_rows")
+            if self._use_view_rows:
+                # 過濾結果只掃描一次：COUNT(*) 在物化後的 view_rows 上計算
+                cursor.execute("CREATE TEMP TABLE view_rows (pos INTEGER PRIMARY KEY, row_id INTEGER NOT NULL)")
+                cursor.execute(
+                    "INSERT INTO view_rows (pos, row_id) "
+                    f"SELECT ROW_NUMBER() OVER (ORDER BY {self.order_by or 'rowid'}) - 1, rowid "
+                    f"FROM {self.table_name}{where}",
+                    params,
+                )
+                cursor.execute("SELECT COUNT(*) FROM view_rows")
+            else:
+                cursor.execute(f"SELECT COUNT(*) FROM {self.table_name}")
+            self.visible_rows = cursor.fetchone()[0]
+            self.conn.commit()
+        finally:
+            self.endResetModel()
+
+    def set_filter(self, text="", column=None, ranges=None):
+        """Show only rows containing *text* (in *column*, or any column) that satisfy every numeric range."""
+        self.filter_text = text or ""
+        self.filter_column = column if column in self.original_columns else None
+        self.filter_ranges = list(ranges or [])
+        self._apply_view()
+
+    def has_filter(self):
+        return bool(self.filter_text or self.filter_ranges)
+
+    def summary(self):
+        """可見行的圖表摘要（field_stats 格式），以 SQL 聚合計算並快取到下次過濾"""
+        if self._summary is None:
+            if self.has_filter():
+                source = f"SELECT d.* FROM view_rows v JOIN {self.table_name} d ON d.rowid = v.row_id"
+            else:
+                source = f"SELECT * FROM {self.table_name}"
+            self._summary = summarize_sql(self.conn, source)
+        return self._summary
+
+    def _fetch_block(self, block):
+        start = block * self.BLOCK_ROWS
+        columns = ", ".join(f'd."{name}"' for name in self.original_columns)
+        cursor = self.conn.cursor()
+        if self._use_view_rows:
+            cursor.execute(
+                f"SELECT d.rowid, {columns} FROM view_rows v JOIN {self.table_name} d ON d.rowid = v.row_id "
+                "WHERE v.pos BETWEEN ? AND ? ORDER BY v.pos",
+                (start, start + self.BLOCK_ROWS - 1),
+            )
+        elif self._first_rowid is not None:
+            first = self._first_rowid + start
+            cursor.execute(
+                f"SELECT d.rowid, {columns} FROM {self.table_name} d WHERE d.rowid BETWEEN ? AND ? ORDER BY d.rowid",
+                (first, first + self.BLOCK_ROWS - 1),
+            )
+        else:
+            cursor.execute(
+                f"SELECT d.rowid, {columns} FROM {self.table_name} d ORDER BY d.rowid LIMIT ? OFFSET ?",
+                (self.BLOCK_ROWS, start),
+            )
+        return cursor.fetchall()
+
+    def _load_block(self, block):
+        rows = self.blocks.get(block)
+        if rows is not None:
+            self.blocks.move_to_end(block)
+            return rows
+        rows = self._fetch_block(block)
+        self.blocks[block] = rows
+        while len(self.blocks) > self.MAX_CACHED_BLOCKS:
+            self.blocks.popitem(last=False)
+        return rows
+
+    def _schedule_prefetch(self, block):
+        step = 1 if block >= self._last_block else -1
+        self._last_block = block
+        last_block = (self.visible_rows - 1) // self.BLOCK_ROWS
+        for offset in range(1, self.PREFETCH_BLOCKS + 1):
+            target = block + step * offset
+            if 0 <= target <= last_block and target not in self.blocks and target not in self._pending_prefetch:
+                self._pending_prefetch.add(target)
+                QTimer.singleShot(0, lambda target=target: self._prefetch(target))
+
+    def _prefetch(self, block):
+        self._pending_prefetch.discard(block)
+        if block not in self.blocks and self.conn is not None:
+            try:
+                self._load_block(block)
+            except Exception as e:
+                print(f"預取數據錯誤: {str(e)}")
+
+    def _row(self, row):
+        block, offset = divmod(row, self.BLOCK_ROWS)
+        entered = block != self._last_block or block not in self.blocks
+        rows = self._load_block(block)
+        if entered:
+            self._schedule_prefetch(block)
+        return rows[offset] if offset < len(rows) else None
+
+    def row_values(self, row):
+        """Values of one row (without the checkbox column), read through the block cache."""
+        values = self._row(row)
+        return None if values is None else values[1:]
+
+    def rowid_at(self, row):
+        values = self._row(row)
+        return None if values is None else values[0]
+
     def rowCount(self, parent=None):
-        return self.total_rows
+        return self.visible_rows
 
     def columnCount(self, parent=None):
         return len(self.columns)
@@ -539,7 +667,7 @@ class SqliteTableModel(QAbstractTableModel):
         col = index.column()
 
         if role == Qt.CheckStateRole and col == 0:  # 第一列是 checkbox
-            is_checked = row in self.checked_rows
+            is_checked = self.rowid_at(row) in self.checked_rows
             # print(f"Data requested: row {row}, col {col}, role CheckStateRole. Is checked? {is_checked}. Returning: {'Checked' if is_checked else 'Unchecked'}") # Debug print removed
             return Qt.Checked if is_checked else Qt.Unchecked
 
@@ -548,27 +676,25 @@ class SqliteTableModel(QAbstractTableModel):
 
         column_name = self.original_columns[col - 1]  # 因為第一列是 checkbox，所以要減 1
 
-        # 使用緩存系統
-        cache_key = (row, col)
-        if cache_key not in self.cache:
-            try:
-                cursor = self.conn.cursor()
-                cursor.execute(
-                    f"SELECT {column_name} FROM {self.table_name} LIMIT 1 OFFSET {row}"
-                )
-                value = cursor.fetchone()[0]
-                self.cache[cache_key] = value
-            except Exception as e:
-                print(f"數據查詢錯誤: {str(e)}")
-                return None
-        else:
-            value = self.cache[cache_key]
+        # 從區塊緩存讀取整行
+        try:
+            values = self.row_values(row)
+        except Exception as e:
+            print(f"數據查詢錯誤: {str(e)}")
+            return None
+        if values is None:
+            return None
+        value = values[col - 1]
 
         if role == Qt.DisplayRole and col > 0:
+            if column_name == 'Coverage' and (value is None or isinstance(value, (int, float))):
+                return format_coverage(value)  # 數據庫存數值，顯示時加 %
             return str(value)
 
         elif role == Qt.EditRole:
             if column_name == 'Coverage':
+                if value is None:
+                    return 0.0
                 try:
                     return float(str(value).replace('%', ''))
                 except ValueError:
@@ -593,7 +719,7 @@ class SqliteTableModel(QAbstractTableModel):
         elif role == Qt.BackgroundRole:
             if column_name == 'Coverage':
                 try:
-                    coverage = int(str(value).replace('%', ''))
+                    coverage = float(str(value).replace('%', ''))
                     if coverage > 90:
                         return QColor("#c8e6c9")  # 淺綠色
                     elif coverage > 70:
@@ -624,35 +750,14 @@ class SqliteTableModel(QAbstractTableModel):
         return None
 
     def sort(self, column, order):
-        """實現排序功能"""
+        """在 SQL 中排序（數值列已是 REAL/INTEGER 並有索引）"""
         try:
-            direction = "ASC" if order == Qt.AscendingOrder else "DESC"
-            column_name = self.columns[column]
-            
-            # 根據不同列類型使用不同的排序邏輯
-            if column_name == 'Coverage':
-                order_by = f"CAST(REPLACE({column_name}, '%', '') AS FLOAT)"
-            elif column_name in ['Users', 'Alphas']:
-                order_by = f"CAST({column_name} AS INTEGER)"
+            if column <= 0 or column >= len(self.columns):
+                self.order_by = None
             else:
-                order_by = column_name
-            
-            # 執行排序查詢
-            cursor = self.conn.cursor()
-            cursor.execute(f"""
-                CREATE TEMP TABLE IF NOT EXISTS sorted_rows AS
-                SELECT rowid, *
-                FROM {self.table_name}
-                ORDER BY {order_by} {direction}
-            """)
-            
-            # 清除緩存
-            self.cache.clear()
-            
-            # 通知視圖數據已更改
-            self.layoutAboutToBeChanged.emit()
-            self.layoutChanged.emit()
-            
+                direction = "ASC" if order == Qt.AscendingOrder else "DESC"
+                self.order_by = f'"{self.columns[column]}" {direction}, rowid'
+            self._apply_view()
         except Exception as e:
             print(f"排序錯誤: {str(e)}")
 
@@ -662,11 +767,8 @@ class SqliteTableModel(QAbstractTableModel):
         if column_name == "Select":
             return None
         try:
-            cursor = self.conn.cursor()
-            cursor.execute(
-                f"SELECT {column_name} FROM {self.table_name} LIMIT 1 OFFSET {row}"
-            )
-            return cursor.fetchone()[0]
+            values = self.row_values(row)
+            return None if values is None else values[self.original_columns.index(column_name)]
         except Exception as e:
             print(f"獲取數據錯誤: {str(e)}")
             return None
@@ -678,7 +780,7 @@ class SqliteTableModel(QAbstractTableModel):
 
         if role == Qt.CheckStateRole and index.column() == 0:
             # Note: 'index.row()' here refers to the source model row index
-            row = index.row()
+            row = self.rowid_at(index.row())
             if value == Qt.Checked:
                 self.checked_rows.add(row)
                 # print(f"Checked row {row}, total checked: {len(self.checked_rows)}") # Debug print removed
@@ -700,24 +802,41 @@ class SqliteTableModel(QAbstractTableModel):
             return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsUserCheckable
         return Qt.ItemIsEnabled | Qt.ItemIsSelectable
     
+    def set_checked_fields(self, fields):
+        """只勾選指定名稱的字段"""
+        names = list(fields)
+        rowids = set()
+        for start in range(0, len(names), 500):
+            chunk = names[start:start + 500]
+            cursor = self.conn.execute(
+                f"SELECT rowid FROM {self.table_name} WHERE Field IN ({','.join('?' * len(chunk))})", chunk
+            )
+            rowids.update(row[0] for row in cursor.fetchall())
+        self.checked_rows = rowids
+        self.dataChanged.emit(self.index(0, 0), self.index(max(self.rowCount() - 1, 0), 0), [Qt.CheckStateRole])
+
     def get_checked_fields(self):
         """獲取所有被勾選的字段名稱"""
         checked_fields = []
         try:
-            cursor = self.conn.cursor()
-            field_col_index = self.original_columns.index('Field')
-            for row in sorted(self.checked_rows):
-                cursor.execute(
-                    f"SELECT Field FROM {self.table_name} LIMIT 1 OFFSET {row}"
+            rowids = sorted(self.checked_rows)
+            for start in range(0, len(rowids), 500):
+                chunk = rowids[start:start + 500]
+                cursor = self.conn.execute(
+                    f"SELECT Field FROM {self.table_name} WHERE rowid IN ({','.join('?' * len(chunk))}) ORDER BY rowid",
+                    chunk,
                 )
-                field = cursor.fetchone()[0]
-                checked_fields.append(field)
+                checked_fields.extend(row[0] for row in cursor.fetchall())
         except Exception as e:
             print(f"獲取勾選字段時出錯: {str(e)}")
         return checked_fields
 
 # Custom Proxy Model to handle flags correctly
 class CheckableSortFilterProxyModel(QSortFilterProxyModel):
+    def sort(self, column, order=Qt.AscendingOrder):
+        # 排序交給 SqliteTableModel 的 SQL 查詢，代理本身不逐格讀取排序
+        self.sourceModel().sort(column, order)
+
     def flags(self, index):
         if not index.isValid():
             return Qt.NoItemFlags
@@ -811,10 +930,10 @@ class MainWindow(QMainWindow):
         # AI搜尋選項
         self.ai_search_action = QAction("AI Search", self)
         self.ai_search_action.setCheckable(True)
-        self.ai_search_action.setEnabled(GEMINI_AVAILABLE)
         self.ai_search_action.triggered.connect(lambda: self.set_search_mode("ai"))
         if not GEMINI_AVAILABLE:
-            self.ai_search_action.setText("AI Search (API key required)")
+            self.ai_search_action.setText("AI Search (local)")
+            self.ai_search_action.setToolTip("Set GEMINI_API_KEY to rerank results with Gemini")
         
         # 將動作添加到選單
         self.search_mode_menu.addAction(self.normal_search_action)
@@ -836,6 +955,14 @@ class MainWindow(QMainWindow):
         self.filter_column.addItem("Type")
         self.filter_column.currentIndexChanged.connect(self.filter_data)
         self.filter_column.setMinimumWidth(120)
+
+        # 數值範圍過濾，例如 "Coverage>=80 Users<500"
+        self.range_input = QLineEdit()
+        self.range_input.setPlaceholderText("Coverage>=80 Users<500")
+        self.range_input.setToolTip("Numeric filters on Coverage, Users and Alphas (>=, <=, >, <, =), separated by spaces")
+        self.range_input.textChanged.connect(self.filter_data)
+        self.range_input.setMinimumWidth(160)
+        self.range_input.setStyleSheet("padding: 4px; border: 1px solid #bdbdbd; border-radius: 4px;")
         
         # 添加刷新按鈕
         refresh_button = QPushButton("Refresh")
@@ -862,7 +989,18 @@ class MainWindow(QMainWindow):
 
         top_right.addWidget(field_label)
         top_right.addWidget(self.filter_column)
+        top_right.addWidget(self.range_input)
+        # 每個相似字段群只勾選一個代表
+        self.diverse_button = QPushButton("Pick Diverse Fields")
+        self.diverse_button.setToolTip(
+            "Check N fields, one per cluster of near-duplicate fields, ranked by coverage and usage "
+            "(among the checked fields if any are checked)"
+        )
+        self.diverse_button.clicked.connect(self.pick_diverse_fields)
+        self.diverse_button.setStyleSheet("padding: 4px 12px;")
+
         top_right.addWidget(refresh_button)
+        top_right.addWidget(self.diverse_button)
         top_right.addWidget(self.export_button)
         
         # 組合左右兩側到頂部布局
@@ -968,6 +1106,8 @@ class MainWindow(QMainWindow):
         # 添加標籤頁
         self.tab_widget.addTab(self.table_view, "Data Table")
         self.tab_widget.addTab(self.chart_widget, "Data Visualization")
+        # 圖表只在切換到圖表頁時重畫
+        self.tab_widget.currentChanged.connect(self.update_chart)
         
         # 佈局左右兩側
         splitter = QSplitter(Qt.Horizontal)
@@ -989,6 +1129,8 @@ class MainWindow(QMainWindow):
         
         # 數據相關
         self.current_dataset = None
+        # (datasets_dir, partition, dataset_id) of the loaded file when it is in the field catalog
+        self.current_location = None
         self.proxy_model = None
         self.click_connected = False  # 跟踪點擊事件是否已連接
         
@@ -1004,7 +1146,14 @@ class MainWindow(QMainWindow):
         self._api_refresh_worker = None
         
         # 顯示初始信息
-        self.status_bar.showMessage("Select a dataset file on the left to begin")
+        try:
+            summary = get_catalog().summary()
+            self.status_bar.showMessage(
+                f"Select a dataset file on the left to begin | "
+                f"{summary['datasets']} datasets, {summary['fields']} fields indexed"
+            )
+        except sqlite3.Error:
+            self.status_bar.showMessage("Select a dataset file on the left to begin")
 
     # 新增刷新當前資料集功能
     def refresh_current_dataset(self):
@@ -1064,6 +1213,7 @@ class MainWindow(QMainWindow):
             )
             # Reload the file model so new/updated CSVs appear immediately
             datasets_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "datasets")
+            get_catalog(datasets_dir)
             self.file_model.setRootPath(datasets_dir)
             self.file_view.setRootIndex(self.file_model.index(datasets_dir))
             QMessageBox.information(
@@ -1143,18 +1293,50 @@ class MainWindow(QMainWindow):
                 QMessageBox.warning(self, "Warning", "Please enter a search keyword")
         # 一般搜尋模式下，Enter鍵無特殊處理，因為textChanged已經處理了
     
-    def create_sqlite_database(self, df, db_path):
-        """將 DataFrame 轉換為 SQLite 數據庫"""
-        conn = sqlite3.connect(db_path)
-        
-        # 確保Coverage是字符串並包含%
+    @staticmethod
+    def dataset_source_signature(csv_path):
+        """CSV 的 (mtime_ns, size) 與數據庫格式版本，用來判斷 .db 是否仍然有效"""
+        stat = os.stat(csv_path)
+        return {"version": str(DATASET_DB_VERSION), "mtime_ns": str(stat.st_mtime_ns), "size": str(stat.st_size)}
+
+    def dataset_db_is_current(self, csv_path, db_path):
+        """已有的 .db 是否由目前的 CSV 建立（記錄在 dataset_meta 表）"""
+        if not os.path.exists(db_path):
+            return False
+        try:
+            conn = sqlite3.connect(db_path)
+            try:
+                stored = dict(conn.execute("SELECT key, value FROM dataset_meta").fetchall())
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return False
+        return stored == self.dataset_source_signature(csv_path)
+
+    def create_sqlite_database(self, df, db_path, csv_path):
+        """將 DataFrame 寫成帶類型與索引的 SQLite 數據庫，並記錄來源 CSV 的簽名"""
+        # Coverage 存成數值（百分比），Users/Alphas 存成整數
         if 'Coverage' in df.columns:
-            df['Coverage'] = df['Coverage'].astype(str)
-            df['Coverage'] = df['Coverage'].apply(lambda x: x if '%' in x else f"{x}%")
-        
+            df['Coverage'] = pd.to_numeric(df['Coverage'].astype(str).str.strip().str.rstrip('%'), errors='coerce')
+        for column in ('Users', 'Alphas'):
+            if column in df.columns:
+                df[column] = pd.to_numeric(df[column], errors='coerce').astype('Int64')
+        dtypes = {column: DATASET_COLUMN_TYPES.get(column, 'TEXT') for column in df.columns}
+
+        conn = sqlite3.connect(db_path)
         try:
-            # 將數據寫入SQLite
-            df.to_sql('dataset', conn, if_exists='replace', index=False)
+            # 先刪除簽名，寫到一半中斷時下次會重建
+            conn.execute("DROP TABLE IF EXISTS dataset_meta")
+            conn.commit()
+            df.to_sql('dataset', conn, if_exists='replace', index=False, dtype=dtypes)
+            for column in df.columns:
+                if column in DATASET_INDEXED_COLUMNS:
+                    conn.execute(f'CREATE INDEX IF NOT EXISTS "idx_dataset_{column}" ON dataset ("{column}")')
+            conn.execute("CREATE TABLE dataset_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            conn.executemany(
+                "INSERT INTO dataset_meta (key, value) VALUES (?, ?)",
+                self.dataset_source_signature(csv_path).items(),
+            )
             conn.commit()
         finally:
             conn.close()
@@ -1169,9 +1351,18 @@ class MainWindow(QMainWindow):
             # 建立對應的SQLite數據庫路徑
             db_path = csv_path.replace('.csv', '.db')
             
-            # 讀取CSV數據並創建SQLite數據庫
-            df = pd.read_csv(csv_path)
-            self.create_sqlite_database(df, db_path)
+            # 從欄位目錄讀取（已解析），目錄外的檔案才讀 CSV
+            datasets_dir, partition, dataset_id = locate_fields_file(csv_path)
+            catalog = get_catalog(datasets_dir) if dataset_id else None
+            in_catalog = catalog is not None and catalog.has_dataset(dataset_id, partition=partition)
+            location = (datasets_dir, partition, dataset_id) if in_catalog else None
+            # CSV 沒變時直接沿用已建好的 .db
+            if not self.dataset_db_is_current(csv_path, db_path):
+                if in_catalog:
+                    df = pd.DataFrame(catalog.fields(dataset_id, partition=partition), columns=list(DISPLAY_COLUMNS))
+                else:
+                    df = pd.read_csv(csv_path)
+                self.create_sqlite_database(df, db_path, csv_path)
             
             # 設置SQLite數據模型
             model = SqliteTableModel(db_path, 'dataset')
@@ -1246,6 +1437,7 @@ class MainWindow(QMainWindow):
 
             # 更新當前數據集和狀態欄
             self.current_dataset = model
+            self.current_location = location
             file_name = os.path.basename(csv_path)
             self.status_bar.showMessage(f"Loaded {file_name} | {model.total_rows} rows")
             
@@ -1279,26 +1471,29 @@ class MainWindow(QMainWindow):
             
         filter_text = self.search_input.text()
         filter_column = self.filter_column.currentText()
-        
-        if filter_column == "All Columns":
-            # 搜索所有列 (注意：QSortFilterProxyModel的-1模式可能不適用於所有Qt版本)
-            # 我們改為手動實現全欄位搜索
-            self.proxy_model.setFilterKeyColumn(-1)
-        else:
-            try:
-                column_index = self.current_dataset.columns.index(filter_column)
-                self.proxy_model.setFilterKeyColumn(column_index)
-            except (ValueError, AttributeError):
-                # 如果找不到列或current_dataset不是SqliteTableModel，默認使用第一列
-                self.proxy_model.setFilterKeyColumn(0)
-        
-        # 設置過濾文本
-        self.proxy_model.setFilterFixedString(filter_text)
+        try:
+            ranges = parse_range_filter(self.range_input.text(), self.current_dataset.original_columns)
+        except ValueError as e:
+            self.status_bar.showMessage(str(e))
+            return
+
+        # 過濾在 SQL 中執行，行數來自 COUNT(*)
+        self.current_dataset.set_filter(
+            filter_text, None if filter_column == "All Columns" else filter_column, ranges
+        )
         
         # 更新狀態欄以顯示過濾後的記錄數
-        filtered_count = self.proxy_model.rowCount()
+        filtered_count = self.current_dataset.visible_rows
         total_count = self.current_dataset.total_rows
-        self.status_bar.showMessage(f"Showing {filtered_count}/{total_count} rows | Filter: {filter_column} - '{filter_text}'")
+        range_text = self.range_input.text().strip()
+        self.status_bar.showMessage(
+            f"Showing {filtered_count}/{total_count} rows | Filter: {filter_column} - '{filter_text}'"
+            + (f" | {range_text}" if range_text else "")
+        )
+
+        # 圖表跟隨過濾結果更新（摘要以 SQL 聚合計算）；不在圖表頁時等切換時再畫
+        if self.tab_widget.currentWidget() is self.chart_widget:
+            self.update_chart()
     
     def reset_to_normal_search(self):
         """Reset to normal search mode"""
@@ -1337,6 +1532,16 @@ class MainWindow(QMainWindow):
         if current_text == "語意搜索結果":
             self.filter_column.setCurrentText("All Columns")
 
+    def chart_summary(self):
+        """目前數據集的圖表摘要：未過濾時讀欄位目錄中預先計算的結果，否則用 SQL 聚合"""
+        model = self.current_dataset
+        if self.current_location is not None and not model.has_filter():
+            datasets_dir, partition, dataset_id = self.current_location
+            summary = get_catalog(datasets_dir).dataset_stats(dataset_id, partition=partition)
+            if summary is not None:
+                return summary
+        return model.summary()
+
     def update_chart(self):
         if self.current_dataset is None:
             return
@@ -1346,75 +1551,43 @@ class MainWindow(QMainWindow):
         ax = self.canvas.figure.add_subplot(111)
         
         chart_type = self.chart_type.currentText()
-        model = self.current_dataset
         
         # 增加字體大小使圖表更清晰
         plt.rcParams.update({'font.size': 12})
         
         try:
-            cursor = model.conn.cursor()
+            summary = self.chart_summary()
+            suffix = " (filtered)" if self.current_dataset.has_filter() else ""
             
             if chart_type == "Coverage Distribution":
-                # 使用SQL查詢獲取Coverage數據
-                cursor.execute("""
-                    SELECT CAST(REPLACE(Coverage, '%', '') AS FLOAT) as coverage_value 
-                    FROM dataset
-                    WHERE Coverage IS NOT NULL
-                """)
-                coverage_values = [row[0] for row in cursor.fetchall()]
-                
-                if coverage_values:
-                    # 創建直方圖
-                    ax.hist(coverage_values, bins=10, color='skyblue', edgecolor='black')
-                    ax.set_title('Coverage Distribution')
+                coverage = summary["metrics"]["Coverage"]
+                if coverage["count"]:
+                    # 直方圖的分箱已預先計算，最後一箱包含 100%
+                    edges = coverage["edges"]
+                    widths = [b - a for a, b in zip(edges, edges[1:])] + [100 - edges[-1]]
+                    ax.bar(edges, coverage["counts"], width=widths, align='edge',
+                           color='skyblue', edgecolor='black')
+                    median = coverage["quantiles"]["p50"]
+                    ax.axvline(median, color='red', linestyle='--', label=f'Median {median:g}%')
+                    ax.legend()
+                    ax.set_title('Coverage Distribution' + suffix)
                     ax.set_xlabel('Coverage (%)')
                     ax.set_ylabel('Field Count')
                 
-            elif chart_type == "Users":
-                # 獲取前15個最多使用者的記錄
-                cursor.execute("""
-                    SELECT Field, Users 
-                    FROM dataset 
-                    ORDER BY CAST(Users AS INTEGER) DESC 
-                    LIMIT 15
-                """)
-                results = cursor.fetchall()
+            elif chart_type in ("Users", "Alphas"):
+                # 前 15 個欄位已在摘要中排好序
+                results = summary["top"][chart_type]
                 
                 if results:
                     fields = [row[0] for row in results]
-                    users = [row[1] for row in results]
+                    values = [row[1] for row in results]
                     
                     # 繪製條形圖
-                    bars = ax.barh(fields, users, color='lightgreen')
-                    ax.set_title('Top 15 Fields by Users')
-                    ax.set_xlabel('Users')
-                    ax.set_ylabel('Field')
-                    ax.invert_yaxis()  # 反轉Y軸使最大值在頂部
-                    
-                    # 為條形圖添加數值標籤
-                    for bar in bars:
-                        width = bar.get_width()
-                        ax.text(width, bar.get_y() + bar.get_height()/2, 
-                               f' {int(width)}', va='center')
-                
-            elif chart_type == "Alphas":
-                # 獲取前15個最多Alpha的記錄
-                cursor.execute("""
-                    SELECT Field, Alphas 
-                    FROM dataset 
-                    ORDER BY CAST(Alphas AS INTEGER) DESC 
-                    LIMIT 15
-                """)
-                results = cursor.fetchall()
-                
-                if results:
-                    fields = [row[0] for row in results]
-                    alphas = [row[1] for row in results]
-                    
-                    # 繪製條形圖
-                    bars = ax.barh(fields, alphas, color='coral')
-                    ax.set_title('Top 15 Fields by Alphas')
-                    ax.set_xlabel('Alphas')
+                    color = 'lightgreen' if chart_type == "Users" else 'coral'
+                    bars = ax.barh(fields, values, color=color)
+                    median = summary["metrics"][chart_type]["quantiles"]["p50"]
+                    ax.set_title(f'Top 15 Fields by {chart_type}{suffix} (median {median:g})')
+                    ax.set_xlabel(chart_type)
                     ax.set_ylabel('Field')
                     ax.invert_yaxis()  # 反轉Y軸使最大值在頂部
                     
@@ -1425,23 +1598,12 @@ class MainWindow(QMainWindow):
                                f' {int(width)}', va='center')
                 
             elif chart_type == "Type Distribution":
-                # 計算每種類型的數量
-                cursor.execute("""
-                    SELECT Type, COUNT(*) as count 
-                    FROM dataset 
-                    GROUP BY Type
-                    ORDER BY count DESC
-                """)
-                results = cursor.fetchall()
+                results = summary["types"]
                 
                 if results:
                     types = [row[0] for row in results]
                     counts = [row[1] for row in results]
                     
-                    # 計算百分比
-                    total = sum(counts)
-                    percentages = [count/total*100 for count in counts]
-                    
                     # 繪製餅圖
                     wedges, texts, autotexts = ax.pie(
                         counts, 
@@ -1452,7 +1614,7 @@ class MainWindow(QMainWindow):
                         colors=plt.cm.Paired.colors,
                         wedgeprops={'edgecolor': 'white', 'linewidth': 1}
                     )
-                    ax.set_title('Field Type Distribution')
+                    ax.set_title('Field Type Distribution' + suffix)
                     ax.axis('equal')
                     
                     # 增加餅圖標籤的可讀性
@@ -1597,7 +1759,7 @@ class MainWindow(QMainWindow):
             if source_index.isValid():
                 source_row = source_index.row()
                 valid_source_rows.append(source_row) # 記錄有效的源行
-                if source_row in source_model.checked_rows:
+                if source_model.rowid_at(source_row) in source_model.checked_rows:
                     some_checked = True
                 else:
                     all_checked = False
@@ -1645,10 +1807,11 @@ class MainWindow(QMainWindow):
             source_index = self.proxy_model.mapToSource(self.proxy_model.index(view_row, 0))
             if source_index.isValid():
                 source_row = source_index.row()
+                rowid = source_model.rowid_at(source_row)
                 if check:
-                    source_model.checked_rows.add(source_row)
+                    source_model.checked_rows.add(rowid)
                 else:
-                    source_model.checked_rows.discard(source_row)
+                    source_model.checked_rows.discard(rowid)
                 min_row = min(min_row, source_row)
                 max_row = max(max_row, source_row)
 
@@ -1698,12 +1861,45 @@ class MainWindow(QMainWindow):
         else:
             QMessageBox.warning(self, "Warning", "No fields checked")
 
+    def pick_diverse_fields(self):
+        """Check N diverse fields of the current dataset (or of the checked ones)"""
+        if not self.current_dataset:
+            return
+        if self.current_location is None:
+            QMessageBox.information(self, "Pick Diverse Fields", "This file is not in the field catalog.")
+            return
+        # 有勾選時只在勾選的字段中挑選
+        fields = self.current_dataset.get_checked_fields() or None
+        default = min(DIVERSE_FIELDS_COUNT, len(fields)) if fields else DIVERSE_FIELDS_COUNT
+        n, ok = QInputDialog.getInt(self, "Pick Diverse Fields", "Number of fields:", default, 1, 100000)
+        if not ok:
+            return
+
+        self.search_progress.setVisible(True)
+        self.diverse_button.setEnabled(False)
+        self.diverse_worker = DiverseFieldsWorker(n, self.current_location, fields)
+        self.diverse_worker.finished.connect(self.on_diverse_fields_finished)
+        self.diverse_worker.error.connect(self.on_diverse_fields_error)
+        self.diverse_worker.start()
+        self.status_bar.showMessage(f"Picking {n} diverse fields...")
+
+    def on_diverse_fields_finished(self, fields):
+        self.search_progress.setVisible(False)
+        self.diverse_button.setEnabled(True)
+        # 挑選期間換了數據集時不套用
+        if not self.current_dataset or self.diverse_worker.location != self.current_location:
+            return
+        self.current_dataset.set_checked_fields(fields)
+        self.status_bar.showMessage(f"Checked {len(fields)} diverse fields (one per cluster of similar fields)")
+
+    def on_diverse_fields_error(self, error_message):
+        self.search_progress.setVisible(False)
+        self.diverse_button.setEnabled(True)
+        QMessageBox.critical(self, "Pick Diverse Fields", error_message)
+        self.status_bar.showMessage("Picking diverse fields failed")
+
     def perform_semantic_search(self):
         """Perform semantic search"""
-        if not GEMINI_AVAILABLE:
-            QMessageBox.warning(self, "Warning", "Semantic search unavailable. Check GEMINI_API_KEY.")
-            return
-            
         if not self.current_dataset:
             QMessageBox.warning(self, "Warning", "Please load a dataset first")
             return
@@ -1738,7 +1934,7 @@ class MainWindow(QMainWindow):
         self.is_semantic_search_active = True
         
         # 創建並啟動工作線程
-        self.semantic_search_worker = SemanticSearchWorker(query, field_data)
+        self.semantic_search_worker = SemanticSearchWorker(query, field_data, self.current_location)
         self.semantic_search_worker.finished.connect(self.on_semantic_search_finished)
         self.semantic_search_worker.error.connect(self.on_semantic_search_error)
         self.semantic_search_worker.start()
@@ -1786,6 +1982,9 @@ class MainWindow(QMainWindow):
         if not self.proxy_model or not self.current_dataset:
             print("代理模型或當前數據集為空，無法應用過濾")
             return
+
+        # 搜索框內容是 AI 查詢，不作為文字過濾；數值範圍保留
+        self.current_dataset.set_filter("", None, self.current_dataset.filter_ranges)
         
         print(f"當前數據集總行數: {self.current_dataset.total_rows}")
         print(f"當前數據集列: {self.current_dataset.original_columns}")
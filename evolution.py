@@ -30,6 +30,9 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import Qt, Signal, Slot, QThread, QObject
 from PySide6.QtGui import QFont, QColor
 
+from alpha_registry import template_id_for_code
+from fastexpr import canonical_hash
+
 # ---------------------------------------------------------------------------
 # Pure evolution engine  (zero Qt dependencies)
 # ---------------------------------------------------------------------------
@@ -375,6 +378,11 @@ class EvolutionEngine:
             if key not in seen:
                 seen.add(key)
                 code = render_candidate(self.template, candidate)
+                # Different placeholder values can render the same expression.
+                canonical = canonical_hash(code)
+                if canonical in seen:
+                    continue
+                seen.add(canonical)
                 results.append((score, candidate, code))
         return results
 
@@ -912,6 +920,7 @@ class EvolutionWidget(QWidget):
     def send_to_simulation(self):
         """Collect checked candidates and emit as strategy dicts."""
         settings = self.settings_widget.get_settings()
+        template_id = template_id_for_code(self.template_editor.get_current_template() or "")
 
         strategies = []
         for row in range(self._results_table.rowCount()):
@@ -921,7 +930,8 @@ class EvolutionWidget(QWidget):
                 if cb and cb.isChecked():
                     code_item = self._results_table.item(row, 4)
                     if code_item:
-                        strategy = settings.copy()
+                        # Placeholder values and template_id let an early-stop policy group the batch.
+                        strategy = {**(code_item.data(Qt.UserRole) or {}), **settings, "template_id": template_id}
                         strategy["code"] = code_item.text().strip()
                         strategies.append(strategy)
 
@@ -1114,9 +1124,11 @@ class EvolutionWidget(QWidget):
             return
 
         settings = self.settings_widget.get_settings()
+        template_id = template_id_for_code(self.template_editor.get_current_template() or "")
         strategies = []
-        for _score, _candidate, code in candidates:
-            strategy = settings.copy()
+        for _score, candidate, code in candidates:
+            # Placeholder values and template_id let an early-stop policy group the batch.
+            strategy = {**candidate, **settings, "template_id": template_id}
             strategy["code"] = code.strip()
             strategies.append(strategy)
 
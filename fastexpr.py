@@ -0,0 +1,305 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Parse FASTEXPR alpha code into a canonical form.
+
+``canonical_code`` turns semantically identical expressions into the same
+text, so the registry can recognise an alpha it has already simulated:
+
+- Infix operators become their named operators (``a + b`` -> ``add(a,b)``,
+  ``a > b`` -> ``less(b,a)``, ``c ? a : b`` -> ``if_else(c,a,b)``).
+- Arguments of commutative operators are flattened and sorted.
+- Numbers, booleans and strings are written one way (``1.50`` -> ``1.5``,
+  ``False`` -> ``false``, ``'x'`` -> ``"x"``).
+- Variables are inlined, so dead assignments and variable names disappear.
+- Parentheses, whitespace and ``#`` comments do not matter.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+from typing import Dict, List, Optional, Tuple, Union
+
+Node = Tuple[Union[str, tuple], ...]
+
+_TOKEN = re.compile(
+    r"""
+    (?P<space>\s+|\#[^\n]*)
+    |(?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+    |(?P<name>[A-Za-z_][A-Za-z0-9_.]*)
+    |(?P<string>"[^"]*"|'[^']*'|“[^”]*”)
+    |(?P<op>&&|\|\||==|!=|<=|>=|[-+*/^<>!?:(),=;])
+    """,
+    re.VERBOSE,
+)
+_BINARY_LEVELS: List[Dict[str, str]] = [
+    {"||": "or"},
+    {"&&": "and"},
+    {"==": "equal", "!=": "not_equal"},
+    {"<": "less", "<=": "less_equal", ">": "greater", ">=": "greater_equal"},
+    {"+": "add", "-": "subtract"},
+    {"*": "multiply", "/": "divide"},
+]
+# Bump when the canonical form changes; registries then recompute their hashes.
+CANONICAL_VERSION = 2
+# Inlining variables can grow code exponentially (a2 = a1 + a1; a3 = a2 + a2; ...);
+# past this many nodes the canonical form is not computed.
+MAX_EXPANDED_NODES = 100_000
+COMMUTATIVE_OPERATORS = frozenset({"add", "multiply", "max", "min", "and", "or", "equal", "not_equal"})
+# a > b is b < a; only the ``less`` spelling is kept.
+_MIRRORED_OPERATORS = {"greater": "less", "greater_equal": "less_equal"}
+
+
+class FastExprError(ValueError):
+    """Raised when alpha code is not valid FASTEXPR."""
+
+
+def _tokenize(code: str) -> List[Tuple[str, str]]:
+    tokens: List[Tuple[str, str]] = []
+    position = 0
+    while position < len(code):
+        match = _TOKEN.match(code, position)
+        if match is None:
+            raise FastExprError(f"Unexpected character {code[position]!r} at offset {position}.")
+        position = match.end()
+        if match.lastgroup != "space":
+            tokens.append((match.lastgroup, match.group()))
+    tokens.append(("end", ""))
+    return tokens
+
+
+def _number(text: str) -> Node:
+    value = float(text)
+    if value.is_integer() and abs(value) < 1e15:
+        return ("num", str(int(value)))
+    return ("num", repr(value))
+
+
+class _Parser:
+    """Recursive-descent parser over ``_tokenize`` output; produces raw AST tuples."""
+
+    def __init__(self, code: str):
+        self.tokens = _tokenize(code)
+        self.index = 0
+
+    def peek(self, offset: int = 0) -> Tuple[str, str]:
+        return self.tokens[min(self.index + offset, len(self.tokens) - 1)]
+
+    def take(self, text: Optional[str] = None) -> Tuple[str, str]:
+        token = self.peek()
+        if text is not None and token[1] != text:
+            raise FastExprError(f"Expected {text!r} but found {token[1] or 'end of code'!r}.")
+        self.index += 1
+        return token
+
+    def program(self) -> Tuple[List[Tuple[str, Node]], Node]:
+        assignments: List[Tuple[str, Node]] = []
+        result: Optional[Node] = None
+        while self.peek()[0] != "end":
+            if self.peek()[1] == ";":
+                self.take()
+                continue
+            if self.peek()[0] == "name" and self.peek(1)[1] == "=":
+                name = self.take()[1]
+                self.take("=")
+                assignments.append((name, self.expression()))
+                result = None
+            else:
+                result = self.expression()
+            if self.peek()[0] != "end":
+                self.take(";")
+        if result is None:
+            if not assignments:
+                raise FastExprError("Alpha code is empty.")
+            # A trailing assignment is the alpha's value, as in the WQ editor.
+            result = ("name", assignments[-1][0])
+        return assignments, result
+
+    def expression(self) -> Node:
+        condition = self.binary(0)
+        if self.peek()[1] == "?":
+            self.take()
+            when_true = self.expression()
+            self.take(":")
+            when_false = self.expression()
+            return ("call", "if_else", (condition, when_true, when_false), ())
+        return condition
+
+    def binary(self, level: int) -> Node:
+        if level == len(_BINARY_LEVELS):
+            return self.unary()
+        node = self.binary(level + 1)
+        operators = _BINARY_LEVELS[level]
+        while self.peek()[0] == "op" and self.peek()[1] in operators:
+            name = operators[self.take()[1]]
+            node = ("call", name, (node, self.binary(level + 1)), ())
+        return node
+
+    def unary(self) -> Node:
+        text = self.peek()[1]
+        if self.peek()[0] == "op" and text in ("-", "+", "!"):
+            self.take()
+            operand = self.unary()
+            if text == "+":
+                return operand
+            return ("call", "reverse" if text == "-" else "not", (operand,), ())
+        return self.power()
+
+    def power(self) -> Node:
+        # ``^`` binds tighter than a sign (-a^2 is -(a^2)) and is right-associative.
+        base = self.primary()
+        if self.peek()[1] == "^":
+            self.take()
+            return ("call", "power", (base, self.unary()), ())
+        return base
+
+    def primary(self) -> Node:
+        kind, text = self.take()
+        if kind == "number":
+            return _number(text)
+        if kind == "string":
+            return ("str", text[1:-1])
+        if kind == "op" and text == "(":
+            node = self.expression()
+            self.take(")")
+            return node
+        if kind != "name":
+            raise FastExprError(f"Unexpected {text or 'end of code'!r}.")
+        if self.peek()[1] != "(":
+            if text.lower() in ("true", "false"):
+                return ("bool", text.lower())
+            return ("name", text)
+        self.take("(")
+        args: List[Node] = []
+        kwargs: List[Tuple[str, Node]] = []
+        while self.peek()[1] != ")":
+            if self.peek()[0] == "name" and self.peek(1)[1] == "=":
+                key = self.take()[1]
+                self.take("=")
+                kwargs.append((key, self.expression()))
+            else:
+                args.append(self.expression())
+            if self.peek()[1] != ")":
+                self.take(",")
+        self.take(")")
+        return ("call", text, tuple(args), tuple(kwargs))
+
+
+def _substitute(node: Node, env: Dict[str, Node]) -> Node:
+    kind = node[0]
+    if kind == "name":
+        return env.get(node[1], node)
+    if kind == "call":
+        return (
+            "call",
+            node[1],
+            tuple(_substitute(arg, env) for arg in node[2]),
+            tuple((key, _substitute(value, env)) for key, value in node[3]),
+        )
+    return node
+
+
+# Variables are inlined by sharing subtrees, so the expanded tree is a DAG;
+# the walks below memoize by node identity to visit each shared node once.
+
+def _expanded_size(node: Node, memo: Dict[int, int]) -> int:
+    size = memo.get(id(node))
+    if size is None:
+        size = 1
+        if node[0] == "call":
+            size += sum(_expanded_size(arg, memo) for arg in node[2])
+            size += sum(_expanded_size(value, memo) for _, value in node[3])
+        memo[id(node)] = size
+    return size
+
+
+def _canonical(node: Node, memo: Optional[Dict[int, Tuple[Node, Node]]] = None, texts: Optional[Dict[int, str]] = None) -> Node:
+    if node[0] != "call":
+        return node
+    memo = {} if memo is None else memo
+    texts = {} if texts is None else texts
+    done = memo.get(id(node))
+    if done is not None:
+        return done[1]
+    name = node[1]
+    args = [_canonical(arg, memo, texts) for arg in node[2]]
+    kwargs = tuple(sorted((key, _canonical(value, memo, texts)) for key, value in node[3]))
+    result: Optional[Node] = None
+    if name == "reverse" and not kwargs and len(args) == 1:
+        operand = args[0]
+        if operand[0] == "num":
+            result = _number(f"-{operand[1]}") if not operand[1].startswith("-") else _number(operand[1][1:])
+        elif operand[0] == "call" and operand[1] == "reverse" and not operand[3]:
+            result = operand[2][0]
+    if result is None:
+        if name in _MIRRORED_OPERATORS and len(args) == 2 and not kwargs:
+            name, args = _MIRRORED_OPERATORS[name], [args[1], args[0]]
+        if name in COMMUTATIVE_OPERATORS and not kwargs:
+            flat: List[Node] = []
+            for arg in args:
+                if arg[0] == "call" and arg[1] == name and not arg[3] and name not in ("equal", "not_equal"):
+                    flat.extend(arg[2])
+                else:
+                    flat.append(arg)
+            args = sorted(flat, key=lambda arg: render(arg, texts))
+        result = ("call", name, tuple(args), kwargs)
+    # Keeping *node* with its result stops its id from being reused during the walk.
+    memo[id(node)] = (node, result)
+    return result
+
+
+def render(node: Node, memo: Optional[Dict[int, str]] = None) -> str:
+    """Compact text of an AST node (no spaces, double-quoted strings)."""
+    kind = node[0]
+    if kind == "call":
+        memo = {} if memo is None else memo
+        text = memo.get(id(node))
+        if text is None:
+            parts = [render(arg, memo) for arg in node[2]]
+            parts.extend(f"{key}={render(value, memo)}" for key, value in node[3])
+            text = memo[id(node)] = f"{node[1]}({','.join(parts)})"
+        return text
+    if kind == "str":
+        return f'"{node[1]}"'
+    return str(node[1])
+
+
+def parse(code: str) -> Node:
+    """Parse *code* into one expression AST with every variable inlined."""
+    assignments, result = _Parser(str(code or "")).program()
+    env: Dict[str, Node] = {}
+    for name, value in assignments:
+        # Later assignments see earlier ones, including a reassigned name.
+        env[name] = _substitute(value, env)
+    return _substitute(result, env)
+
+
+def canonical_code(code: str) -> str:
+    """
+    Canonical text of *code*; raises ``FastExprError`` when it does not parse
+    or expands to more than ``MAX_EXPANDED_NODES`` nodes.
+
+    >>> canonical_code("-a^2")
+    'reverse(power(a,2))'
+    >>> canonical_code("(-a)^2")
+    'power(reverse(a),2)'
+    >>> canonical_code("a^-b^c")
+    'power(a,reverse(power(b,c)))'
+    >>> canonical_code("b > a + 1")
+    'less(add(1,a),b)'
+    """
+    node = parse(code)
+    if _expanded_size(node, {}) > MAX_EXPANDED_NODES:
+        raise FastExprError(f"Alpha code expands to more than {MAX_EXPANDED_NODES} nodes.")
+    texts: Dict[int, str] = {}
+    return render(_canonical(node, {}, texts), texts)
+
+
+def canonical_hash(code: str) -> str:
+    """SHA-256 of ``canonical_code``; falls back to whitespace-normalized code when parsing fails."""
+    try:
+        text = canonical_code(code)
+    except (FastExprError, RecursionError):
+        text = re.sub(r"\s+", " ", str(code or "").strip())
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
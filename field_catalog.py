@@ -0,0 +1,663 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+SQLite catalog of every field in the ``datasets/*_fields_formatted.csv`` files.
+
+The CSVs stay the source of truth; the catalog mirrors them with typed
+coverage/users/alphas columns and an FTS5 index over field names and
+descriptions.  ``sync`` re-reads only files whose path, mtime or size changed
+and drops datasets whose file is gone, so listing, showing and searching
+fields never has to open the CSVs again.
+
+Field lists are partitioned by simulation setting (region, universe, delay).
+The default partition lives directly in ``datasets/``; every other one in a
+``datasets/<REGION>-<UNIVERSE>-<DELAY>/`` folder.  A field's name,
+description and type are stored once in ``field_text`` however many
+partitions list it; only coverage and usage counts are kept per partition.
+``semantic_search`` ranks fields by meaning with the vector index in
+``field_vectors``; ``diverse_fields`` picks one field per cluster of the
+similarity graph in ``field_graph``.  Each dataset's chart summary (``field_stats``) is
+computed once when its file is indexed and stored with it.
+"""
+
+from __future__ import annotations
+
+import csv
+import datetime
+import hashlib
+import json
+import os
+import re
+import sqlite3
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CLI_STATE_DIR = os.path.join(SCRIPT_DIR, ".brain_cli")
+DEFAULT_CATALOG_PATH = os.path.join(CLI_STATE_DIR, "fields.sqlite")
+DATASETS_DIR = os.path.join(SCRIPT_DIR, "datasets")
+FIELDS_FILE_SUFFIX = "_fields_formatted.csv"
+# Column names of the CSVs (and of ``datasets show`` / the Dataset tab).
+DISPLAY_COLUMNS = ("Field", "Description", "Type", "Coverage", "Users", "Alphas")
+# Trigram tokens make MATCH a case-insensitive substring search, the same
+# semantics the CSV scan had; shorter queries fall back to LIKE.
+FIELD_FTS_TOKENIZER = "trigram"
+FTS_MIN_QUERY_LENGTH = 3
+# The catalog only holds data derived from the CSVs, so a schema change just
+# drops it and re-indexes.
+CATALOG_SCHEMA_VERSION = 3
+# (region, universe, delay); its CSVs sit directly in datasets/.
+DEFAULT_PARTITION = ("USA", "TOP3000", 1)
+_PARTITION_DIR = re.compile(r"^([A-Za-z]+)-([A-Za-z0-9_]+)-(\d+)$")
+
+_CATALOGS: Dict[str, "FieldCatalog"] = {}
+_CATALOGS_LOCK = Lock()
+
+Partition = Tuple[str, str, int]
+
+
+def utc_now() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+
+def dataset_id_from_file(file_name: str) -> Optional[str]:
+    if file_name.endswith(FIELDS_FILE_SUFFIX):
+        return file_name[: -len(FIELDS_FILE_SUFFIX)]
+    return None
+
+
+def partition_key(partition: Partition) -> str:
+    region, universe, delay = partition
+    return f"{region}/{universe}/{delay}"
+
+
+def parse_partition(text: str) -> Partition:
+    """Parse ``REGION/UNIVERSE/DELAY`` (e.g. ``CHN/TOP2000A/1``)."""
+    parts = [part.strip() for part in str(text or "").split("/")]
+    if len(parts) != 3 or not all(parts) or not parts[2].isdigit():
+        raise ValueError(f"Invalid partition {text!r}; expected REGION/UNIVERSE/DELAY, e.g. USA/TOP3000/1.")
+    return (parts[0].upper(), parts[1].upper(), int(parts[2]))
+
+
+def partition_dir(datasets_dir: str, partition: Partition) -> str:
+    """Folder holding the CSVs of *partition*."""
+    if tuple(partition) == DEFAULT_PARTITION:
+        return datasets_dir
+    region, universe, delay = partition
+    return os.path.join(datasets_dir, f"{region}-{universe}-{delay}")
+
+
+def locate_fields_file(csv_path: str) -> Tuple[str, Partition, Optional[str]]:
+    """``(datasets_dir, partition, dataset_id)`` for a fields CSV inside a datasets tree."""
+    folder = os.path.dirname(os.path.abspath(csv_path))
+    dataset_id = dataset_id_from_file(os.path.basename(csv_path))
+    match = _PARTITION_DIR.match(os.path.basename(folder))
+    if match:
+        partition = (match.group(1).upper(), match.group(2).upper(), int(match.group(3)))
+        return os.path.dirname(folder), partition, dataset_id
+    return folder, DEFAULT_PARTITION, dataset_id
+
+
+def _coverage(value: Any) -> Optional[float]:
+    text = str(value or "").strip().rstrip("%").strip()
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def _count(value: Any) -> Optional[int]:
+    try:
+        return int(float(str(value).strip()))
+    except (TypeError, ValueError):
+        return None
+
+
+def format_coverage(value: Optional[float]) -> str:
+    if value is None:
+        return ""
+    return f"{value:g}%"
+
+
+def _read_fields_file(path: str) -> List[Tuple[Any, ...]]:
+    rows = []
+    with open(path, "r", newline="", encoding="utf-8-sig") as fh:
+        for position, row in enumerate(csv.DictReader(fh)):
+            field = (row.get("Field") or "").strip()
+            if not field:
+                continue
+            rows.append((
+                position,
+                field,
+                row.get("Description") or "",
+                row.get("Type") or "",
+                _coverage(row.get("Coverage")),
+                _count(row.get("Users")),
+                _count(row.get("Alphas")),
+            ))
+    return rows
+
+
+def _summary_json(rows: List[Tuple[Any, ...]]) -> Optional[str]:
+    # NumPy is optional for the CLI; without it summaries are filled in on
+    # first use by ``dataset_stats`` once it is available.
+    try:
+        from field_stats import summarize
+    except ImportError:
+        return None
+    return json.dumps(summarize(rows), ensure_ascii=False)
+
+
+def _like_pattern(text: str) -> str:
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _scan_partitions(datasets_dir: str) -> Dict[Tuple[str, str], Tuple[str, int, int]]:
+    """``{(partition key, dataset_id): (path, mtime_ns, size)}`` for every fields CSV."""
+    found: Dict[Tuple[str, str], Tuple[str, int, int]] = {}
+    if not os.path.isdir(datasets_dir):
+        return found
+    folders = [(datasets_dir, DEFAULT_PARTITION)]
+    for entry in os.scandir(datasets_dir):
+        match = _PARTITION_DIR.match(entry.name)
+        if match and entry.is_dir():
+            partition = (match.group(1).upper(), match.group(2).upper(), int(match.group(3)))
+            folders.append((entry.path, partition))
+    for folder, partition in folders:
+        key = partition_key(partition)
+        for entry in os.scandir(folder):
+            dataset_id = dataset_id_from_file(entry.name)
+            if dataset_id and entry.is_file():
+                stat = entry.stat()
+                found[(key, dataset_id)] = (os.path.abspath(entry.path), stat.st_mtime_ns, stat.st_size)
+    return found
+
+
+def _label(partition: str, dataset_id: str) -> str:
+    if partition == partition_key(DEFAULT_PARTITION):
+        return dataset_id
+    return f"{partition}:{dataset_id}"
+
+
+class FieldCatalog:
+    """Field metadata for all local datasets and partitions, kept in step with the CSV files."""
+
+    def __init__(self, db_path: str = DEFAULT_CATALOG_PATH):
+        self.db_path = db_path
+        self.fts_enabled = False
+        self.last_sync: Dict[str, Any] = {}
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._ensure_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _ensure_schema(self) -> None:
+        with self._connect() as conn:
+            if conn.execute("PRAGMA user_version").fetchone()[0] != CATALOG_SCHEMA_VERSION:
+                conn.executescript(
+                    """
+                    DROP TABLE IF EXISTS fields_fts;
+                    DROP TABLE IF EXISTS fields;
+                    DROP TABLE IF EXISTS field_text;
+                    DROP TABLE IF EXISTS dataset_files;
+                    """
+                )
+                conn.execute(f"PRAGMA user_version = {CATALOG_SCHEMA_VERSION}")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS dataset_files (
+                    partition TEXT NOT NULL,
+                    dataset_id TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    size_bytes INTEGER NOT NULL,
+                    rows INTEGER NOT NULL,
+                    indexed_at TEXT NOT NULL,
+                    stats TEXT,
+                    PRIMARY KEY (partition, dataset_id)
+                );
+
+                CREATE TABLE IF NOT EXISTS field_text (
+                    text_id INTEGER PRIMARY KEY,
+                    field TEXT NOT NULL,
+                    description TEXT NOT NULL DEFAULT '',
+                    type TEXT NOT NULL DEFAULT '',
+                    UNIQUE (field, description, type)
+                );
+
+                CREATE TABLE IF NOT EXISTS fields (
+                    field_id INTEGER PRIMARY KEY,
+                    partition TEXT NOT NULL,
+                    dataset_id TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    text_id INTEGER NOT NULL REFERENCES field_text(text_id),
+                    coverage REAL,
+                    users INTEGER,
+                    alphas INTEGER
+                );
+
+                CREATE INDEX IF NOT EXISTS idx_fields_dataset_position
+                    ON fields(partition, dataset_id, position);
+                CREATE INDEX IF NOT EXISTS idx_fields_text ON fields(text_id);
+                """
+            )
+            exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'fields_fts'"
+            ).fetchone()
+            if exists is None:
+                try:
+                    conn.execute(
+                        f"""
+                        CREATE VIRTUAL TABLE fields_fts USING fts5(
+                            field,
+                            description,
+                            content = 'field_text',
+                            content_rowid = 'text_id',
+                            tokenize = '{FIELD_FTS_TOKENIZER}'
+                        )
+                        """
+                    )
+                except sqlite3.OperationalError:
+                    # SQLite without FTS5 or the trigram tokenizer: search uses LIKE.
+                    return
+                conn.execute("INSERT INTO fields_fts (fields_fts) VALUES ('rebuild')")
+            self.fts_enabled = True
+
+    def sync(self, datasets_dir: str = DATASETS_DIR) -> Dict[str, Any]:
+        """Bring the catalog in line with *datasets_dir*, re-reading only changed files."""
+        found = _scan_partitions(datasets_dir)
+        with self._connect() as conn:
+            known = {
+                (row["partition"], row["dataset_id"]): (row["path"], row["mtime_ns"], row["size_bytes"])
+                for row in conn.execute(
+                    "SELECT partition, dataset_id, path, mtime_ns, size_bytes FROM dataset_files"
+                )
+            }
+        changed = sorted(key for key, state in found.items() if known.get(key) != state)
+        removed = sorted(set(known) - set(found))
+        report = {
+            "datasets": len(found),
+            "added": [_label(*key) for key in changed if key not in known],
+            "updated": [_label(*key) for key in changed if key in known],
+            "removed": [_label(*key) for key in removed],
+            "errors": [],
+        }
+        self.last_sync = report
+        if not changed and not removed:
+            return report
+
+        # Parse outside the write transaction so readers are not blocked.
+        parsed: Dict[Tuple[str, str], List[Tuple[Any, ...]]] = {}
+        stats: Dict[Tuple[str, str], Optional[str]] = {}
+        for key in changed:
+            try:
+                parsed[key] = _read_fields_file(found[key][0])
+            except (OSError, UnicodeDecodeError, csv.Error) as exc:
+                report["errors"].append(f"{_label(*key)}: {exc}")
+                continue
+            stats[key] = _summary_json([(row[1], row[3]) + row[4:] for row in parsed[key]])
+
+        now = utc_now()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for partition, dataset_id in removed + list(parsed):
+                conn.execute(
+                    "DELETE FROM fields WHERE partition = ? AND dataset_id = ?", (partition, dataset_id)
+                )
+                conn.execute(
+                    "DELETE FROM dataset_files WHERE partition = ? AND dataset_id = ?", (partition, dataset_id)
+                )
+            # Text rows created below get ids above this one; shared text that
+            # another partition already indexed is reused, not inserted again.
+            last_text_id = conn.execute("SELECT COALESCE(MAX(text_id), 0) FROM field_text").fetchone()[0]
+            for (partition, dataset_id), rows in parsed.items():
+                conn.executemany(
+                    "INSERT OR IGNORE INTO field_text (field, description, type) VALUES (?, ?, ?)",
+                    [row[1:4] for row in rows],
+                )
+                conn.executemany(
+                    """
+                    INSERT INTO fields (partition, dataset_id, position, text_id, coverage, users, alphas)
+                    SELECT ?, ?, ?, text_id, ?, ?, ? FROM field_text
+                    WHERE field = ? AND description = ? AND type = ?
+                    """,
+                    [(partition, dataset_id, row[0]) + row[4:] + row[1:4] for row in rows],
+                )
+                path, mtime_ns, size_bytes = found[(partition, dataset_id)]
+                conn.execute(
+                    """
+                    INSERT INTO dataset_files
+                        (partition, dataset_id, path, mtime_ns, size_bytes, rows, indexed_at, stats)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (partition, dataset_id, path, mtime_ns, size_bytes, len(rows), now,
+                     stats[(partition, dataset_id)]),
+                )
+            # The FTS index is maintained here in bulk rather than by row
+            # triggers: one INSERT ... SELECT is several times faster.
+            orphan = "NOT EXISTS (SELECT 1 FROM fields f WHERE f.text_id = field_text.text_id)"
+            if self.fts_enabled:
+                conn.execute(
+                    "INSERT INTO fields_fts (rowid, field, description) "
+                    "SELECT text_id, field, description FROM field_text WHERE text_id > ?",
+                    (last_text_id,),
+                )
+                conn.execute(
+                    "INSERT INTO fields_fts (fields_fts, rowid, field, description) "
+                    f"SELECT 'delete', text_id, field, description FROM field_text WHERE {orphan}"
+                )
+            conn.execute(f"DELETE FROM field_text WHERE {orphan}")
+            conn.commit()
+        finally:
+            conn.close()
+        return report
+
+    @staticmethod
+    def _partition_clause(partition: Optional[Partition], values: List[Any], column: str) -> str:
+        if partition is None:
+            return ""
+        values.append(partition_key(partition))
+        return f" AND {column} = ?"
+
+    def list_datasets(self, partition: Optional[Partition] = None) -> List[Dict[str, Any]]:
+        values: List[Any] = []
+        clause = self._partition_clause(partition, values, "partition")
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT partition, dataset_id, path, rows, size_bytes, indexed_at FROM dataset_files "
+                f"WHERE 1 = 1{clause} ORDER BY partition, dataset_id",
+                values,
+            ).fetchall()
+        return [
+            {
+                "partition": row["partition"],
+                "dataset_id": row["dataset_id"],
+                "file": os.path.basename(row["path"]),
+                "rows": row["rows"],
+                "size_bytes": row["size_bytes"],
+                "indexed_at": row["indexed_at"],
+            }
+            for row in rows
+        ]
+
+    def partitions(self) -> List[Dict[str, Any]]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT partition, COUNT(*) AS datasets, SUM(rows) AS fields FROM dataset_files "
+                "GROUP BY partition ORDER BY partition"
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def summary(self) -> Dict[str, int]:
+        with self._connect() as conn:
+            datasets, fields = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(rows), 0) FROM dataset_files"
+            ).fetchone()
+            partitions = conn.execute("SELECT COUNT(DISTINCT partition) FROM dataset_files").fetchone()[0]
+            unique_text = conn.execute("SELECT COUNT(*) FROM field_text").fetchone()[0]
+        return {"partitions": partitions, "datasets": datasets, "fields": fields, "unique_fields": unique_text}
+
+    def has_dataset(self, dataset_id: str, partition: Partition = DEFAULT_PARTITION) -> bool:
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT 1 FROM dataset_files WHERE partition = ? AND dataset_id = ?",
+                (partition_key(partition), dataset_id),
+            ).fetchone() is not None
+
+    def dataset_stats(self, dataset_id: str, partition: Partition = DEFAULT_PARTITION) -> Optional[Dict[str, Any]]:
+        """
+        Stored chart summary of one dataset (see ``field_stats.summarize``).
+
+        ``None`` if the dataset is not indexed, or its summary is missing and
+        NumPy is not installed to compute it.
+        """
+        key = (partition_key(partition), dataset_id)
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT stats FROM dataset_files WHERE partition = ? AND dataset_id = ?", key
+            ).fetchone()
+            if row is None:
+                return None
+            if row["stats"] is None:
+                text = _summary_json(conn.execute(
+                    """
+                    SELECT t.field, t.type, f.coverage, f.users, f.alphas
+                    FROM fields f JOIN field_text t ON t.text_id = f.text_id
+                    WHERE f.partition = ? AND f.dataset_id = ?
+                    ORDER BY f.position
+                    """,
+                    key,
+                ).fetchall())
+                if text is None:
+                    return None
+                conn.execute(
+                    "UPDATE dataset_files SET stats = ? WHERE partition = ? AND dataset_id = ?", (text,) + key
+                )
+                return json.loads(text)
+        return json.loads(row["stats"])
+
+    def fields(
+        self,
+        dataset_id: str,
+        limit: Optional[int] = None,
+        partition: Partition = DEFAULT_PARTITION,
+    ) -> List[Dict[str, Any]]:
+        """Fields of one dataset in file order, keyed by ``DISPLAY_COLUMNS``."""
+        sql = (
+            "SELECT t.field, t.description, t.type, f.coverage, f.users, f.alphas "
+            "FROM fields f JOIN field_text t ON t.text_id = f.text_id "
+            "WHERE f.partition = ? AND f.dataset_id = ? ORDER BY f.position"
+        )
+        values: List[Any] = [partition_key(partition), dataset_id]
+        if limit is not None:
+            sql += " LIMIT ?"
+            values.append(int(limit))
+        with self._connect() as conn:
+            rows = conn.execute(sql, values).fetchall()
+        return [
+            dict(zip(DISPLAY_COLUMNS, (
+                row["field"], row["description"], row["type"],
+                format_coverage(row["coverage"]), row["users"], row["alphas"],
+            )))
+            for row in rows
+        ]
+
+    def search(
+        self,
+        query: str,
+        *,
+        dataset_id: Optional[str] = None,
+        partition: Optional[Partition] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Fields whose name or description contains *query* (case-insensitive)."""
+        text = str(query or "").strip()
+        if self.fts_enabled and len(text) >= FTS_MIN_QUERY_LENGTH:
+            sql = (
+                "SELECT f.*, t.field, t.description, t.type FROM fields_fts "
+                "JOIN field_text t ON t.text_id = fields_fts.rowid "
+                "JOIN fields f ON f.text_id = t.text_id "
+                "WHERE fields_fts MATCH ?"
+            )
+            values: List[Any] = ['"' + text.replace('"', '""') + '"']
+        else:
+            sql = (
+                "SELECT f.*, t.field, t.description, t.type FROM field_text t "
+                "JOIN fields f ON f.text_id = t.text_id "
+                "WHERE (t.field LIKE ? ESCAPE '\\' OR t.description LIKE ? ESCAPE '\\')"
+            )
+            values = [_like_pattern(text)] * 2
+        if dataset_id:
+            sql += " AND f.dataset_id = ?"
+            values.append(dataset_id)
+        sql += self._partition_clause(partition, values, "f.partition")
+        sql += " ORDER BY f.partition, f.dataset_id, f.position"
+        if limit is not None:
+            sql += " LIMIT ?"
+            values.append(int(limit))
+        with self._connect() as conn:
+            rows = conn.execute(sql, values).fetchall()
+        return [self._search_row(row) for row in rows]
+
+    def text_signature(self) -> str:
+        """Changes whenever ``field_text`` gains, loses or rewrites a row."""
+        with self._connect() as conn:
+            count, max_id, id_sum, length = conn.execute(
+                "SELECT COUNT(*), COALESCE(MAX(text_id), 0), COALESCE(SUM(text_id), 0), "
+                "COALESCE(SUM(LENGTH(field) + LENGTH(description)), 0) FROM field_text"
+            ).fetchone()
+        return f"{count}-{max_id}-{id_sum}-{length}"
+
+    def iter_texts(self) -> List[Tuple[int, str, str]]:
+        """``(text_id, field, description)`` of every unique field, by text_id."""
+        with self._connect() as conn:
+            return [
+                tuple(row)
+                for row in conn.execute("SELECT text_id, field, description FROM field_text ORDER BY text_id")
+            ]
+
+    def text_datasets(self) -> Dict[int, str]:
+        """text_id -> the first dataset ID (alphabetically) that lists it."""
+        with self._connect() as conn:
+            return {
+                row[0]: row[1]
+                for row in conn.execute("SELECT text_id, MIN(dataset_id) FROM fields GROUP BY text_id")
+            }
+
+    def diverse_fields(
+        self,
+        n: int,
+        *,
+        dataset_id: Optional[str] = None,
+        partition: Optional[Partition] = None,
+        fields: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Up to *n* fields, one per similarity cluster (see ``field_graph``).
+
+        Each cluster is represented by its field with the highest coverage,
+        then users + alphas; representatives are ranked the same way and carry
+        ``cluster`` and ``cluster_size`` (fields of that cluster in scope).
+        The scope is narrowed by *dataset_id*, *partition* and a list of field
+        names.  The graph is built on the first call after the text changes
+        (requires NumPy).
+        """
+        from field_graph import load_graph, pick_diverse
+
+        graph = load_graph(self)
+        sql = (
+            "SELECT f.*, t.field, t.description, t.type FROM fields f "
+            "JOIN field_text t ON t.text_id = f.text_id WHERE 1 = 1"
+        )
+        values: List[Any] = []
+        if dataset_id:
+            sql += " AND f.dataset_id = ?"
+            values.append(dataset_id)
+        sql += self._partition_clause(partition, values, "f.partition")
+        sql += " ORDER BY f.partition, f.dataset_id, f.position"
+        wanted = None if fields is None else set(fields)
+        with self._connect() as conn:
+            rows = [row for row in conn.execute(sql, values) if wanted is None or row["field"] in wanted]
+        picked = pick_diverse(
+            [{"row": row, "coverage": row["coverage"], "users": row["users"], "alphas": row["alphas"]}
+             for row in rows],
+            graph.clusters_of([row["text_id"] for row in rows]),
+            n,
+        )
+        return [
+            dict(self._search_row(item["row"]), cluster=item["cluster"], cluster_size=item["cluster_size"])
+            for item in picked
+        ]
+
+    def semantic_search(
+        self,
+        query: str,
+        *,
+        dataset_id: Optional[str] = None,
+        partition: Optional[Partition] = None,
+        limit: int = 20,
+    ) -> List[Dict[str, Any]]:
+        """
+        Fields closest in meaning to *query*, best first, with a ``score`` (cosine, 0..1).
+
+        Uses the vector index from ``field_vectors`` (requires NumPy); the
+        index is built on the first call after the catalog's text changes.
+        """
+        from field_vectors import load_index
+
+        index = load_index(self)
+        filters = ""
+        values: List[Any] = []
+        if dataset_id:
+            filters += " AND f.dataset_id = ?"
+            values.append(dataset_id)
+        filters += self._partition_clause(partition, values, "f.partition")
+        allowed = None
+        with self._connect() as conn:
+            if filters:
+                allowed = [
+                    row[0] for row in conn.execute(
+                        f"SELECT DISTINCT f.text_id FROM fields f WHERE 1 = 1{filters}", values
+                    )
+                ]
+            best = index.top(query, limit, allowed_text_ids=allowed)
+            if not best:
+                return []
+            scores = dict(best)
+            placeholders = ",".join("?" * len(scores))
+            rows = conn.execute(
+                "SELECT f.*, t.field, t.description, t.type FROM fields f "
+                "JOIN field_text t ON t.text_id = f.text_id "
+                f"WHERE f.text_id IN ({placeholders}){filters} "
+                "ORDER BY f.partition, f.dataset_id, f.position",
+                [*scores, *values],
+            ).fetchall()
+        results = [dict(self._search_row(row), score=round(scores[row["text_id"]], 4)) for row in rows]
+        results.sort(key=lambda row: -row["score"])
+        return results[:limit]
+
+    @staticmethod
+    def _search_row(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "partition": row["partition"],
+            "dataset_id": row["dataset_id"],
+            "field": row["field"],
+            "description": row["description"],
+            "type": row["type"],
+            "coverage": format_coverage(row["coverage"]),
+            "users": row["users"],
+            "alphas": row["alphas"],
+        }
+
+
+def catalog_path(datasets_dir: str = DATASETS_DIR) -> str:
+    """
+    Catalog file for *datasets_dir*.
+
+    ``datasets/`` uses the configured path; any other tree gets its own file
+    next to it, suffixed with a digest of the absolute directory, so syncing
+    it never replaces the default catalog's contents.
+    """
+    db_path = os.environ.get("BRAIN_FIELD_CATALOG_PATH", DEFAULT_CATALOG_PATH)
+    directory = os.path.abspath(datasets_dir)
+    if directory == os.path.abspath(DATASETS_DIR):
+        return db_path
+    root, ext = os.path.splitext(db_path)
+    return f"{root}-{hashlib.sha1(directory.encode('utf-8')).hexdigest()[:12]}{ext}"
+
+
+def get_catalog(datasets_dir: str = DATASETS_DIR) -> FieldCatalog:
+    """Shared catalog for *datasets_dir*, synced with it before it is returned."""
+    db_path = catalog_path(datasets_dir)
+    with _CATALOGS_LOCK:
+        catalog = _CATALOGS.get(db_path)
+        if catalog is None:
+            catalog = _CATALOGS[db_path] = FieldCatalog(db_path)
+    catalog.sync(datasets_dir)
+    return catalog
@@ -0,0 +1,304 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Field similarity graph and clusters for picking diverse fields.
+
+Two unique fields (``field_text`` rows) are linked when their similarity,
+a weighted sum of
+
+* the cosine of their TF-IDF vectors from ``field_vectors`` (name and
+  description words, word pairs and character trigrams),
+* how much their names share once digits and the dataset prefix are
+  dropped (``anl10_cpsfq1_consensus_2351`` -> ``cpsfq#``, ``consensus``),
+* whether they come from the same dataset family (``analyst10`` and
+  ``analyst44`` are both ``analyst``),
+
+reaches ``EDGE_THRESHOLD``.  Only fields that share a block are compared:
+the same name stem or the same description with the numbers removed.  A
+block is scored with one dense matrix product; blocks larger than
+``BLOCK_MAX`` are ordered by family and cut into chunks, so the cost grows
+with the number of near-duplicates rather than with the square of the field
+count.  Clusters are grown around the best-connected fields
+(``leader_clusters``).
+
+The graph is stored as ``.npy`` files next to the catalog
+(``<catalog>.graph/<signature>/``) and rebuilt when the catalog's text
+changes, like the vector index.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import shutil
+import time
+from threading import Lock
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from field_vectors import load_index
+
+
+# Bump when the similarity or the clustering changes; graphs are then rebuilt.
+GRAPH_VERSION = 1
+TEXT_WEIGHT = 0.6
+NAME_WEIGHT = 0.3
+LINEAGE_WEIGHT = 0.1
+EDGE_THRESHOLD = 0.75
+BLOCK_MAX = 256
+ARRAY_NAMES = ("sources", "targets", "weights", "labels", "text_ids")
+
+_DIGITS = re.compile(r"\d+")
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+# Dataset prefix of a field name once digits are masked: "anl#_", "fnd#_", "pv#_".
+_NAME_PREFIX = re.compile(r"^[a-z]+#_")
+_SPACE = re.compile(r"\s+")
+_GRAPHS: Dict[str, "FieldGraph"] = {}
+_GRAPHS_LOCK = Lock()
+
+
+def name_stem(field: str) -> str:
+    """``anl10_cpsfq1_consensus_2351`` -> ``cpsfq#_consensus_#``."""
+    masked = _DIGITS.sub("#", str(field or "").lower())
+    return _NAME_PREFIX.sub("", masked) or masked
+
+
+def description_shape(description: str) -> str:
+    """Lower-cased description with numbers masked, or ``""`` if it is empty."""
+    return _SPACE.sub(" ", _NUMBER.sub("#", str(description or "").lower())).strip()
+
+
+def dataset_family(dataset_id: str) -> str:
+    """``analyst10`` -> ``analyst``; IDs without a trailing number are their own family."""
+    return re.sub(r"\d+$", "", str(dataset_id or "")) or str(dataset_id or "")
+
+
+def _name_tokens(stem: str) -> frozenset:
+    return frozenset(token for token in stem.replace("#", "").split("_") if token)
+
+
+def _codes(keys: Sequence[str]) -> np.ndarray:
+    return np.unique(np.asarray(keys, dtype=object), return_inverse=True)[1].reshape(-1)
+
+
+def _save_array(directory: str, name: str, array: np.ndarray) -> None:
+    path = os.path.join(directory, f"{name}.npy")
+    partial = f"{path}.partial"
+    with open(partial, "wb") as fh:
+        np.save(fh, array)
+    os.replace(partial, path)
+
+
+class _RowVectors:
+    """Row-major view of a ``FieldVectorIndex`` (which is stored feature-major)."""
+
+    def __init__(self, index):
+        ptr = np.asarray(index.ptr)
+        rows = np.asarray(index.rows)
+        features = np.repeat(np.arange(len(ptr) - 1, dtype=np.int64), np.diff(ptr))
+        order = np.argsort(rows, kind="stable")
+        self.features = features[order]
+        self.weights = np.asarray(index.weights)[order]
+        self.ptr = np.zeros(len(index) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=len(index)), out=self.ptr[1:])
+
+    def similarity(self, members: np.ndarray) -> np.ndarray:
+        """Cosine similarity matrix of the given rows."""
+        starts, ends = self.ptr[members], self.ptr[members + 1]
+        lengths = ends - starts
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        entries = offsets + np.arange(int(lengths.sum()))
+        local_rows = np.repeat(np.arange(len(members)), lengths)
+        columns, local_columns = np.unique(self.features[entries], return_inverse=True)
+        dense = np.zeros((len(members), len(columns)), dtype=np.float32)
+        dense[local_rows, local_columns.reshape(-1)] = self.weights[entries]
+        return dense @ dense.T
+
+
+def _blocks(keys: np.ndarray, families: np.ndarray, valid: np.ndarray) -> List[np.ndarray]:
+    """Rows grouped by *keys* (where *valid*), oversized groups cut into family-ordered chunks."""
+    rows = np.flatnonzero(valid)
+    order = rows[np.lexsort((rows, families[rows], keys[rows]))]
+    cuts = np.flatnonzero(np.diff(keys[order])) + 1
+    blocks: List[np.ndarray] = []
+    for group in np.split(order, cuts):
+        for start in range(0, len(group), BLOCK_MAX):
+            chunk = group[start:start + BLOCK_MAX]
+            if len(chunk) > 1:
+                blocks.append(chunk)
+    return blocks
+
+
+def leader_clusters(count: int, sources: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """
+    Cluster label (the leader's row) of each of *count* nodes.
+
+    The best-connected unassigned node leads a new cluster and takes its
+    unassigned neighbours, so every member is directly similar to its
+    leader; connected components would chain distinct fields that share
+    boilerplate ("value of annual field: ...") into one cluster.
+    """
+    ends = np.concatenate([sources, targets])
+    others = np.concatenate([targets, sources])
+    order = np.argsort(ends, kind="stable")
+    neighbours = others[order]
+    ptr = np.zeros(count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(ends, minlength=count), out=ptr[1:])
+    labels = np.full(count, -1, dtype=np.int64)
+    for node in np.lexsort((np.arange(count), -np.diff(ptr))):
+        if labels[node] >= 0:
+            continue
+        labels[node] = node
+        members = neighbours[ptr[node]:ptr[node + 1]]
+        labels[members[labels[members] < 0]] = node
+    return labels
+
+
+class FieldGraph:
+    """Similarity edges between unique fields and the cluster of every field."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        arrays = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+            for name in ARRAY_NAMES
+        }
+        self.sources = arrays["sources"]
+        self.targets = arrays["targets"]
+        self.weights = arrays["weights"]
+        self.labels = arrays["labels"]
+        self.text_ids = arrays["text_ids"]
+        self.build_seconds: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self.text_ids)
+
+    @classmethod
+    def build(
+        cls,
+        directory: str,
+        index,
+        texts: Sequence[Tuple[int, str, str]],
+        datasets: Dict[int, str],
+    ) -> "FieldGraph":
+        """
+        Write the graph of *texts* (``(text_id, field, description)``, aligned
+        with *index*) to *directory*; *datasets* maps text_id to a dataset ID.
+        """
+        os.makedirs(directory, exist_ok=True)
+        count = len(texts)
+        stems = [name_stem(field) for _, field, _ in texts]
+        shapes = [description_shape(description) for _, _, description in texts]
+        stem_codes = _codes(stems) if count else np.zeros(0, dtype=np.int64)
+        shape_codes = _codes(shapes) if count else np.zeros(0, dtype=np.int64)
+        families = (
+            _codes([dataset_family(datasets.get(text_id, "")) for text_id, _, _ in texts])
+            if count else np.zeros(0, dtype=np.int64)
+        )
+        tokens = [_name_tokens(stem) for stem in stems]
+        vectors = _RowVectors(index)
+
+        found: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        blocks = _blocks(stem_codes, families, np.ones(count, dtype=bool))
+        blocks += _blocks(shape_codes, families, np.asarray([bool(shape) for shape in shapes], dtype=bool))
+        for members in blocks:
+            upper = np.triu_indices(len(members), k=1)
+            cosine = vectors.similarity(members)[upper].astype(np.float64)
+            first, second = members[upper[0]], members[upper[1]]
+            same_family = families[first] == families[second]
+            name = (stem_codes[first] == stem_codes[second]).astype(np.float64)
+            # Token overlap of different stems is only worked out for pairs that could still pass.
+            best_case = TEXT_WEIGHT * cosine + NAME_WEIGHT + LINEAGE_WEIGHT * same_family
+            for i in np.flatnonzero((name < 1) & (best_case >= EDGE_THRESHOLD)):
+                a, b = tokens[first[i]], tokens[second[i]]
+                name[i] = len(a & b) / len(a | b) if a | b else 0.0
+            weight = TEXT_WEIGHT * cosine + NAME_WEIGHT * name + LINEAGE_WEIGHT * same_family
+            keep = weight >= EDGE_THRESHOLD
+            found.append((first[keep], second[keep], weight[keep]))
+
+        # A pair can share both a name block and a description block.
+        sources = np.concatenate([edge[0] for edge in found] + [np.zeros(0, dtype=np.int64)])
+        targets = np.concatenate([edge[1] for edge in found] + [np.zeros(0, dtype=np.int64)])
+        weights = np.concatenate([edge[2] for edge in found] + [np.zeros(0)])
+        low, high = np.minimum(sources, targets), np.maximum(sources, targets)
+        _, unique = np.unique(low * max(count, 1) + high, return_index=True)
+        sources, targets, weights = low[unique], high[unique], weights[unique]
+        _save_array(directory, "sources", sources.astype(np.int32))
+        _save_array(directory, "targets", targets.astype(np.int32))
+        _save_array(directory, "weights", weights.astype(np.float32))
+        _save_array(directory, "labels", leader_clusters(count, sources, targets).astype(np.int32))
+        # text_ids last: its presence marks a complete graph.
+        _save_array(directory, "text_ids", np.asarray([text_id for text_id, _, _ in texts], dtype=np.int64))
+        return cls(directory)
+
+    def clusters_of(self, text_ids: Sequence[int]) -> np.ndarray:
+        """Cluster label of each text_id (``-1 - position`` for ids the graph does not know)."""
+        wanted = np.asarray(text_ids, dtype=np.int64)
+        positions = np.minimum(np.searchsorted(self.text_ids, wanted), max(len(self) - 1, 0))
+        known = (np.asarray(self.text_ids)[positions] == wanted) if len(self) else np.zeros(len(wanted), bool)
+        return np.where(known, np.asarray(self.labels)[positions], -1 - np.arange(len(wanted)))
+
+    def stats(self) -> Dict[str, Any]:
+        sizes = np.bincount(np.asarray(self.labels), minlength=len(self)) if len(self) else np.zeros(0, int)
+        sizes = sizes[sizes > 0]
+        return {
+            "fields": len(self),
+            "edges": len(self.sources),
+            "clusters": int(len(sizes)),
+            "singletons": int(np.count_nonzero(sizes == 1)),
+            "largest_cluster": int(sizes.max()) if len(sizes) else 0,
+        }
+
+
+def graph_directory(catalog_path: str) -> str:
+    return f"{os.path.splitext(catalog_path)[0]}.graph"
+
+
+def load_graph(catalog, rebuild: bool = False) -> FieldGraph:
+    """Similarity graph matching *catalog*'s current field text, built on first use or after a change."""
+    root = graph_directory(catalog.db_path)
+    signature = f"v{GRAPH_VERSION}-{catalog.text_signature()}"
+    directory = os.path.join(root, signature)
+    with _GRAPHS_LOCK:
+        graph = _GRAPHS.get(directory)
+        if graph is not None and not rebuild:
+            return graph
+        if os.path.exists(os.path.join(directory, "text_ids.npy")) and not rebuild:
+            graph = FieldGraph(directory)
+        else:
+            started = time.monotonic()
+            index = load_index(catalog)
+            graph = FieldGraph.build(directory, index, catalog.iter_texts(), catalog.text_datasets())
+            graph.build_seconds = round(time.monotonic() - started, 2)
+            for name in os.listdir(root):
+                if name != signature:
+                    shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+        for stale in [key for key in _GRAPHS if os.path.dirname(key) == root]:
+            del _GRAPHS[stale]
+        _GRAPHS[directory] = graph
+        return graph
+
+
+def pick_diverse(rows: Sequence[Dict[str, Any]], labels: Sequence[int], n: int) -> List[Dict[str, Any]]:
+    """
+    One row per cluster, at most *n*: each cluster is represented by its row
+    with the highest coverage (then users + alphas), and representatives are
+    ranked the same way.  *rows* need ``coverage``, ``users`` and ``alphas``
+    as numbers (or ``None``); the result adds ``cluster`` and ``cluster_size``.
+    """
+    def rank(row: Dict[str, Any]) -> Tuple[float, int]:
+        return (row.get("coverage") or 0.0, (row.get("users") or 0) + (row.get("alphas") or 0))
+
+    best: Dict[int, int] = {}
+    sizes: Dict[int, int] = {}
+    for i, (row, label) in enumerate(zip(rows, labels)):
+        label = int(label)
+        sizes[label] = sizes.get(label, 0) + 1
+        if label not in best or rank(row) > rank(rows[best[label]]):
+            best[label] = i
+    picked = sorted(best.items(), key=lambda item: (tuple(-value for value in rank(rows[item[1]])), item[1]))
+    return [
+        dict(rows[i], cluster=label, cluster_size=sizes[label])
+        for label, i in picked[:max(int(n), 0)]
+    ]
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Distribution summaries of a dataset's fields for the Dataset tab charts.
+
+``summarize`` computes, with NumPy, a histogram and quantiles of Coverage,
+Users and Alphas, the top fields by Users and Alphas and the field-type
+counts.  The field catalog stores it per dataset when a CSV is indexed, so
+drawing an unfiltered chart is a single row read.  ``summarize_sql``
+returns the same structure for a filtered subset using SQL aggregates
+(``GROUP BY`` buckets, indexed ``ORDER BY ... LIMIT``) instead of pulling
+the rows into Python.
+
+Both use the same fixed bin edges and the ``lower`` quantile (the value at
+``floor((n - 1) * q)`` in sorted order), so they agree exactly.
+"""
+
+from __future__ import annotations
+
+import math
+import sqlite3
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+# Left edges of the histogram bins; the last bin is open-ended (Coverage 90-100
+# includes 100, Users and Alphas are heavy-tailed).
+COVERAGE_EDGES = tuple(range(0, 100, 10))
+COUNT_EDGES = (0, 1, 10, 100, 1000, 10000)
+METRIC_EDGES = {"Coverage": COVERAGE_EDGES, "Users": COUNT_EDGES, "Alphas": COUNT_EDGES}
+QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+TOP_METRICS = ("Users", "Alphas")
+TOP_FIELDS = 15
+
+# (field, type, coverage, users, alphas); numeric values may be None.
+SummaryRow = Tuple[str, str, Optional[float], Optional[float], Optional[float]]
+
+
+def _quantile_key(q: float) -> str:
+    return f"p{int(round(q * 100))}"
+
+
+def _metric_summary(values: np.ndarray, edges: Sequence[float]) -> Dict[str, Any]:
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return {"count": 0, "edges": list(edges), "counts": [0] * len(edges)}
+    ordered = np.sort(values)
+    # Values below the first edge (negative counts) go to the first bin, as in SQL.
+    index = np.maximum(np.searchsorted(np.asarray(edges, dtype=float), values, side="right") - 1, 0)
+    return {
+        "count": int(len(values)),
+        "min": float(ordered[0]),
+        "max": float(ordered[-1]),
+        "mean": float(values.mean()),
+        "quantiles": {
+            _quantile_key(q): float(ordered[int(math.floor((len(ordered) - 1) * q))]) for q in QUANTILES
+        },
+        "edges": list(edges),
+        "counts": np.bincount(index, minlength=len(edges)).astype(int).tolist(),
+    }
+
+
+def summarize(rows: Sequence[SummaryRow]) -> Dict[str, Any]:
+    """Chart summary of ``(field, type, coverage, users, alphas)`` rows, in file order."""
+    fields = [row[0] for row in rows]
+    columns = {
+        name: np.array([np.nan if row[i] is None else row[i] for row in rows], dtype=float)
+        for i, name in ((2, "Coverage"), (3, "Users"), (4, "Alphas"))
+    }
+    top: Dict[str, List[List[Any]]] = {}
+    for name in TOP_METRICS:
+        values = columns[name]
+        present = np.flatnonzero(~np.isnan(values))
+        if len(present) > TOP_FIELDS:
+            # Every row tied with the TOP_FIELDS-th value, so ties break by field name as in SQL.
+            cutoff = np.partition(values[present], len(present) - TOP_FIELDS)[len(present) - TOP_FIELDS]
+            present = present[values[present] >= cutoff]
+        best = sorted(present.tolist(), key=lambda i: (-values[i], fields[i]))[:TOP_FIELDS]
+        top[name] = [[fields[i], float(values[i])] for i in best]
+    types, counts = np.unique(np.array([row[1] or "" for row in rows], dtype=object), return_counts=True)
+    type_counts = sorted(zip(types.tolist(), counts.astype(int).tolist()), key=lambda item: (-item[1], item[0]))
+    return {
+        "rows": len(rows),
+        "metrics": {name: _metric_summary(columns[name], METRIC_EDGES[name]) for name in METRIC_EDGES},
+        "top": top,
+        "types": [list(item) for item in type_counts],
+    }
+
+
+def _bin_conditions(column: str, edges: Sequence[float]) -> List[str]:
+    # Matches ``summarize``: below the first edge counts in the first bin, the last bin is open.
+    bounds = list(edges[1:])
+    return [
+        " AND ".join(part for part in (
+            f"{column} >= {low}" if i else f"{column} IS NOT NULL",
+            f"{column} < {high}" if high is not None else "",
+        ) if part)
+        for i, (low, high) in enumerate(zip(edges, bounds + [None]))
+    ]
+
+
+def summarize_sql(conn: sqlite3.Connection, source: str, params: Sequence[Any] = ()) -> Dict[str, Any]:
+    """
+    Same summary as ``summarize`` for the rows of *source*, computed in SQL.
+
+    *source* is a query returning ``Field``, ``Type``, ``Coverage``, ``Users``
+    and ``Alphas`` columns (e.g. a filtered view of a dataset table).  Counts,
+    extremes, means and histograms come from a single scan; each metric's
+    quantiles from one ordered pass.
+    """
+    params = list(params)
+    aggregates = ["COUNT(*)"]
+    for name, edges in METRIC_EDGES.items():
+        column = f'"{name}"'
+        aggregates += [f"COUNT({column})", f"MIN({column})", f"MAX({column})", f"AVG({column})"]
+        aggregates += [f"COALESCE(SUM({condition}), 0)" for condition in _bin_conditions(column, edges)]
+    values = list(conn.execute(f"SELECT {', '.join(aggregates)} FROM ({source})", params).fetchone())
+    rows = values.pop(0)
+    metrics: Dict[str, Any] = {}
+    for name, edges in METRIC_EDGES.items():
+        column = f'"{name}"'
+        count, low, high, mean = values[:4]
+        counts = [int(value) for value in values[4:4 + len(edges)]]
+        del values[:4 + len(edges)]
+        summary: Dict[str, Any] = {"count": count, "edges": list(edges), "counts": counts}
+        if count:
+            offsets = {q: int(math.floor((count - 1) * q)) for q in QUANTILES}
+            wanted = sorted(set(offsets.values()))
+            picked = dict(conn.execute(
+                f"SELECT i, value FROM (SELECT {column} AS value, ROW_NUMBER() OVER (ORDER BY {column}) - 1 AS i "
+                f"FROM ({source}) WHERE {column} IS NOT NULL) WHERE i IN ({', '.join('?' * len(wanted))})",
+                params + wanted,
+            ))
+            summary.update(
+                min=float(low),
+                max=float(high),
+                mean=float(mean),
+                quantiles={_quantile_key(q): float(picked[offsets[q]]) for q in QUANTILES},
+            )
+        metrics[name] = summary
+    top = {
+        name: [
+            [field, float(value)]
+            for field, value in conn.execute(
+                f'SELECT "Field", "{name}" FROM ({source}) WHERE "{name}" IS NOT NULL '
+                f'ORDER BY "{name}" DESC, "Field" LIMIT ?',
+                params + [TOP_FIELDS],
+            )
+        ]
+        for name in TOP_METRICS
+    }
+    types = conn.execute(
+        f"SELECT COALESCE(\"Type\", '') AS type, COUNT(*) AS n FROM ({source}) GROUP BY type ORDER BY n DESC, type",
+        params,
+    ).fetchall()
+    return {"rows": rows, "metrics": metrics, "top": top, "types": [list(row) for row in types]}
@@ -0,0 +1,266 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Offline semantic search over the field catalog.
+
+Every unique field name + description in ``field_text`` becomes a sparse
+TF-IDF vector over hashed features: words (``anl14_mean_eps`` gives ``anl``,
+``mean``, ``eps``), word bigrams and character trigrams, so ``earnings``
+still finds ``earning`` and ``eps_est`` finds ``estimated eps``.  Vectors
+are L2-normalised, which makes the dot product the cosine similarity.
+
+The index is stored feature-major (like a CSC matrix) in ``.npy`` files
+that are opened with ``mmap_mode="r"``: a query only touches the postings
+of its own features and scores every field with one ``bincount``.  It is
+rebuilt when the catalog's text changes and lives next to the catalog as
+``<catalog>.vectors/<signature>/``.
+
+Gemini can rerank the top local candidates (through ``gemini_search``);
+it never sees the whole list.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import re
+import shutil
+import zlib
+from collections import Counter
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+# Bump when features or weights change; existing indexes are then rebuilt.
+VECTOR_INDEX_VERSION = 1
+HASH_BITS = 20
+HASH_MASK = (1 << HASH_BITS) - 1
+# Relative weight of each feature kind before IDF.
+FEATURE_WEIGHTS = {"w": 1.0, "b": 0.7, "c": 0.3}
+STOPWORDS = frozenset(
+    "a an and are as at be by for from in is it of on or per that the this to with".split()
+)
+ARRAY_NAMES = ("ptr", "rows", "weights", "idf", "text_ids")
+RERANK_CANDIDATES = 50
+
+WordCache = Dict[str, Tuple[List[int], List[float]]]
+
+_WORD = re.compile(r"[a-z]+")
+_INDEXES: Dict[str, "FieldVectorIndex"] = {}
+_INDEXES_LOCK = Lock()
+
+
+def _hash(feature: str) -> int:
+    return zlib.crc32(feature.encode("utf-8")) & HASH_MASK
+
+
+def _words(text: str) -> List[str]:
+    # Letters only: digits in field names are mostly IDs and horizons.
+    return [word for word in _WORD.findall(str(text or "").lower()) if word not in STOPWORDS]
+
+
+def _word_features(word: str, cache: WordCache) -> Tuple[List[int], List[float]]:
+    features = cache.get(word)
+    if features is None:
+        padded = f"<{word}>"
+        ids = [_hash(f"w:{word}")] + [_hash(f"c:{padded[i:i + 3]}") for i in range(len(padded) - 2)]
+        features = cache[word] = (ids, [FEATURE_WEIGHTS["w"]] + [FEATURE_WEIGHTS["c"]] * (len(ids) - 1))
+    return features
+
+
+def feature_occurrences(text: str, cache: Optional[WordCache] = None) -> Tuple[List[int], List[float]]:
+    """Every hashed feature occurrence in *text* with its kind weight (repeats included)."""
+    cache = {} if cache is None else cache
+    ids: List[int] = []
+    weights: List[float] = []
+    words = _words(text)
+    for word in words:
+        word_ids, word_weights = _word_features(word, cache)
+        ids.extend(word_ids)
+        weights.extend(word_weights)
+    for first, second in zip(words, words[1:]):
+        ids.append(_hash(f"b:{first} {second}"))
+        weights.append(FEATURE_WEIGHTS["b"])
+    return ids, weights
+
+
+def text_features(text: str) -> Dict[int, float]:
+    """Hashed feature -> weighted term frequency (``1 + log(count)``) of *text*."""
+    ids, weights = feature_occurrences(text)
+    counts = Counter(ids)
+    kind_weights = dict(zip(ids, weights))
+    return {feature: (1.0 + math.log(count)) * kind_weights[feature] for feature, count in counts.items()}
+
+
+def _field_text(field: str, description: str) -> str:
+    return f"{field} {description}"
+
+
+def _save_array(directory: str, name: str, array: np.ndarray) -> None:
+    path = os.path.join(directory, f"{name}.npy")
+    partial = f"{path}.partial"
+    with open(partial, "wb") as fh:
+        np.save(fh, array)
+    os.replace(partial, path)
+
+
+class FieldVectorIndex:
+    """Memory-mapped TF-IDF vectors of every unique field text, searchable by cosine similarity."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        arrays = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+            for name in ARRAY_NAMES
+        }
+        self.ptr = arrays["ptr"]
+        self.rows = arrays["rows"]
+        self.weights = arrays["weights"]
+        self.idf = arrays["idf"]
+        self.text_ids = arrays["text_ids"]
+
+    def __len__(self) -> int:
+        return len(self.text_ids)
+
+    @classmethod
+    def build(cls, directory: str, texts: Iterable[Tuple[int, str, str]]) -> "FieldVectorIndex":
+        """Write an index for ``(text_id, field, description)`` rows (sorted by text_id) to *directory*."""
+        os.makedirs(directory, exist_ok=True)
+        text_ids: List[int] = []
+        rows: List[int] = []
+        features: List[int] = []
+        kind_weights: List[float] = []
+        cache: WordCache = {}
+        for row, (text_id, field, description) in enumerate(texts):
+            text_ids.append(int(text_id))
+            ids, weights = feature_occurrences(_field_text(field, description), cache)
+            rows.extend([row] * len(ids))
+            features.extend(ids)
+            kind_weights.extend(weights)
+
+        # Collapse repeated (row, feature) occurrences into term frequencies.
+        keys = (np.asarray(rows, dtype=np.int64) << HASH_BITS) | np.asarray(features, dtype=np.int64)
+        keys, first, tf = np.unique(keys, return_index=True, return_counts=True)
+        row_array = (keys >> HASH_BITS).astype(np.int32)
+        feature_array = keys & HASH_MASK
+        count = len(text_ids)
+        df = np.bincount(feature_array, minlength=HASH_MASK + 1)
+        idf = (np.log((count + 1) / (df + 1)) + 1.0).astype(np.float32)
+        weights = (
+            (1.0 + np.log(tf)) * np.asarray(kind_weights, dtype=np.float64)[first] * idf[feature_array]
+        ).astype(np.float32)
+        norms = np.sqrt(np.bincount(row_array, weights=weights.astype(np.float64) ** 2, minlength=count))
+        norms[norms == 0] = 1.0
+        weights /= norms[row_array].astype(np.float32)
+
+        order = np.argsort(feature_array, kind="stable")
+        ptr = np.zeros(HASH_MASK + 2, dtype=np.int64)
+        np.cumsum(df, out=ptr[1:])
+        _save_array(directory, "ptr", ptr)
+        _save_array(directory, "rows", row_array[order])
+        _save_array(directory, "weights", weights[order].astype(np.float32))
+        _save_array(directory, "idf", idf)
+        # text_ids last: its presence marks a complete index.
+        _save_array(directory, "text_ids", np.asarray(text_ids, dtype=np.int64))
+        return cls(directory)
+
+    def query_vector(self, query: str) -> Dict[int, float]:
+        vector = {feature: tf * float(self.idf[feature]) for feature, tf in text_features(query).items()}
+        norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+        return {feature: weight / norm for feature, weight in vector.items()}
+
+    def scores(self, query: str) -> np.ndarray:
+        """Cosine similarity of *query* with every indexed text (aligned with ``text_ids``)."""
+        vector = self.query_vector(query)
+        if not vector or not len(self):
+            return np.zeros(len(self), dtype=np.float64)
+        rows: List[np.ndarray] = []
+        weights: List[np.ndarray] = []
+        for feature, query_weight in vector.items():
+            start, end = int(self.ptr[feature]), int(self.ptr[feature + 1])
+            if start == end:
+                continue
+            rows.append(self.rows[start:end])
+            weights.append(self.weights[start:end] * np.float32(query_weight))
+        if not rows:
+            return np.zeros(len(self), dtype=np.float64)
+        return np.bincount(np.concatenate(rows), weights=np.concatenate(weights), minlength=len(self))
+
+    def top(
+        self,
+        query: str,
+        k: int,
+        allowed_text_ids: Optional[Sequence[int]] = None,
+    ) -> List[Tuple[int, float]]:
+        """The *k* best ``(text_id, score)`` pairs with a positive score, best first."""
+        scores = self.scores(query)
+        if allowed_text_ids is not None:
+            mask = np.zeros(len(self), dtype=bool)
+            wanted = np.asarray(sorted(allowed_text_ids), dtype=np.int64)
+            positions = np.searchsorted(self.text_ids, wanted)
+            inside = positions < len(self)
+            positions = positions[inside]
+            mask[positions[self.text_ids[positions] == wanted[inside]]] = True
+            scores = np.where(mask, scores, 0.0)
+        k = min(int(k), int(np.count_nonzero(scores > 0)))
+        if k <= 0:
+            return []
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [(int(self.text_ids[row]), float(scores[row])) for row in best]
+
+
+def index_directory(catalog_path: str) -> str:
+    return f"{os.path.splitext(catalog_path)[0]}.vectors"
+
+
+def load_index(catalog) -> FieldVectorIndex:
+    """Vector index matching *catalog*'s current field text, built on first use or after a change."""
+    root = index_directory(catalog.db_path)
+    signature = f"v{VECTOR_INDEX_VERSION}-{catalog.text_signature()}"
+    directory = os.path.join(root, signature)
+    with _INDEXES_LOCK:
+        index = _INDEXES.get(directory)
+        if index is not None:
+            return index
+        if os.path.exists(os.path.join(directory, "text_ids.npy")):
+            index = FieldVectorIndex(directory)
+        else:
+            index = FieldVectorIndex.build(directory, catalog.iter_texts())
+            for name in os.listdir(root):
+                if name != signature:
+                    shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+        for stale in [key for key in _INDEXES if os.path.dirname(key) == root]:
+            del _INDEXES[stale]
+        _INDEXES[directory] = index
+        return index
+
+
+def gemini_rerank(
+    query: str,
+    candidates: List[Dict[str, Any]],
+    model=None,
+    max_candidates: int = RERANK_CANDIDATES,
+) -> List[Dict[str, Any]]:
+    """
+    Order local candidates by Gemini's judgement of relevance to *query*.
+
+    Only the first *max_candidates* candidates are sent, in one request
+    (answers are cached by ``gemini_search``).  Fields Gemini leaves out
+    are dropped; if it names none of them the local order is kept.
+    """
+    from gemini_search import pick_fields
+
+    shortlist = candidates[:max_candidates]
+    if not shortlist:
+        return []
+    texts = list(dict.fromkeys((str(row["field"]), str(row.get("description") or "")) for row in shortlist))
+    by_field: Dict[str, List[Dict[str, Any]]] = {}
+    for row in shortlist:
+        by_field.setdefault(str(row["field"]), []).append(row)
+    ranked: List[Dict[str, Any]] = []
+    for name in pick_fields(query, texts, model=model, max_fields=max(len(texts), 1)):
+        ranked.extend(by_field.pop(name, []))
+    return ranked or shortlist
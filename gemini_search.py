@@ -0,0 +1,267 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Ask Gemini which fields match a query, with chunking and a response cache.
+
+``pick_fields`` splits the field list into chunks of at most
+``GEMINI_CHUNK_FIELDS`` fields and ``GEMINI_CHUNK_CHARS`` characters, sends
+the chunks concurrently and merges the answers round-robin by rank.  Each chunk
+answer is cached on disk (``.brain_cli/gemini_cache.sqlite``, override with
+``BRAIN_GEMINI_CACHE_PATH``) under the model, the normalised query and a
+hash of the chunk's fields, so repeating a search, or rewording it with the
+same words, costs no API call; a changed dataset only misses on the chunks
+whose fields changed.  Entries expire after ``GEMINI_CACHE_TTL_SECONDS`` and
+the least recently used are evicted beyond ``GEMINI_CACHE_MAX_ENTRIES``.
+
+Every search logs its latency and the cache hit rate (per call and since
+start).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CACHE_PATH = os.path.join(SCRIPT_DIR, ".brain_cli", "gemini_cache.sqlite")
+GEMINI_MODEL = "gemini-2.5-flash-lite"
+GEMINI_CHUNK_FIELDS = 200
+GEMINI_CHUNK_CHARS = 24000
+GEMINI_MAX_WORKERS = 4
+GEMINI_CACHE_TTL_SECONDS = 7 * 24 * 3600
+GEMINI_CACHE_MAX_ENTRIES = 5000
+# Bump when the prompt changes so old answers are not reused.
+PROMPT_VERSION = 1
+
+FieldText = Tuple[str, str]
+
+_WORD = re.compile(r"\w+")
+_CACHES: Dict[str, "GeminiResponseCache"] = {}
+_CACHES_LOCK = Lock()
+
+
+def normalize_query(query: str) -> str:
+    """Lower-case, punctuation-free, word-order-free form of *query* used in cache keys."""
+    return " ".join(sorted(set(_WORD.findall(str(query or "").lower()))))
+
+
+def fields_hash(fields: Sequence[FieldText]) -> str:
+    digest = hashlib.sha256()
+    for field, description in fields:
+        digest.update(f"{field}\x1f{description or ''}\x1e".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def parse_field_list(text: str) -> List[str]:
+    """Field names from a reply that should contain a JSON array (code fences and chatter tolerated)."""
+    match = re.search(r"\[.*\]", str(text or ""), re.DOTALL)
+    if match is None:
+        return []
+    try:
+        values = json.loads(match.group())
+    except ValueError:
+        return re.findall(r'"([^"]+)"', match.group())
+    if not isinstance(values, list):
+        return []
+    return [str(value).strip() for value in values if isinstance(value, (str, int)) and str(value).strip()]
+
+
+def chunk_fields(
+    fields: Sequence[FieldText],
+    max_fields: int = GEMINI_CHUNK_FIELDS,
+    max_chars: int = GEMINI_CHUNK_CHARS,
+) -> List[List[FieldText]]:
+    """Split *fields* in order into chunks bounded by field count and text size."""
+    chunks: List[List[FieldText]] = []
+    current: List[FieldText] = []
+    size = 0
+    for field, description in fields:
+        length = len(str(field)) + len(str(description or "")) + 4
+        if current and (len(current) >= max_fields or size + length > max_chars):
+            chunks.append(current)
+            current, size = [], 0
+        current.append((str(field), str(description or "")))
+        size += length
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def build_prompt(query: str, fields: Sequence[FieldText]) -> str:
+    lines = "\n".join(f"- {field}: {description}" for field, description in fields)
+    return (
+        "You are an expert on financial data fields. From the candidate fields below, "
+        "pick the ones relevant to the query and order them from most to least relevant.\n\n"
+        f"Query: {query}\n\nCandidates:\n{lines}\n\n"
+        'Reply with only a JSON array of field names, e.g. ["field1", "field2"]. '
+        "Reply with [] if none are relevant."
+    )
+
+
+class GeminiResponseCache:
+    """SQLite cache of parsed Gemini answers with a TTL and an LRU entry limit."""
+
+    def __init__(
+        self,
+        db_path: str = DEFAULT_CACHE_PATH,
+        ttl_seconds: float = GEMINI_CACHE_TTL_SECONDS,
+        max_entries: int = GEMINI_CACHE_MAX_ENTRIES,
+    ):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    fields_json TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    used_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_used ON responses(used_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    @staticmethod
+    def key(model_name: str, query: str, fields: Sequence[FieldText]) -> str:
+        text = f"{PROMPT_VERSION}\n{model_name}\n{normalize_query(query)}\n{fields_hash(fields)}"
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[List[str]]:
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT fields_json, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and now - row[1] > self.ttl_seconds:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+            if row is not None:
+                conn.execute("UPDATE responses SET used_at = ? WHERE key = ?", (now, key))
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, fields: List[str]) -> None:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, fields_json, created_at, used_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(fields, ensure_ascii=False), now, now),
+            )
+            conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+            conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            }
+
+
+def get_cache() -> GeminiResponseCache:
+    """Shared response cache for the configured path."""
+    db_path = os.environ.get("BRAIN_GEMINI_CACHE_PATH", DEFAULT_CACHE_PATH)
+    with _CACHES_LOCK:
+        cache = _CACHES.get(db_path)
+        if cache is None:
+            cache = _CACHES[db_path] = GeminiResponseCache(db_path)
+        return cache
+
+
+def gemini_model(model_name: str = GEMINI_MODEL):
+    import google.generativeai as genai
+
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key or api_key == "your_gemini_api_key_here":
+        raise RuntimeError("GEMINI_API_KEY is not set.")
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel(model_name)
+
+
+def pick_fields(
+    query: str,
+    fields: Sequence[FieldText],
+    *,
+    model=None,
+    model_name: str = GEMINI_MODEL,
+    cache: Optional[GeminiResponseCache] = None,
+    max_fields: int = GEMINI_CHUNK_FIELDS,
+    max_workers: int = GEMINI_MAX_WORKERS,
+) -> List[str]:
+    """
+    Names of the *fields* Gemini considers relevant to *query*, best first.
+
+    Each chunk is ranked separately, so the answers are merged round-robin by
+    rank (every chunk's first pick, then every second pick, ...) rather than
+    chunk after chunk.  Names Gemini invents are dropped.  *model* defaults to a
+    ``GenerativeModel`` for *model_name*, created only if a chunk misses the cache.
+    """
+    started = time.monotonic()
+    cache = cache or get_cache()
+    chunks = chunk_fields(fields, max_fields=max_fields)
+    answers: List[Optional[List[str]]] = []
+    keys: List[str] = []
+    for chunk in chunks:
+        keys.append(GeminiResponseCache.key(model_name, query, chunk))
+        answers.append(cache.get(keys[-1]))
+    missing = [i for i, answer in enumerate(answers) if answer is None]
+
+    if missing:
+        model = model or gemini_model(model_name)
+
+        def ask(i: int) -> List[str]:
+            return parse_field_list(model.generate_content(build_prompt(query, chunks[i])).text)
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(missing)))) as pool:
+            for i, answer in zip(missing, pool.map(ask, missing)):
+                answers[i] = answer
+                cache.put(keys[i], answer)
+
+    ranked: List[List[str]] = []
+    for chunk, answer in zip(chunks, answers):
+        names = {field.lower(): field for field, _ in chunk}
+        ranked.append([names[name.lower()] for name in answer or [] if name.lower() in names])
+    picked: List[str] = []
+    seen = set()
+    for rank in range(max(map(len, ranked), default=0)):
+        for fields_at in ranked:
+            if rank < len(fields_at) and fields_at[rank] not in seen:
+                seen.add(fields_at[rank])
+                picked.append(fields_at[rank])
+
+    stats = cache.stats()
+    logging.info(
+        "Gemini field search: %d fields in %d chunks, %d cached, %d requested, %.2fs; "
+        "cache hit rate %s (%d/%d since start)",
+        len(fields), len(chunks), len(chunks) - len(missing), len(missing),
+        time.monotonic() - started, stats["hit_rate"], stats["hits"], stats["hits"] + stats["misses"],
+    )
+    return picked
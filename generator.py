@@ -26,6 +26,7 @@ from PySide6.QtGui import QFont, QColor
 import re
 from PySide6.QtGui import QSyntaxHighlighter, QTextCharFormat, QColor, QFont
 # 匯入模擬參數預設值
+from alpha_registry import template_id_for_code
 from simulation import PARAM_COLUMNS, DEFAULT_VALUES
 # 獲取腳本所在目錄的絕對路徑
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -902,6 +903,7 @@ class GeneratorMainWindow(QMainWindow):
             
         # Get settings
         settings = self.settings_widget.get_settings()
+        template_id = template_id_for_code(template_code)
         
         # Build strategies list
         strategies = []
@@ -910,6 +912,8 @@ class GeneratorMainWindow(QMainWindow):
                 # Substitute placeholder then strip dead variable definitions
                 code = eliminate_dead_code(template_code.replace("{field}", field))
                 strategy = settings.copy()
+                strategy['template_id'] = template_id
+                strategy['field'] = field
                 strategy['code'] = code
                 # Keep the generated strategy dictionary as is
                 strategies.append(strategy)
@@ -991,6 +995,7 @@ Strategy example (field: {first_field}):
             
         # Get settings
         settings = self.settings_widget.get_settings()
+        template_id = template_id_for_code(template_code)
         
         # Build strategies list
         strategies = []
@@ -999,8 +1004,10 @@ Strategy example (field: {first_field}):
                 # Substitute placeholder then strip dead variable definitions
                 code = eliminate_dead_code(template_code.replace("{field}", field))
                     
-                # 創建策略字典
+                # 創建策略字典 (template_id / field 供 early stop 分組)
                 strategy = settings.copy()
+                strategy['template_id'] = template_id
+                strategy['field'] = field
                 strategy['code'] = code
                 strategies.append(strategy)
             except Exception as e:
@@ -171,7 +171,7 @@ def build_status_message(credentials_path: str) -> str:
     import cli_services as svc
 
     session_info = _session_status(credentials_path)
-    dataset_count = len(svc.datasets_list())
+    catalog = svc.get_field_catalog().summary()
     simulate_jobs = svc.simulate_list()
     evolution_jobs = svc.evolution_list()
 
@@ -220,7 +220,7 @@ def build_status_message(credentials_path: str) -> str:
         f"Session: {session_info.get('status')}",
         f"Session detail: {session_info.get('message')}",
         f"Login age: {session_info.get('login_age') or 'N/A'}",
-        f"Cached datasets: {dataset_count}",
+        f"Cached datasets: {catalog['datasets']} ({catalog['fields']} fields)",
         (
             "Simulation jobs: "
             f"pending={_count_status(simulate_jobs, 'pending')} "
@@ -0,0 +1,262 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Record and replay WQ Brain HTTP traffic.
+
+Set ``BRAIN_CASSETTE_RECORD=<file>`` to append every request/response made
+through ``wq_session`` sessions (simulations, dataset and operator refresh)
+to a JSONL cassette with credentials scrubbed.  Set
+``BRAIN_CASSETTE_REPLAY=<file>`` to serve those responses instead of the
+network.  ``BRAIN_CASSETTE_SPEED`` scales replayed latency and
+``Retry-After`` headers: 1 keeps the original timing, 0.1 replays ten times
+faster and 0 removes all waits.
+"""
+
+from __future__ import annotations
+
+import base64
+import datetime
+import hashlib
+import json
+import os
+import time
+from collections import deque
+from threading import Lock
+from typing import Any, Deque, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+
+RECORD_ENV = "BRAIN_CASSETTE_RECORD"
+REPLAY_ENV = "BRAIN_CASSETTE_REPLAY"
+SPEED_ENV = "BRAIN_CASSETTE_SPEED"
+SCRUBBED = "<scrubbed>"
+SCRUBBED_HEADERS = {"authorization", "proxy-authorization", "cookie", "set-cookie"}
+SCRUBBED_JSON_KEYS = {"email", "password", "token", "accessToken", "refreshToken"}
+
+_WRITE_LOCK = Lock()
+_REPLAY_ADAPTERS: Dict[str, "ReplayAdapter"] = {}
+_REPLAY_ADAPTERS_LOCK = Lock()
+
+
+class CassetteMiss(requests.exceptions.ConnectionError):
+    """Raised when a replayed request has no recorded response."""
+
+
+def _body_bytes(body: Any) -> bytes:
+    if body is None:
+        return b""
+    if isinstance(body, str):
+        return body.encode("utf-8")
+    if isinstance(body, (bytes, bytearray)):
+        return bytes(body)
+    return b""
+
+
+def request_key(method: str, url: str, body: Any = None) -> str:
+    """Match key for a request: method, path, sorted query and a body digest."""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    key = f"{method.upper()} {parts.path}?{query}"
+    raw = _body_bytes(body)
+    if raw:
+        key += f" #{hashlib.sha1(raw).hexdigest()[:16]}"
+    return key
+
+
+def _scrub_json(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {
+            k: SCRUBBED if k in SCRUBBED_JSON_KEYS else _scrub_json(v)
+            for k, v in value.items()
+        }
+    if isinstance(value, list):
+        return [_scrub_json(v) for v in value]
+    return value
+
+
+def _scrub_headers(headers) -> Dict[str, str]:
+    return {
+        k: SCRUBBED if k.lower() in SCRUBBED_HEADERS else v
+        for k, v in (headers or {}).items()
+    }
+
+
+def _encode_body(raw: bytes) -> dict:
+    if not raw:
+        return {"text": ""}
+    try:
+        text = raw.decode("utf-8")
+    except UnicodeDecodeError:
+        return {"base64": base64.b64encode(raw).decode("ascii")}
+    try:
+        return {"text": json.dumps(_scrub_json(json.loads(text)), ensure_ascii=False)}
+    except ValueError:
+        return {"text": text}
+
+
+def _decode_body(body: dict) -> bytes:
+    if "base64" in body:
+        return base64.b64decode(body["base64"])
+    return str(body.get("text") or "").encode("utf-8")
+
+
+class RecordingAdapter(HTTPAdapter):
+    """HTTPAdapter that appends each exchange to a cassette file."""
+
+    def __init__(self, path: str, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self._started = time.monotonic()
+
+    def send(self, request, **kwargs):
+        sent_at = time.monotonic()
+        response = super().send(request, **kwargs)
+        content = response.content
+        entry = {
+            "key": request_key(request.method, request.url, request.body),
+            "offset": round(sent_at - self._started, 4),
+            "elapsed": round(time.monotonic() - sent_at, 4),
+            "request": {
+                "method": request.method,
+                "url": request.url,
+                "headers": _scrub_headers(request.headers),
+                "body": _encode_body(_body_bytes(request.body)),
+            },
+            "response": {
+                "status": response.status_code,
+                "reason": response.reason,
+                "url": response.url,
+                "headers": _scrub_headers(response.headers),
+                "body": _encode_body(content),
+            },
+        }
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with _WRITE_LOCK, open(self.path, "a", encoding="utf-8") as fh:
+            fh.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """
+    Serve responses from a cassette.
+
+    Exchanges with the same key are served in recorded order; once only the
+    last one is left it is repeated, so extra polls keep seeing the final
+    state.  Unrecorded requests raise ``CassetteMiss``.
+    """
+
+    def __init__(self, path: str, speed: float = 1.0):
+        super().__init__()
+        self.path = path
+        self.speed = max(float(speed), 0.0)
+        self._lock = Lock()
+        self._entries: Dict[str, Deque[dict]] = {}
+        with open(path, "r", encoding="utf-8") as fh:
+            for line in fh:
+                line = line.strip()
+                if line:
+                    entry = json.loads(line)
+                    self._entries.setdefault(entry["key"], deque()).append(entry)
+
+    def _next_entry(self, key: str) -> Optional[dict]:
+        with self._lock:
+            queue = self._entries.get(key)
+            if not queue:
+                return None
+            return queue.popleft() if len(queue) > 1 else queue[0]
+
+    def _scaled_headers(self, headers: dict) -> CaseInsensitiveDict:
+        scaled = CaseInsensitiveDict(headers)
+        retry_after = scaled.get("Retry-After")
+        if retry_after is not None and self.speed != 1.0:
+            try:
+                seconds = float(retry_after) * self.speed
+            except (TypeError, ValueError):
+                return scaled
+            scaled["Retry-After"] = str(int(seconds)) if seconds.is_integer() else f"{seconds:.3f}"
+        return scaled
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        key = request_key(request.method, request.url, request.body)
+        entry = self._next_entry(key)
+        if entry is None:
+            raise CassetteMiss(f"No recorded response for {key} in {self.path}", request=request)
+        delay = float(entry.get("elapsed") or 0.0) * self.speed
+        if delay > 0:
+            time.sleep(delay)
+
+        recorded = entry["response"]
+        response = requests.Response()
+        response.status_code = int(recorded["status"])
+        response.reason = recorded.get("reason")
+        response.headers = self._scaled_headers(recorded.get("headers") or {})
+        response._content = _decode_body(recorded.get("body") or {})
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response.elapsed = datetime.timedelta(seconds=delay)
+        return response
+
+    def close(self):
+        pass
+
+
+def replay_speed() -> float:
+    try:
+        return float(os.environ.get(SPEED_ENV, "1"))
+    except ValueError:
+        return 1.0
+
+
+def _replay_adapter(path: str) -> ReplayAdapter:
+    # One adapter per cassette so sessions created later in the same process
+    # continue from where earlier ones stopped.
+    with _REPLAY_ADAPTERS_LOCK:
+        adapter = _REPLAY_ADAPTERS.get(path)
+        if adapter is None:
+            adapter = ReplayAdapter(path, speed=replay_speed())
+            _REPLAY_ADAPTERS[path] = adapter
+        return adapter
+
+
+def replay_session() -> Optional[requests.Session]:
+    """Return a session served from the replay cassette, or None when replay is off."""
+    path = os.environ.get(REPLAY_ENV)
+    if not path:
+        return None
+    session = requests.Session()
+    adapter = _replay_adapter(path)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def install(session: requests.Session) -> requests.Session:
+    """Mount the recording adapter on *session* when recording is enabled."""
+    path = os.environ.get(RECORD_ENV)
+    if path:
+        adapter = RecordingAdapter(path)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+    return session
+
+
+def scaled(seconds: float) -> float:
+    """*seconds* of client-side waiting, scaled by the replay speed while replaying."""
+    if os.environ.get(REPLAY_ENV):
+        seconds *= replay_speed()
+    return seconds
+
+
+def pace(seconds: float):
+    """Client-side pacing sleep, scaled by the replay speed while replaying."""
+    seconds = scaled(seconds)
+    if seconds > 0:
+        time.sleep(seconds)
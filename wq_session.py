@@ -7,6 +7,8 @@ from urllib.parse import urljoin
 
 import requests
 
+import wq_cassette
+
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 DEFAULT_CREDENTIALS_PATH = os.path.join(SCRIPT_DIR, "credentials.json")
 SESSION_FILE = os.path.join(SCRIPT_DIR, "session.pkl")
@@ -36,7 +38,7 @@ def build_session_from_credentials(credentials_path: str = DEFAULT_CREDENTIALS_P
         creds = json.load(fh)
     session = requests.Session()
     session.auth = (creds["email"], creds["password"])
-    return session
+    return wq_cassette.install(session)
 
 
 def extract_persona_url(response: requests.Response, body: Optional[dict] = None) -> Optional[str]:
@@ -153,6 +155,9 @@ def authenticate_with_brain(session: requests.Session,
 
 
 def get_session_for_request(credentials_path: str = DEFAULT_CREDENTIALS_PATH) -> Tuple[Optional[requests.Session], Optional[str], Optional[str]]:
+    replayed = wq_cassette.replay_session()
+    if replayed is not None:
+        return replayed, None, None
     persisted = load_persisted_session(credentials_path)
     if persisted is not None:
         return persisted, None, None